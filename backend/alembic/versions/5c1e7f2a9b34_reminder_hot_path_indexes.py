@@ -0,0 +1,42 @@
+"""reminder hot path indexes
+
+Revision ID: 5c1e7f2a9b34
+Revises: a89a6e215d69
+Create Date: 2025-10-17 10:12:44.512903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7f2a9b34'
+down_revision: Union[str, None] = 'a89a6e215d69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Enum columns store member names, hence 'PENDING'. On PostgreSQL the
+    # indexes are built CONCURRENTLY so the scheduler keeps running meanwhile.
+    postgres = op.get_context().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reminders_due', 'reminders', ['scheduled_time'], unique=False,
+            postgresql_where=sa.text("status = 'PENDING' AND is_active"),
+            sqlite_where=sa.text("status = 'PENDING' AND is_active = 1"),
+            postgresql_concurrently=postgres,
+        )
+        op.create_index(
+            'ix_reminders_user_schedule', 'reminders', ['user_id', 'scheduled_time', 'id'], unique=False,
+            postgresql_concurrently=postgres,
+        )
+
+
+def downgrade() -> None:
+    postgres = op.get_context().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reminders_user_schedule', table_name='reminders', postgresql_concurrently=postgres)
+        op.drop_index('ix_reminders_due', table_name='reminders', postgresql_concurrently=postgres)
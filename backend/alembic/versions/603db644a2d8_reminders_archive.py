@@ -0,0 +1,55 @@
+"""reminders archive
+
+Revision ID: 603db644a2d8
+Revises: 705540e87b3f
+Create Date: 2025-10-24 08:52:31.640179
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '603db644a2d8'
+down_revision: Union[str, None] = '705540e87b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_enum(name: str, *values: str) -> sa.types.TypeEngine:
+    # remindertype and reminderstatus already exist on PostgreSQL; reuse them rather than CREATE TYPE
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def upgrade() -> None:
+    op.create_table('reminders_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('reminder_type', _existing_enum('remindertype', 'APPOINTMENT', 'MEDICINE'), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('scheduled_time', sa.DateTime(), nullable=False),
+    sa.Column('status', _existing_enum('reminderstatus', 'PENDING', 'PROCESSING', 'SENT', 'FAILED', 'CANCELLED'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('claimed_by', sa.String(), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reminders_archive_user_id'), 'reminders_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_reminders_archive_archived_at'), 'reminders_archive', ['archived_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Archived reminders are dropped with the table
+    op.drop_index(op.f('ix_reminders_archive_archived_at'), table_name='reminders_archive')
+    op.drop_index(op.f('ix_reminders_archive_user_id'), table_name='reminders_archive')
+    op.drop_table('reminders_archive')
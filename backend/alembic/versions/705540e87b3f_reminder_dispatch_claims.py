@@ -0,0 +1,47 @@
+"""reminder dispatch claims
+
+Revision ID: 705540e87b3f
+Revises: 5c1e7f2a9b34
+Create Date: 2025-10-20 09:41:07.218344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '705540e87b3f'
+down_revision: Union[str, None] = '5c1e7f2a9b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    postgres = op.get_context().dialect.name == "postgresql"
+    if postgres:
+        # A new enum value must be committed before anything (the index below) can use it
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE reminderstatus ADD VALUE IF NOT EXISTS 'PROCESSING' AFTER 'PENDING'")
+    # SQLite stores the enum as a VARCHAR and does not enforce its length
+    op.add_column('reminders', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('reminders', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reminders_claimed', 'reminders', ['claimed_at'], unique=False,
+            postgresql_where=sa.text("status = 'PROCESSING'"),
+            sqlite_where=sa.text("status = 'PROCESSING'"),
+            postgresql_concurrently=postgres,
+        )
+
+
+def downgrade() -> None:
+    postgres = op.get_context().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reminders_claimed', table_name='reminders', postgresql_concurrently=postgres)
+    # In-flight claims go back to the queue. PostgreSQL cannot drop an enum
+    # value, so 'PROCESSING' stays in reminderstatus unused.
+    op.execute("UPDATE reminders SET status = 'PENDING' WHERE status = 'PROCESSING'")
+    op.drop_column('reminders', 'claimed_at')
+    op.drop_column('reminders', 'claimed_by')
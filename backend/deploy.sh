@@ -1,8 +1,10 @@
 #!/bin/bash
 
 # Railway deployment script
-# echo "Running database migrations..."
-# alembic upgrade head
+set -e
+
+echo "Running database migrations..."
+python -m src.db.schema upgrade
 
 echo "Starting application..."
 exec uvicorn main:app --host 0.0.0.0 --port $PORT
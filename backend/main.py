@@ -4,15 +4,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 import yaml
 
-from src.db.database import engine, Base
 from src.api import api_router
+from src.api.pagination import NEXT_CURSOR_HEADER
 from src.core.config import settings
 from src.core.auth_middleware import RequireAuth, OptionalAuth
+from src.utils.cache import Cache
 from src.utils.reminder_integration import lifespan
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title="SE Project API (Team 8, May 2025)",
@@ -70,8 +68,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.middleware("http")
+async def batch_cache_writes(request: Request, call_next):
+    """Buffer cache mutations made while handling a request and flush them in one Redis pipeline"""
+    async with Cache.batch():
+        return await call_next(request)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
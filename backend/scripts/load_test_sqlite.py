@@ -0,0 +1,171 @@
+"""
+Concurrent read/write load test for the SQLite profile (src/db/sqlite.py).
+
+The workload looks like a small clinic's traffic. Reader threads page
+through a user's reminders. Writer threads each run a request-sized
+transaction: insert a reminder, then mark another one sent. The same
+workload runs against a bare SQLite engine (rollback journal, deferred
+transactions) and against the tuned profile (WAL, synchronous=NORMAL,
+BEGIN IMMEDIATE and the single-writer queue). Each run reports
+throughput, write latency and how many operations failed with
+"database is locked".
+
+    python scripts/load_test_sqlite.py
+    python scripts/load_test_sqlite.py --readers 16 --writers 4 --seconds 20 --processes 2
+
+--processes runs that many copies of the workload, like uvicorn workers
+sharing one database file.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "load-test")
+
+from src.db.database import Base  # noqa: E402
+from src.db.sqlite import configure_sqlite_engine  # noqa: E402
+import src.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from src.models.reminder import Reminder, ReminderStatus, ReminderType  # noqa: E402
+from src.models.user import User  # noqa: E402
+
+USERS = 200
+
+
+def make_engine(path: str, tuned: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 5})
+    if tuned:
+        configure_sqlite_engine(engine, single_writer=True)
+    return engine
+
+
+def seed(path: str, rows: int) -> None:
+    engine = make_engine(path, tuned=False)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    now = datetime.now()
+    rng = random.Random(7)
+    with Session() as db:
+        db.add_all(User(id=i + 1, name=f"Patient {i}", phone=f"+9190000{i:05d}") for i in range(USERS))
+        db.flush()
+        db.execute(Reminder.__table__.insert(), [{
+            "user_id": rng.randrange(USERS) + 1, "reminder_type": ReminderType.MEDICINE, "related_id": 1,
+            "title": "Dose", "message": "Take it", "scheduled_time": now + timedelta(minutes=rng.randrange(-10000, 10000)),
+            "status": ReminderStatus.PENDING, "created_at": now, "updated_at": now, "is_active": True,
+        } for _ in range(rows)])
+        db.commit()
+    engine.dispose()
+
+
+def run_workload(path: str, tuned: bool, readers: int, writers: int, seconds: float, results) -> None:
+    engine = make_engine(path, tuned)
+    Session = sessionmaker(bind=engine)
+    deadline = time.monotonic() + seconds
+    lock = threading.Lock()
+    totals = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0, "write_latencies": []}
+
+    def reader(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        reads = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                with Session() as db:
+                    db.scalars(
+                        select(Reminder).where(Reminder.user_id == rng.randrange(USERS) + 1, Reminder.is_active == True)  # noqa: E712
+                        .order_by(Reminder.scheduled_time.desc(), Reminder.id.desc()).limit(20)
+                    ).all()
+                reads += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            totals["reads"] += reads
+            totals["read_errors"] += errors
+
+    def writer(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        writes = errors = 0
+        latencies = []
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    user_id = rng.randrange(USERS) + 1
+                    # Read, then write, like the service layer does inside one request
+                    pending = db.scalars(select(Reminder.id).where(
+                        Reminder.user_id == user_id, Reminder.status == ReminderStatus.PENDING).limit(1)).first()
+                    db.add(Reminder(user_id=user_id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                                    title="Dose", message="Take it", scheduled_time=datetime.now() + timedelta(hours=1)))
+                    if pending is not None:
+                        db.execute(update(Reminder).where(Reminder.id == pending).values(status=ReminderStatus.SENT))
+                    db.commit()
+                writes += 1
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+        with lock:
+            totals["writes"] += writes
+            totals["write_errors"] += errors
+            totals["write_latencies"].extend(latencies)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    results.put(totals)
+
+
+def run(label: str, tuned: bool, args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "load.db")
+    seed(path, args.rows)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=run_workload, args=(path, tuned, args.readers, args.writers, args.seconds, results))
+        for _ in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    totals = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    reads = sum(t["reads"] for t in totals)
+    writes = sum(t["writes"] for t in totals)
+    latencies = sorted(latency for t in totals for latency in t["write_latencies"])
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else float("nan")
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan")
+    print(f"\n=== {label} ===")
+    print(f"reads/s  {reads / args.seconds:10.1f}   locked errors {sum(t['read_errors'] for t in totals)}")
+    print(f"writes/s {writes / args.seconds:10.1f}   locked errors {sum(t['write_errors'] for t in totals)}")
+    print(f"write latency p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.processes} process(es) x {args.readers} readers + {args.writers} writers, "
+          f"{args.seconds:g}s, {args.rows:,} seeded reminders")
+    run("bare engine (rollback journal, deferred transactions)", False, args)
+    run("SQLite profile (WAL, NORMAL, BEGIN IMMEDIATE, single writer)", True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,7 @@ echo ""
 echo "3. Create database migration:"
 echo "   alembic revision --autogenerate -m 'Description'"
 echo ""
-echo "4. Apply migrations:"
-echo "   alembic upgrade head"
+echo "4. Create or migrate the database (required before the first start):"
+echo "   python -m src.db.schema upgrade"
 echo ""
 echo -e "${YELLOW}API Documentation will be available at: http://localhost:8000/docs${NC}"
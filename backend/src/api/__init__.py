@@ -6,6 +6,7 @@ from .medicines import router as medicines_router
 from .documents import router as documents_router
 from .doctors import router as doctors_router
 from .appointments import router as appointments_router
+from .metrics import router as metrics_router
 
 # Shared authentication error responses for endpoints requiring authentication/authorization
 AUTH_ERROR_RESPONSES = {
@@ -23,5 +24,6 @@ api_router.include_router(medicines_router)
 api_router.include_router(documents_router)
 api_router.include_router(doctors_router)
 api_router.include_router(appointments_router)
+api_router.include_router(metrics_router)
 
 __all__ = ["api_router"]
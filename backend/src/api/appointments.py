@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from src.api.constants import AUTH_ERROR_RESPONSES
+from src.api.pagination import PageParams, send_page
 from fastapi import Path
 from sqlalchemy.orm import Session
 from typing import List
 
-from src.db.database import get_db
+from src.db.database import cache_fill_session, get_db, get_read_db, on_commit
 from src.core.auth_middleware import RequireAdmin
 from src.services.appointment_service import AppointmentService
+from src.services.pagination import page_payload
 from src.services.reminder_scheduler import ReminderService
 from src.schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
-from src.utils.cache import Cache
+from src.utils.cache import Cache, user_tag, doctor_tag
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
@@ -36,61 +38,60 @@ def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get
             appointment_id=result.id
         )
         
-        Cache.delete(f"appointments_user_{appointment.user_id}")
-        Cache.delete(f"appointments_doctor_{appointment.doctor_id}")
+        on_commit(db, Cache.invalidate_tags, user_tag(appointment.user_id), doctor_tag(appointment.doctor_id))
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/user/{user_id}", response_model=List[AppointmentResponse], responses={200: {"description": "List of appointments for the user."}, 404: {"description": "User not found."}})
 def get_appointments_by_user(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to get appointments for"),
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all appointments for a user. Results are cached for 5 minutes.
+    List a user's appointments in schedule order, one page at a time. Pages are cached for 5 minutes.
     
     Supports US3 and US7 by providing appointment lists for users and shared calendar access for families.
     """
-    cache_key = f"appointments_user_{user_id}"
-    cached_appointments = Cache.get(cache_key)
-    if cached_appointments:
-        return cached_appointments
-    appointments = AppointmentService.get_appointments_by_user(db, user_id)
-    appointments_data = [AppointmentResponse.model_validate(app) for app in appointments]
-    Cache.set(cache_key, [app.model_dump() for app in appointments_data], expiry=300)
-    return appointments_data
+    def load_appointments():
+        with cache_fill_session(db) as source:
+            appointments = AppointmentService.get_appointments_page_by_user(source, user_id, page.limit, page.cursor)
+            return page_payload(appointments, AppointmentResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key(f"appointments_user_{user_id}"), load_appointments, expiry=300, tags=[user_tag(user_id)]))
 
 @router.get("/doctor/{doctor_id}", response_model=List[AppointmentResponse], responses={200: {"description": "List of appointments for the doctor."}, 404: {"description": "Doctor not found."}})
 def get_appointments_by_doctor(
+    response: Response,
     doctor_id: int = Path(..., description="ID of the doctor to get appointments for"),
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all appointments for a doctor. Results are cached for 5 minutes.
+    List a doctor's appointments in schedule order, one page at a time. Pages are cached for 5 minutes.
     
     Supports US7 by enabling doctors and families to coordinate appointments.
     """
-    cache_key = f"appointments_doctor_{doctor_id}"
-    cached_appointments = Cache.get(cache_key)
-    if cached_appointments:
-        return cached_appointments
-    appointments = AppointmentService.get_appointments_by_doctor(db, doctor_id)
-    appointments_data = [AppointmentResponse.model_validate(app) for app in appointments]
-    Cache.set(cache_key, [app.model_dump() for app in appointments_data], expiry=300)
-    return appointments_data
+    def load_appointments():
+        with cache_fill_session(db) as source:
+            appointments = AppointmentService.get_appointments_page_by_doctor(source, doctor_id, page.limit, page.cursor)
+            return page_payload(appointments, AppointmentResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key(f"appointments_doctor_{doctor_id}"), load_appointments, expiry=300, tags=[doctor_tag(doctor_id)]))
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse, responses={200: {"description": "Appointment found."}, 404: {"description": "Appointment not found."}})
 def get_appointment_by_id(
     appointment_id: int = Path(..., description="ID of the appointment to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get an appointment by its ID.
+    Get an appointment by its ID. Served from the entity cache.
     
     Supports US3 by allowing users and caregivers to review appointment details.
     """
-    appointment = AppointmentService.get_appointment(db, appointment_id)
+    appointment = AppointmentService.get_appointment_cached(db, appointment_id)
     if not appointment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
     return appointment
@@ -119,8 +120,7 @@ def update_appointment(
     if not appointment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
     # Invalidate caches
-    Cache.delete(f"appointments_user_{appointment.user_id}")
-    Cache.delete(f"appointments_doctor_{appointment.doctor_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(appointment.user_id), doctor_tag(appointment.doctor_id))
     return appointment
 
 @router.delete(
@@ -141,13 +141,12 @@ def delete_appointment(
     
     Supports US3 by allowing removal of outdated or incorrect appointments.
     """
-    appointment = AppointmentService.get_appointment(db, appointment_id)
+    appointment = AppointmentService.get_appointment_cached(db, appointment_id)
     if not appointment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
     success = AppointmentService.delete_appointment(db, appointment_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appointment not found")
     # Invalidate caches
-    Cache.delete(f"appointments_user_{appointment.user_id}")
-    Cache.delete(f"appointments_doctor_{appointment.doctor_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(appointment.user_id), doctor_tag(appointment.doctor_id))
     return {"message": "Appointment deleted successfully"}
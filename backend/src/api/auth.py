@@ -4,7 +4,7 @@ from src.api.constants import AUTH_ERROR_RESPONSES
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 
-from src.db.database import get_db
+from src.db.database import get_db, get_read_db, pin_session_to_primary
 from src.services.user_service import UserService
 from src.services.passkey_service import PasskeyService
 from src.schemas.user import  UserResponse, UserSession
@@ -136,7 +136,7 @@ def verify_sms_code(
 )
 def get_sms_verification_status(
     phone: str = Path(..., description="Phone number to check verification status for"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     **Get SMS verification status for a phone number**
@@ -226,6 +226,8 @@ def verify_passkey_registration(
         
         if result and result.user_id:
             session_data = UserService.issue_session(result.user_id)
+            # The new user may not have reached the replicas when this cookie authenticates the next GET
+            pin_session_to_primary(session_data["session_token"])
 
             response.set_cookie(
                 key="session_token",
@@ -351,7 +353,7 @@ def verify_passkey_login(
 def get_user_passkeys(
     user_id: int = Path(..., description="User ID to get passkeys for"), 
     current_user = Depends(RequireOwnership), 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all passkey credentials for a user. Requires authentication and ownership verification.
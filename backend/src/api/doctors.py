@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Path
 from src.api.constants import AUTH_ERROR_RESPONSES
+from src.api.pagination import PageParams, send_page
 from sqlalchemy.orm import Session
 from typing import List
 
-from src.db.database import get_db
+from src.db.database import cache_fill_session, get_db, get_read_db, on_commit
 from src.core.auth_middleware import RequireAdmin
 from src.services.doctor_service import DoctorService
+from src.services.pagination import page_payload
 from src.schemas.doctor import DoctorCreate, DoctorUpdate, DoctorResponse
-from src.utils.cache import Cache
+from src.utils.cache import Cache, doctors_tag
 
 router = APIRouter(prefix="/doctors", tags=["Doctors"])
 
@@ -33,47 +35,39 @@ def create_doctor(
     try:
         result = DoctorService.create_doctor(db, doctor)
         # Invalidate all doctors cache
-        Cache.delete("doctors_all")
+        on_commit(db, Cache.invalidate_tags, doctors_tag())
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/", response_model=List[DoctorResponse], responses={200: {"description": "List of all doctors."}})
-def get_all_doctors(db: Session = Depends(get_db)):
+def get_all_doctors(response: Response, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
     """
-    Get all doctors. Results are cached for 5 minutes.
+    List doctors, one page at a time. Pages are cached for 5 minutes.
     
     Supports US9 and US11 by providing access to doctor lists for users and families.
     """
-    cache_key = "doctors_all"
-    cached_doctors = Cache.get(cache_key)
-    if cached_doctors:
-        return cached_doctors
-    doctors = DoctorService.get_all_doctors(db)
-    doctors_data = [DoctorResponse.model_validate(doc) for doc in doctors]
-    Cache.set(cache_key, [doc.model_dump() for doc in doctors_data], expiry=300)
-    return doctors_data
+    def load_doctors():
+        with cache_fill_session(db) as source:
+            doctors = DoctorService.get_doctors_page(source, page.limit, page.cursor)
+            return page_payload(doctors, DoctorResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key("doctors_all"), load_doctors, expiry=300, tags=[doctors_tag()]))
 
 @router.get("/{doctor_id}", response_model=DoctorResponse, responses={200: {"description": "Doctor found."}, 404: {"description": "Doctor not found."}})
 def get_doctor_by_id(
     doctor_id: int = Path(..., description="ID of the doctor to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get a doctor by ID. Results are cached for 5 minutes.
+    Get a doctor by ID. Served from the entity cache.
     
     Supports US9 and US11 by letting users and families review doctor details for appointments and consultations.
     """
-    cache_key = f"doctor_{doctor_id}"
-    cached_doctor = Cache.get(cache_key)
-    if cached_doctor:
-        return cached_doctor
-    doctor = DoctorService.get_doctor(db, doctor_id)
+    doctor = DoctorService.get_doctor_cached(db, doctor_id)
     if not doctor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
-    doctor_data = DoctorResponse.model_validate(doctor)
-    Cache.set(cache_key, doctor_data.model_dump(), expiry=300)
-    return doctor_data
+    return doctor
 
 @router.put(
     "/{doctor_id}",
@@ -98,9 +92,8 @@ def update_doctor(
     doctor = DoctorService.update_doctor(db, doctor_id, doctor_update)
     if not doctor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
-    # Invalidate caches
-    Cache.delete("doctors_all")
-    Cache.delete(f"doctor_{doctor_id}")
+    # The doctor's own entry is kept current by DoctorService
+    on_commit(db, Cache.invalidate_tags, doctors_tag())
     return doctor
 
 @router.delete(
@@ -121,13 +114,12 @@ def delete_doctor(
     
     Supports US9 and US11 by allowing removal of outdated or incorrect doctor records.
     """
-    doctor = DoctorService.get_doctor(db, doctor_id)
+    doctor = DoctorService.get_doctor_cached(db, doctor_id)
     if not doctor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
     success = DoctorService.delete_doctor(db, doctor_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
-    # Invalidate caches
-    Cache.delete("doctors_all")
-    Cache.delete(f"doctor_{doctor_id}")
+    # The doctor's own entry is kept current by DoctorService
+    on_commit(db, Cache.invalidate_tags, doctors_tag())
     return {"message": "Doctor deleted successfully"}
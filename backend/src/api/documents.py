@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Cookie, UploadFile, File
 from src.api.constants import AUTH_ERROR_RESPONSES
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie, UploadFile, File, Path
+from src.api.pagination import PageParams, send_page
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Cookie, UploadFile, File, Path
 from sqlalchemy.orm import Session
 from typing import List, Optional, Annotated
 
-from src.db.database import get_db
+from src.db.database import cache_fill_session, get_db, get_read_db, on_commit
 from src.core.auth_middleware import RequireAdminOrOwnership, RequireAdminOrUser, RequireAuth
 from src.core.config import settings
 from src.services.document_service import DocumentService
+from src.services.pagination import page_payload
 from src.services.storage_service import upload_file_to_s3
 from src.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse, DocumentUploadResponse
-from src.utils.cache import Cache
+from src.utils.cache import Cache, user_tag
 from src.models.user import User
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
@@ -110,41 +112,41 @@ def create_document(
     
     try:
         result = DocumentService.create_document(db, document)
-        Cache.delete(f"documents_user_{document.user_id}")
+        on_commit(db, Cache.invalidate_tags, user_tag(document.user_id))
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/user/{user_id}", response_model=List[DocumentResponse], responses={200: {"description": "List of documents for the user."}, 404: {"description": "User not found."}})
 def get_documents_by_user(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to get documents for"),
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all documents for a user. Results are cached for 5 minutes.
+    List a user's documents, one page at a time. Pages are cached for 5 minutes.
     
     Supports US5 and US9 by providing access to digital medical reports for users and doctors.
     """
-    cache_key = f"documents_user_{user_id}"
-    cached_documents = Cache.get(cache_key)
-    if cached_documents:
-        return cached_documents
-    documents = DocumentService.get_documents_by_user(db, user_id)
-    documents_data = [DocumentResponse.model_validate(doc) for doc in documents]
-    Cache.set(cache_key, [doc.model_dump() for doc in documents_data], expiry=300)
-    return documents_data
+    def load_documents():
+        with cache_fill_session(db) as source:
+            documents = DocumentService.get_documents_page(source, user_id, page.limit, page.cursor)
+            return page_payload(documents, DocumentResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key(f"documents_user_{user_id}"), load_documents, expiry=300, tags=[user_tag(user_id)]))
 
 @router.get("/{document_id}", response_model=DocumentResponse, responses={200: {"description": "Document found."}, 404: {"description": "Document not found."}})
 def get_document_by_id(
     document_id: int = Path(..., description="ID of the document to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get a document by its ID.
+    Get a document by its ID. Served from the entity cache.
     
     Supports US5 and US9 by letting users and doctors review specific medical documents.
     """
-    document = DocumentService.get_document(db, document_id)
+    document = DocumentService.get_document_cached(db, document_id)
     if not document:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     return document
@@ -172,7 +174,7 @@ def update_document(
     document = DocumentService.update_document(db, document_id, document_update)
     if not document:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
-    Cache.delete(f"documents_user_{document.user_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(document.user_id))
     return document
 
 @router.delete(
@@ -193,11 +195,11 @@ def delete_document(
     
     Supports US5 by allowing removal of outdated or incorrect medical documents.
     """
-    document = DocumentService.get_document(db, document_id)
+    document = DocumentService.get_document_cached(db, document_id)
     if not document:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     success = DocumentService.delete_document(db, document_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
-    Cache.delete(f"documents_user_{document.user_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(document.user_id))
     return {"message": "Document deleted successfully"}
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Cookie, Path
 from src.api.constants import AUTH_ERROR_RESPONSES
+from src.api.pagination import PageParams, send_page
 from sqlalchemy.orm import Session
 from typing import List, Optional, Annotated
 
-from src.db.database import get_db
+from src.db.database import cache_fill_session, get_db, get_read_db, on_commit
 from src.core.auth_middleware import RequireAdminOrOwnership, RequireAdminOrUser
 from src.services.emergency_contact_service import EmergencyContactService
+from src.services.pagination import page_payload
 from src.schemas.emergency_contact import EmergencyContactCreate, EmergencyContactUpdate, EmergencyContactResponse
-from src.utils.cache import Cache
+from src.utils.cache import Cache, user_tag
 
 
 router = APIRouter(prefix="/emergency-contacts", tags=["Emergency Contacts"])
@@ -40,8 +42,8 @@ def create_contact(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Maximum of 5 emergency contacts allowed per user.")
     try:
         result = EmergencyContactService.create_contact(db, contact)
-        # Clear cache for this user's contacts
-        Cache.delete(f"emergency_contacts_user_{contact.user_id}")
+        # Clear cache entries tied to this user
+        on_commit(db, Cache.invalidate_tags, user_tag(contact.user_id))
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -55,22 +57,22 @@ def create_contact(
     }
 )
 def get_contacts_by_user(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to retrieve contacts for"),
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all emergency contacts for a user. Results are cached for 5 minutes.
+    List a user's emergency contacts, one page at a time. Pages are cached for 5 minutes.
     
     Supports US4 and US8 by providing access to emergency contacts for alerting in emergencies.
     """
-    cache_key = f"emergency_contacts_user_{user_id}"
-    cached_contacts = Cache.get(cache_key)
-    if cached_contacts:
-        return cached_contacts
-    contacts = EmergencyContactService.get_contacts_by_user(db, user_id)
-    contacts_data = [EmergencyContactResponse.model_validate(contact) for contact in contacts]
-    Cache.set(cache_key, [contact.model_dump() for contact in contacts_data], expiry=300)
-    return contacts_data
+    def load_contacts():
+        with cache_fill_session(db) as source:
+            contacts = EmergencyContactService.get_contacts_page(source, user_id, page.limit, page.cursor)
+            return page_payload(contacts, EmergencyContactResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key(f"emergency_contacts_user_{user_id}"), load_contacts, expiry=300, tags=[user_tag(user_id)]))
 
 @router.get(
     "/{contact_id}",
@@ -82,14 +84,14 @@ def get_contacts_by_user(
 )
 def get_contact_by_id(
     contact_id: int = Path(..., description="ID of the emergency contact to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Retrieve an emergency contact by its unique ID.
+    Retrieve an emergency contact by its unique ID. Served from the entity cache.
     
     Supports US4 by letting users and caregivers review emergency contact details.
     """
-    contact = EmergencyContactService.get_contact_by_id(db, contact_id)
+    contact = EmergencyContactService.get_contact_cached(db, contact_id)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
     return contact
@@ -117,8 +119,8 @@ def update_contact(
     contact = EmergencyContactService.update_contact(db, contact_id, contact_update)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
-    # Clear cache for this user's contacts
-    Cache.delete(f"emergency_contacts_user_{contact.user_id}")
+    # Clear cache entries tied to this user
+    on_commit(db, Cache.invalidate_tags, user_tag(contact.user_id))
     return contact
 
 @router.delete(
@@ -139,12 +141,12 @@ def delete_contact(
     
     Supports US4 by allowing removal of outdated or incorrect emergency contacts.
     """
-    contact = EmergencyContactService.get_contact_by_id(db, contact_id)
+    contact = EmergencyContactService.get_contact_cached(db, contact_id)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
     success = EmergencyContactService.delete_contact(db, contact_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
-    # Clear cache for this user's contacts
-    Cache.delete(f"emergency_contacts_user_{contact.user_id}")
+    # Clear cache entries tied to this user
+    on_commit(db, Cache.invalidate_tags, user_tag(contact.user_id))
     return {"message": "Contact deleted successfully"}
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Cookie, File, UploadFile, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Cookie, File, UploadFile, Path
 from src.api.constants import AUTH_ERROR_RESPONSES
+from src.api.pagination import PageParams, send_page
 from sqlalchemy.orm import Session
 from typing import List, Optional, Annotated
 
-from src.db.database import get_db
+from src.db.database import cache_fill_session, get_db, get_read_db, on_commit
 from src.core.auth_middleware import RequireAdminOrOwnership, RequireAdminOrUser
 from src.services.medicine_service import MedicineService
+from src.services.pagination import page_payload
 from src.services.reminder_service import ReminderService
 from src.services.ai_service import AIService
 from src.schemas.medicine import MedicineCreate, MedicineUpdate, MedicineResponse, MedicineTranscriptionResponse
-from src.utils.cache import Cache
+from src.utils.cache import Cache, user_tag
+from src.models.medicine import Medicine
 from src.models.user import User
 
 router = APIRouter(prefix="/medicines", tags=["Medicines"])
@@ -67,48 +70,52 @@ def create_medicine(
     RequireAdminOrUser(user_id=medicine.user_id,session_token=session_token, db=db)
     
     try:
+        # Resolved before the first flush: the AI fallback must not run inside the write transaction
+        pattern = ReminderService.medicine_frequency_pattern(Medicine(**medicine.model_dump()))
+
         result = MedicineService.create_medicine(db, medicine)
 
         ReminderService.auto_create_medicine_reminders(
             db,
             result,
+            pattern=pattern,
         )
 
-        Cache.delete(f"medicines_user_{medicine.user_id}")
+        on_commit(db, Cache.invalidate_tags, user_tag(medicine.user_id))
         return result
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/user/{user_id}", response_model=List[MedicineResponse], responses={200: {"description": "List of medicines for the user."}, 404: {"description": "User not found."}})
 def get_medicines_by_user(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to get medicines for"),
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db)
 ):
     """
-    List all medicines for a user. Results are cached for 5 minutes.
+    List a user's medicines, one page at a time. Pages are cached for 5 minutes.
     
     Supports US2 and US6 by providing medicine lists for management and adherence tracking.
     """
-    cache_key = f"medicines_user_{user_id}"
-    cached_medicines = Cache.get(cache_key)
-    if cached_medicines:
-        return cached_medicines
-    medicines = MedicineService.get_medicines_by_user(db, user_id)
-    medicines_data = [MedicineResponse.model_validate(med) for med in medicines]
-    Cache.set(cache_key, [med.model_dump() for med in medicines_data], expiry=300)
-    return medicines_data
+    def load_medicines():
+        with cache_fill_session(db) as source:
+            medicines = MedicineService.get_medicines_page(source, user_id, page.limit, page.cursor)
+            return page_payload(medicines, MedicineResponse)
+
+    return send_page(response, lambda: Cache.get_or_load(page.cache_key(f"medicines_user_{user_id}"), load_medicines, expiry=300, tags=[user_tag(user_id)]))
 
 @router.get("/{medicine_id}", response_model=MedicineResponse, responses={200: {"description": "Medicine found."}, 404: {"description": "Medicine not found."}})
 def get_medicine_by_id(
     medicine_id: int = Path(..., description="ID of the medicine to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get a medicine by its ID.
+    Get a medicine by its ID. Served from the entity cache.
     
     Supports US2 by letting users and caregivers review specific medicine details.
     """
-    medicine = MedicineService.get_medicine(db, medicine_id)
+    medicine = MedicineService.get_medicine_cached(db, medicine_id)
     if not medicine:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medicine not found")
     return medicine
@@ -136,7 +143,7 @@ def update_medicine(
     medicine = MedicineService.update_medicine(db, medicine_id, medicine_update)
     if not medicine:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medicine not found")
-    Cache.delete(f"medicines_user_{medicine.user_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(medicine.user_id))
     return medicine
 
 @router.delete(
@@ -157,11 +164,11 @@ def delete_medicine(
     
     Supports US2 by allowing removal of outdated or incorrect medicines from the user's profile.
     """
-    medicine = MedicineService.get_medicine(db, medicine_id)
+    medicine = MedicineService.get_medicine_cached(db, medicine_id)
     if not medicine:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medicine not found")
     success = MedicineService.delete_medicine(db, medicine_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medicine not found")
-    Cache.delete(f"medicines_user_{medicine.user_id}")
+    on_commit(db, Cache.invalidate_tags, user_tag(medicine.user_id))
     return {"message": "Medicine deleted successfully"}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from src.api.constants import AUTH_ERROR_RESPONSES
+
+from src.core.auth_middleware import RequireAdmin
+from src.utils.cache import Cache
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    responses={
+        200: {"description": "Metrics in Prometheus text exposition format."},
+        **AUTH_ERROR_RESPONSES
+    }
+)
+def get_metrics(isAdmin = Depends(RequireAdmin)):
+    """
+    Cache metrics for monitoring. Requires admin authentication.
+
+    Reports hits, misses, writes, deletes, errors, payload bytes and p50/p99 latency per cache key prefix, plus a sampled list of the hottest keys (session and verification keys are hashed).
+    """
+    return PlainTextResponse(Cache.prometheus_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,40 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Query, Response, status
+
+from src.core.config import settings
+from src.services.pagination import InvalidCursor, page_cache_key
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """limit/cursor query parameters shared by the list endpoints"""
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of results to return"),
+        cursor: Optional[str] = Query(None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} response header (empty once the list is complete)"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+    def cache_key(self, base: str) -> str:
+        return page_cache_key(base, self.limit, self.cursor)
+
+
+def send_page(response: Response, load: Callable[[], Dict[str, Any]]) -> List[Any]:
+    """
+    Run a page loader and return its items
+
+    The next cursor travels in the X-Next-Cursor header so the body stays a
+    plain list for existing clients; a malformed cursor is a 400. The header
+    is sent on every page, empty on the last one, so a client can always tell
+    a complete list from the first page of a longer one.
+    """
+    try:
+        payload = load()
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers[NEXT_CURSOR_HEADER] = payload["next_cursor"] or ""
+    return payload["items"]
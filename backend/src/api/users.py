@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from src.api.constants import AUTH_ERROR_RESPONSES
+from src.api.pagination import PageParams, send_page
 from fastapi import Query, Path
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from src.db.database import get_db
+from src.db.database import get_db, get_read_db
+from src.core.config import settings
 from src.services.user_service import UserService
+from src.services.pagination import page_payload
 from src.services.emergency_contact_service import EmergencyContactService
 from src.services.reminder_service import ReminderService
 from src.services.sms_service import get_sms_service
@@ -26,17 +29,16 @@ router = APIRouter(prefix="/users", tags=["Users"])
     }
 )
 def get_users(
-    skip: int = Query(0, description="Number of records to skip for pagination"),
-    limit: int = Query(100, description="Maximum number of users to return"),
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of records to skip for pagination; ignored with a cursor"),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user = Depends(RequireAdminOrUser)
 ):
     """
-    List all users. Returns a paginated list. Requires authentication. Results are cached for 5 minutes.
+    List all users in ID order. Returns a paginated list; follow the X-Next-Cursor header for the next page. Requires authentication.
     """
-    users = UserService.get_users(db, skip=skip, limit=limit)
-    users_data = [UserResponse.model_validate(user) for user in users]
-    return users_data
+    return send_page(response, lambda: page_payload(UserService.get_users_page(db, page.limit, page.cursor, skip=skip), UserResponse))
 
 @router.get(
     "/{user_id}",
@@ -47,7 +49,7 @@ def get_users(
 )
 def get_user(
     user_id: int = Path(..., description="ID of the user to retrieve"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user = Depends(RequireOwnership)
 ):
     """
@@ -134,31 +136,29 @@ def trigger_sos(
     }
 )
 def get_user_reminders(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to get reminders for"),
     include_inactive: bool = Query(False, description="Whether to include inactive/cancelled reminders"),
-    limit: int = Query(100, description="Maximum number of reminders to return"),
-    skip: int = Query(0, description="Number of reminders to skip for pagination"),
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of reminders to return"),
+    skip: int = Query(0, ge=0, description="Number of reminders to skip for pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor header; takes precedence over skip"),
+    db: Session = Depends(get_read_db),
     user = Depends(RequireOwnership)
 ):
     """
-    Get all reminders for a user. Returns past, current and future reminders.
+    Get all reminders for a user. Returns past, current and future reminders, newest first.
     Only the user can access their own reminders.
     
     Query parameters:
     - include_inactive: Include cancelled/inactive reminders (default: false)
     - limit: Maximum number of results (default: 100)
     - skip: Number of results to skip for pagination (default: 0)
+    - cursor: Continue after the previous page; each response carries an X-Next-Cursor header, empty on the last page
     """
-    reminders = ReminderService.get_reminders_by_user(
-        db, 
-        user_id, 
-        include_inactive=include_inactive
-    )
-    
-    paginated_reminders = reminders[skip:skip + limit]
-    
-    return [ReminderResponse.model_validate(reminder) for reminder in paginated_reminders]
+    return send_page(response, lambda: page_payload(
+        ReminderService.get_reminders_page(db, user_id, include_inactive=include_inactive, limit=limit, skip=skip, cursor=cursor),
+        ReminderResponse,
+    ))
 
 @router.get(
     "/{user_id}/reminders/past",
@@ -168,22 +168,18 @@ def get_user_reminders(
     }
 )
 def get_user_past_reminders(
+    response: Response,
     user_id: int = Path(..., description="ID of the user to get pending reminders for"),
-    limit: int = Query(50, description="Maximum number of reminders to return"),
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of reminders to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor header"),
+    db: Session = Depends(get_read_db),
     user = Depends(RequireOwnership)
 ):
     """
-    Get only past reminders for a user, that have already occurred.
+    Get only past reminders for a user, that have already occurred, newest first.
     Only the user can access their own reminders.
     """
-    reminders = ReminderService.get_reminders_by_user(
-        db, 
-        user_id
-    )
-
-    reminders = [rem for rem in reminders if rem.scheduled_time < datetime.now() and rem.is_active]
-    
-    limited_reminders = reminders[:limit]
-    
-    return [ReminderResponse.model_validate(reminder) for reminder in limited_reminders]
\ No newline at end of file
+    return send_page(response, lambda: page_payload(
+        ReminderService.get_reminders_page(db, user_id, limit=limit, cursor=cursor, before=datetime.now()),
+        ReminderResponse,
+    ))
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional, Annotated, Any
 import inspect
 
-from src.db.database import get_db
+from src.db.database import get_request_db
 from src.services.user_service import UserService
 from src.services.document_service import DocumentService
 from src.services.emergency_contact_service import EmergencyContactService 
@@ -18,7 +18,7 @@ class AuthMiddleware:
     @staticmethod
     def get_current_user(
         session_token: Annotated[Optional[str], Cookie()] = None,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_request_db)
     ) -> User:
         """
         Dependency to get current authenticated user from session cookie
@@ -44,7 +44,7 @@ class AuthMiddleware:
     @staticmethod
     def get_current_user_optional(
         session_token: Annotated[Optional[str], Cookie()] = None,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_request_db)
     ) -> Optional[User]:
         """
         Dependency to optionally get current authenticated user
@@ -98,7 +98,7 @@ class AuthMiddleware:
     def validate_admin_or_user_ownership(
         request: Request,
         session_token: Annotated[Optional[str], Cookie()] = None,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_request_db)
     ) -> Optional[bool]:
         """
         Dependency to validate that current user is either an admin or owns the resource
@@ -137,17 +137,17 @@ class AuthMiddleware:
             
         # Check ownership for existing resources
         if document_id:
-            document = DocumentService.get_document(db, int(document_id))
+            document = DocumentService.get_document_cached(db, int(document_id))
             if document and document.user_id == current_user.id:
                 return True
             
         if contact_id:
-            contact = EmergencyContactService.get_contact_by_id(db, int(contact_id))
+            contact = EmergencyContactService.get_contact_cached(db, int(contact_id))
             if contact and contact.user_id == current_user.id:
                 return True
             
         if medicine_id:
-            medicine = MedicineService.get_medicine(db, int(medicine_id))
+            medicine = MedicineService.get_medicine_cached(db, int(medicine_id))
             if medicine and medicine.user_id == current_user.id:
                 return True
         
@@ -161,7 +161,7 @@ class AuthMiddleware:
     def validate_admin_or_user(
         user_id: int = None,
         session_token: Annotated[Optional[str], Cookie()] = None,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_request_db)
     ) -> Optional[bool]:
         """
         Dependency to validate that current user is either an admin or owns the resource
@@ -16,6 +16,28 @@ class Settings:
     POSTGRES_DB = os.getenv("POSTGRES_DB", "college_project")
     POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
+
+    # Connection pool (PostgreSQL only; applies to the sync and async engines, per worker)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
+    # Read replicas for GET endpoints (comma-separated URLs; empty means every read goes to the primary)
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    DB_PRIMARY_STICKY_SECONDS = int(os.getenv("DB_PRIMARY_STICKY_SECONDS", "5"))  # reads stay on the primary this long after a write
+
+    # SQLite profile for single-node deployments (pragmas applied to every connection)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL lets readers run alongside the writer
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable across app crashes in WAL mode
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # wait this long for another process's write lock
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # page cache per connection
+    SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))  # 0 disables memory-mapped reads
+    SQLITE_SINGLE_WRITER = os.getenv("SQLITE_SINGLE_WRITER", "True").lower() == "true"  # queue writers in-process instead of spinning on SQLITE_BUSY
+
+    # Startup schema check against the Alembic head (error, warn or off; see src/db/schema.py)
+    SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "error")
     
     @property
     def postgres_url(self) -> str:
@@ -31,10 +53,64 @@ class Settings:
     def is_postgres(self) -> bool:
         """Check if using PostgreSQL database"""
         return self.DATABASE_URL.startswith("postgresql")
+
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL with its async driver (psycopg 3 for PostgreSQL, aiosqlite for SQLite)"""
+        url = os.getenv("ASYNC_DATABASE_URL")
+        if url:
+            return url
+        scheme, _, rest = self.DATABASE_URL.partition("://")
+        if scheme.startswith("postgresql"):
+            return f"postgresql+psycopg://{rest}"
+        if scheme.startswith("sqlite"):
+            return f"sqlite+aiosqlite://{rest}"
+        return self.DATABASE_URL
     
-    # Redis
+    # Redis (memory:// for a single-node in-process backend, fakeredis:// for tests)
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))  # per pool, per worker
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2"))
+
+    # In-process cache tier in front of Redis (per worker)
+    CACHE_LOCAL_ENABLED = os.getenv("CACHE_LOCAL_ENABLED", "False").lower() == "true"
+    CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+    CACHE_LOCAL_TTL_SECONDS = int(os.getenv("CACHE_LOCAL_TTL_SECONDS", "30"))
+    CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+    CACHE_CODEC = os.getenv("CACHE_CODEC", "orjson")  # orjson or msgpack
+    CACHE_SCAN_BATCH_SIZE = int(os.getenv("CACHE_SCAN_BATCH_SIZE", "500"))
+    CACHE_TAG_TTL_SECONDS = int(timedelta(days=1).total_seconds())
+    CACHE_ENTITY_TTL_SECONDS = int(os.getenv("CACHE_ENTITY_TTL_SECONDS", "300"))  # single-row entries written through by services
+
+    # Stampede protection for cached loaders
+    CACHE_LOCK_TIMEOUT_SECONDS = int(os.getenv("CACHE_LOCK_TIMEOUT_SECONDS", "10"))  # max time one worker may hold a recompute lock
+    CACHE_LOCK_WAIT_SECONDS = float(os.getenv("CACHE_LOCK_WAIT_SECONDS", "2"))  # how long other workers wait for the result
+    CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))  # >1 refreshes earlier, <1 later
+
+    # Circuit breaker and in-memory fallback used while Redis is unreachable
+    CACHE_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CACHE_BREAKER_FAILURE_THRESHOLD", "5"))
+    CACHE_BREAKER_WINDOW_SECONDS = float(os.getenv("CACHE_BREAKER_WINDOW_SECONDS", "10"))
+    CACHE_BREAKER_RESET_SECONDS = float(os.getenv("CACHE_BREAKER_RESET_SECONDS", "30"))  # time before probing Redis again
+    CACHE_FALLBACK_MAX_ENTRIES = int(os.getenv("CACHE_FALLBACK_MAX_ENTRIES", "10000"))  # also caps the outage journal; past it, recovery clears every cached key and session
+
+    # Cache instrumentation exposed on /api/v1/metrics
+    CACHE_METRICS_ENABLED = os.getenv("CACHE_METRICS_ENABLED", "True").lower() == "true"
+    CACHE_METRICS_LATENCY_SAMPLES = int(os.getenv("CACHE_METRICS_LATENCY_SAMPLES", "1024"))  # per prefix and operation
+    CACHE_HOT_KEY_SAMPLE_RATE = float(os.getenv("CACHE_HOT_KEY_SAMPLE_RATE", "0.01"))
+    CACHE_HOT_KEY_TOP_N = int(os.getenv("CACHE_HOT_KEY_TOP_N", "20"))
+
+    # Cache warm-up at startup (see src/utils/cache_warmup.py)
+    CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "True").lower() == "true"
+    CACHE_WARMUP_RECENCY_HOURS = float(os.getenv("CACHE_WARMUP_RECENCY_HOURS", "24"))  # how far back a user counts as recently active
+    CACHE_WARMUP_CONCURRENCY = int(os.getenv("CACHE_WARMUP_CONCURRENCY", "4"))  # users loaded in parallel
+    CACHE_WARMUP_MAX_USERS = int(os.getenv("CACHE_WARMUP_MAX_USERS", "500"))
+    CACHE_WARMUP_TIMEOUT_SECONDS = float(os.getenv("CACHE_WARMUP_TIMEOUT_SECONDS", "60"))  # startup waits at most this long; other workers skip the warm-up meanwhile
+
+    # List endpoints (keyset pagination; see src/services/pagination.py)
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
     # App
     SECRET_KEY = os.getenv("SECRET_KEY")
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
@@ -77,9 +153,23 @@ class Settings:
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
     
     # Reminder System Configuration
-    REMINDER_CHECK_INTERVAL_MINUTES = int(os.getenv("REMINDER_CHECK_INTERVAL_MINUTES", "5"))
+    REMINDER_CHECK_INTERVAL_MINUTES = int(os.getenv("REMINDER_CHECK_INTERVAL_MINUTES", "5"))  # reconcile the dispatch timer with the database
+    REMINDER_TIMER_HORIZON_MINUTES = int(os.getenv("REMINDER_TIMER_HORIZON_MINUTES", "60"))  # pending reminders due this far ahead are held in memory
+    REMINDER_EVENTS_CHANNEL = os.getenv("REMINDER_EVENTS_CHANNEL", "reminder_events")  # schedule changes published to every dispatcher
+    # Reminder worker (`python -m src.workers.reminders`); the API only dispatches reminders itself when embedded
+    REMINDER_SCHEDULER_EMBEDDED = os.getenv("REMINDER_SCHEDULER_EMBEDDED", "False").lower() == "true"
+    REMINDER_WORKER_HEALTH_HOST = os.getenv("REMINDER_WORKER_HEALTH_HOST", "0.0.0.0")
+    REMINDER_WORKER_HEALTH_PORT = int(os.getenv("REMINDER_WORKER_HEALTH_PORT", os.getenv("PORT", "8081")))  # 0 disables the health server
+    REMINDER_WORKER_DRAIN_SECONDS = float(os.getenv("REMINDER_WORKER_DRAIN_SECONDS", "30"))  # on SIGTERM, wait this long for the batch in flight
     REMINDER_CLEANUP_HOUR = int(os.getenv("REMINDER_CLEANUP_HOUR", "2"))
-    REMINDER_CLEANUP_DAYS = int(os.getenv("REMINDER_CLEANUP_DAYS", "30"))
+    REMINDER_CLEANUP_DAYS = int(os.getenv("REMINDER_CLEANUP_DAYS", "30"))  # sent, failed and cancelled reminders older than this are removed
+    REMINDER_CLEANUP_ARCHIVE = os.getenv("REMINDER_CLEANUP_ARCHIVE", "True").lower() == "true"  # move them to reminders_archive rather than deleting
+    REMINDER_CLEANUP_BATCH_SIZE = int(os.getenv("REMINDER_CLEANUP_BATCH_SIZE", "5000"))  # rows per cleanup transaction
+    REMINDER_CLEANUP_PAUSE_SECONDS = float(os.getenv("REMINDER_CLEANUP_PAUSE_SECONDS", "0.5"))  # pause between cleanup transactions
+    REMINDER_CLAIM_BATCH_SIZE = int(os.getenv("REMINDER_CLAIM_BATCH_SIZE", "100"))  # due reminders one dispatcher claims per pass
+    REMINDER_CLAIM_LEASE_SECONDS = int(os.getenv("REMINDER_CLAIM_LEASE_SECONDS", "600"))  # unfinished claims older than this go back to PENDING
+    REMINDER_SEND_CONCURRENCY = int(os.getenv("REMINDER_SEND_CONCURRENCY", "8"))  # messages in flight at once, per dispatcher
+    REMINDER_SEND_RATE_PER_SECOND = float(os.getenv("REMINDER_SEND_RATE_PER_SECOND", "10"))  # per dispatcher; 0 means no cap
 
     # CORS
     ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
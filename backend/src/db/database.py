@@ -1,31 +1,223 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import hashlib
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from src.core.config import settings
+from src.db.sqlite import configure_sqlite_engine
+from src.utils.cache import Cache
 
-# Configure engine based on database type
-if settings.is_sqlite:
-    # SQLite configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=settings.DEBUG
-    )
-else:
+
+def _engine_options() -> dict:
+    """Engine keyword arguments for the configured database"""
+    if settings.is_sqlite:
+        # SQLite configuration
+        return {"connect_args": {"check_same_thread": False}, "echo": settings.DEBUG}
     # PostgreSQL configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        pool_recycle=300,
-        echo=settings.DEBUG
-    )
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "echo": settings.DEBUG,
+    }
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options())
+if settings.is_sqlite:
+    # WAL, tuning pragmas and a single-writer queue (see src/db/sqlite.py)
+    configure_sqlite_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+# Read replicas, used round-robin by get_read_db
+replica_engines = [create_engine(url, **_engine_options()) for url in settings.DATABASE_REPLICA_URLS]
+ReplicaSessionLocals = [sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines]
+_replica_order = itertools.cycle(range(len(ReplicaSessionLocals)))
+_replica_lock = threading.Lock()
+
+
+@event.listens_for(Session, "before_flush")
+def _track_writes(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise RuntimeError("Attempted to write through a read-replica session; use get_db for writes")
+    session.info["has_writes"] = True
+
+
+def on_commit(db: Session, callback: Callable[..., Any], *args: Any) -> None:
+    """
+    Run callback(*args) once the session's transaction commits
+
+    Services only flush; the transaction commits at the end of the request
+    (or wherever the caller commits). Cache writes and invalidations are
+    queued here so they never publish rows a rollback then discards.
+    Queued callbacks are dropped on rollback.
+    """
+    db.info.setdefault("on_commit", []).append((callback, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session):
+    for callback, args in session.info.pop("on_commit", []):
+        callback(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_commit(session):
+    session.info.pop("on_commit", None)
+
+
+def _pin_key(identity: str) -> str:
+    return "db_primary_pin_" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+def _client_pin_key(request: Request) -> Optional[str]:
+    """Cache key that pins one client to the primary; the session cookie (hashed) identifies it, else its address"""
+    identity = request.cookies.get("session_token") or (request.client.host if request.client else None)
+    if not identity:
+        return None
+    return _pin_key(identity)
+
+
+def pin_to_primary(request: Request) -> None:
+    """Send this client's reads to the primary for DB_PRIMARY_STICKY_SECONDS"""
+    key = _client_pin_key(request)
+    if key and ReplicaSessionLocals:
+        Cache.set(key, 1, expiry=settings.DB_PRIMARY_STICKY_SECONDS)
+
+
+def pin_session_to_primary(session_token: str) -> None:
+    """Pin the client that will send this new session cookie; the request that issued it had none"""
+    if ReplicaSessionLocals:
+        Cache.set(_pin_key(session_token), 1, expiry=settings.DB_PRIMARY_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    key = _client_pin_key(request)
+    return bool(key) and Cache.exists(key)
+
+
+def get_db(request: Request = None):
+    """
+    Read-write session and unit of work for one request
+
+    Services flush their changes; the request commits once after the
+    endpoint returns, or rolls everything back if it raised (including
+    HTTPException), so composite operations are atomic.
+    """
     db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+        # Read-your-writes: a client that just wrote keeps reading from the primary for a while
+        if request is not None and db.info.get("has_writes"):
+            pin_to_primary(request)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request = None) -> Iterator[Session]:
+    """
+    Read-only session for GET endpoints
+
+    Load-balances across DATABASE_REPLICA_URLS, falling back to the primary
+    when no replicas are configured or the client wrote within the last
+    DB_PRIMARY_STICKY_SECONDS. Flushing through a replica session raises.
+    """
+    if not ReplicaSessionLocals or (request is not None and is_pinned_to_primary(request)):
+        db = SessionLocal()
+    else:
+        with _replica_lock:
+            index = next(_replica_order)
+        db = ReplicaSessionLocals[index]()
+        db.info["read_only"] = True
     try:
         yield db
     finally:
         db.close()
+
+
+def get_request_db(
+    request: Request,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+) -> Session:
+    """
+    Session for dependencies shared by read and write routes, such as authentication
+
+    GET and HEAD get the request's read session, anything else its unit of
+    work, so objects loaded here can be changed by the endpoint. Sessions
+    only connect on first use, so the other one costs nothing.
+    """
+    return read_db if request.method in ("GET", "HEAD") else db
+
+
+@contextmanager
+def cache_fill_session(db: Session) -> Iterator[Session]:
+    """
+    Session to load values that go into the shared cache
+
+    A replica can lag behind a write whose cache invalidation already ran;
+    caching what it returns would bring the stale rows back for the whole
+    TTL. Replica sessions therefore fill the cache from a short-lived
+    primary session; anything else is used as is.
+    """
+    if not db.info.get("read_only"):
+        yield db
+        return
+    primary = SessionLocal()
+    try:
+        yield primary
+    finally:
+        primary.close()
+
+
+# Async engine, created on first use so sync-only processes never load the async driver
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        options = _engine_options()
+        options.pop("connect_args", None)
+        _async_engine = create_async_engine(settings.async_database_url, **options)
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New AsyncSession bound to the async engine"""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of get_db for routes moved to `async def`"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
@@ -0,0 +1,182 @@
+"""
+Database schema management
+
+The app no longer creates tables when it is imported. Schema changes go
+through Alembic, run once per deploy before the workers start:
+
+    python -m src.db.schema upgrade    # create a fresh database, or migrate to head
+    python -m src.db.schema check      # exit 1 unless the database is at head
+    python -m src.db.schema current
+
+Each worker's startup only calls verify_schema(). That is a single
+`SELECT version_num FROM alembic_version`, compared with the head
+revision parsed from alembic/versions. Alembic is imported only by the
+commands above. Importing it costs a worker about 130 ms, more than
+the check itself.
+"""
+import argparse
+import ast
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from src.core.config import settings
+from src.db.database import Base, engine as default_engine
+import src.models  # noqa: F401  (registers every table on Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the Alembic head revision"""
+
+
+def alembic_config(connection: Optional[Connection] = None) -> "Config":
+    """Alembic config that works from any working directory, optionally bound to an open connection"""
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if connection is not None:
+        # alembic/env.py migrates this connection instead of opening settings.DATABASE_URL
+        config.attributes["connection"] = connection
+    return config
+
+
+def _revision_ids(path: Path) -> tuple:
+    """(revision, down_revisions) assigned at the top of a migration script, read without importing it"""
+    values = {}
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            name, value = node.target.id, node.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name, value = node.targets[0].id, node.value
+        else:
+            continue
+        if name in ("revision", "down_revision") and value is not None:
+            values[name] = ast.literal_eval(value)
+    down = values.get("down_revision")
+    if down is None:
+        down = ()
+    elif isinstance(down, str):
+        down = (down,)
+    return values.get("revision"), tuple(down)
+
+
+def head_revisions() -> Set[str]:
+    """Head revision(s) of the migration scripts: those no other script revises. No database access."""
+    revisions, revised = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        revision, down = _revision_ids(path)
+        if revision:
+            revisions.add(revision)
+            revised.update(down)
+    return revisions - revised
+
+
+def current_revisions(connection: Connection) -> Optional[Set[str]]:
+    """Revision(s) the database is stamped with, or None if it was never stamped"""
+    try:
+        with connection.begin_nested() if connection.in_transaction() else connection.begin():
+            rows = connection.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+    except DBAPIError:
+        return None
+    return set(rows)
+
+
+# The old create-on-import startup built the schema of a89a6e215d69; databases it
+# created once the reminder indexes were in the models (ix_reminders_due) match 5c1e7f2a9b34
+LEGACY_BASELINE_REVISION = "a89a6e215d69"
+LEGACY_INDEXED_REVISION = "5c1e7f2a9b34"
+
+
+def _legacy_revision(connection: Connection) -> str:
+    """Revision matching tables that the old create-on-import startup built"""
+    indexes = {index["name"] for index in inspect(connection).get_indexes("reminders")}
+    return LEGACY_INDEXED_REVISION if "ix_reminders_due" in indexes else LEGACY_BASELINE_REVISION
+
+
+def upgrade(engine: Engine = default_engine) -> str:
+    """
+    Bring the database to head and return what was done.
+
+    An empty database is built from the models and stamped at head. The
+    migration chain assumes tables that only the models create, so it
+    cannot build one from scratch. Tables without an alembic_version
+    table come from the old create-on-import startup: they are stamped at
+    the revision they match, then migrated like any other database.
+    """
+    from alembic import command
+
+    with engine.connect() as connection:
+        existing = set(inspect(connection).get_table_names())
+        config = alembic_config(connection)
+        if not existing:
+            Base.metadata.create_all(connection)
+            command.stamp(config, "head")
+            connection.commit()
+            return "created"
+        legacy = _legacy_revision(connection) if "alembic_version" not in existing else None
+        # Migrations run in Alembic's own transactions; autocommit_block() cannot work inside ours
+        connection.commit()
+        if legacy:
+            logger.warning(f"Database has tables but no alembic_version; stamping {legacy} and migrating from there")
+            command.stamp(config, legacy)
+        command.upgrade(config, "head")
+        return "adopted" if legacy else "upgraded"
+
+
+def verify_schema(engine: Engine = default_engine, mode: Optional[str] = None) -> bool:
+    """
+    Startup check: True if the database is at the head revision.
+
+    mode is SCHEMA_CHECK by default: "error" raises SchemaOutOfDate,
+    "warn" logs and returns False, "off" skips the query.
+    """
+    mode = (mode or settings.SCHEMA_CHECK).lower()
+    if mode == "off":
+        return True
+    with engine.connect() as connection:
+        current = current_revisions(connection)
+    heads = head_revisions()
+    if current == heads:
+        return True
+
+    found = ", ".join(sorted(current)) if current else "no alembic_version"
+    message = (f"Database schema is at {found}, expected {', '.join(sorted(heads))}; "
+               f"run `python -m src.db.schema upgrade` before starting the app")
+    if mode == "error":
+        raise SchemaOutOfDate(message)
+    logger.warning(message)
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create, migrate or check the database schema")
+    parser.add_argument("action", choices=["upgrade", "check", "current"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.action == "upgrade":
+        print(f"Schema {upgrade()}; at {', '.join(sorted(head_revisions()))}")
+    elif args.action == "check":
+        sys.exit(0 if verify_schema(mode="warn") else 1)
+    else:
+        with default_engine.connect() as connection:
+            current = current_revisions(connection)
+        print(", ".join(sorted(current)) if current else "not stamped")
+
+
+if __name__ == "__main__":
+    main()
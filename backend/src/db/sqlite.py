@@ -0,0 +1,120 @@
+"""
+SQLite profile for single-node deployments
+
+Every connection gets WAL journaling plus the tuning pragmas from
+settings. With WAL, readers no longer block the writer's commit, as they
+do with the rollback journal. The driver's implicit transactions are
+switched off, because they break SAVEPOINT, so transactions are begun
+here instead:
+- Reads run in autocommit and always see the latest commit.
+- The first INSERT/UPDATE/DELETE (or SAVEPOINT) of a transaction opens it
+  with BEGIN IMMEDIATE, which takes SQLite's write lock up front.
+- No transaction ever upgrades from reading to writing. SQLite cannot
+  wait out that upgrade; it fails with SQLITE_BUSY straight away.
+
+Within one process, writers queue on a lock held from their first write
+until commit or rollback, instead of polling busy_timeout. The scheduler
+thread and the request threadpool therefore take turns. Across processes
+(several uvicorn workers), busy_timeout does the waiting.
+"""
+import sqlite3
+import threading
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE", "SAVEPOINT")
+
+
+def sqlite_pragmas() -> List[str]:
+    """PRAGMA statements applied to every new connection"""
+    return [
+        f"journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+    ]
+
+
+class WriterLock:
+    """In-process single-writer queue: one connection at a time may hold an open write transaction"""
+
+    def __init__(self, timeout: float):
+        self._lock = threading.Lock()
+        self.timeout = timeout
+
+    def acquire(self) -> None:
+        if not self._lock.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("database is locked (timed out waiting for the writer lock)")
+
+    def release(self) -> None:
+        self._lock.release()
+
+
+def _is_write(statement: str) -> bool:
+    return statement.lstrip()[:9].upper().startswith(_WRITE_PREFIXES)
+
+
+def configure_sqlite_engine(engine: Engine, single_writer: Optional[bool] = None) -> Optional[WriterLock]:
+    """Apply the SQLite profile to engine; returns its writer lock (None when SQLITE_SINGLE_WRITER is off)"""
+    if single_writer is None:
+        single_writer = settings.SQLITE_SINGLE_WRITER
+    writer_lock = WriterLock(settings.SQLITE_BUSY_TIMEOUT_MS / 1000) if single_writer else None
+
+    def release(record_info: dict) -> None:
+        if record_info.pop("holds_writer_lock", False):
+            writer_lock.release()
+
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        # Transactions are begun by _begin_write, not implicitly by the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _begin_write(conn, cursor, statement, parameters, context, executemany):
+        dbapi_connection = conn.connection.dbapi_connection
+        if dbapi_connection.in_transaction or not _is_write(statement):
+            return
+        if writer_lock is not None:
+            writer_lock.acquire()
+            conn.info["holds_writer_lock"] = True
+        try:
+            dbapi_connection.execute("BEGIN IMMEDIATE")
+        except Exception:
+            if writer_lock is not None:
+                release(conn.info)
+            raise
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        # Commit here so the lock is only handed over once the write is durable;
+        # the driver's own commit that follows is then a no-op
+        try:
+            conn.connection.dbapi_connection.commit()
+        finally:
+            if writer_lock is not None:
+                release(conn.info)
+
+    @event.listens_for(engine, "rollback")
+    def _rollback(conn):
+        try:
+            conn.connection.dbapi_connection.rollback()
+        finally:
+            if writer_lock is not None:
+                release(conn.info)
+
+    if writer_lock is not None:
+        @event.listens_for(engine, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            # A connection returned mid-transaction has just been rolled back by the pool
+            release(connection_record.info)
+
+    return writer_lock
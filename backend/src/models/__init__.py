@@ -1,6 +1,6 @@
 from .user import User
 from .passkey import PasskeyCredential
-from .reminder import Reminder
+from .reminder import Reminder, ReminderArchive
 from .appointment import Appointment
 from .doctor import Doctor
 from .medicine import Medicine
@@ -11,6 +11,7 @@ __all__ = [
     "User", 
     "PasskeyCredential", 
     "Reminder", 
+    "ReminderArchive", 
     "Appointment", 
     "Doctor", 
     "Medicine", 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from src.db.database import Base
 import enum
@@ -12,6 +12,7 @@ class ReminderType(enum.Enum):
 class ReminderStatus(enum.Enum):
     """Enum for reminder status."""
     PENDING = "pending"
+    PROCESSING = "processing"  # claimed by a dispatcher, see ReminderService.claim_due_reminders
     SENT = "sent"
     FAILED = "failed"
     CANCELLED = "cancelled"
@@ -20,7 +21,8 @@ class Reminder(Base):
     """
     Reminder Model
     Fields: id, user_id, reminder_type, related_id, title, message, 
-            scheduled_time, status, created_at, updated_at, is_active
+            scheduled_time, status, created_at, updated_at, is_active,
+            claimed_by, claimed_at
     """
     __tablename__ = "reminders"
 
@@ -35,9 +37,60 @@ class Reminder(Base):
     created_at = Column(DateTime, default=datetime.now, nullable=False)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False, index=True)
+    # Dispatcher holding the reminder while it is PROCESSING, and when it claimed it
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
 
     # Relationships
     user = relationship("User", backref="reminders")
 
+    __table_args__ = (
+        # Due-reminder scan: only pending, active rows in scheduled order.
+        # Enum columns store member names, hence 'PENDING' rather than 'pending'.
+        Index(
+            "ix_reminders_due",
+            "scheduled_time",
+            postgresql_where=text("status = 'PENDING' AND is_active"),
+            sqlite_where=text("status = 'PENDING' AND is_active = 1"),
+        ),
+        # Per-user listings ordered and paginated on (scheduled_time, id)
+        Index("ix_reminders_user_schedule", "user_id", "scheduled_time", "id"),
+        # Lease recovery: claims in flight, oldest first
+        Index(
+            "ix_reminders_claimed",
+            "claimed_at",
+            postgresql_where=text("status = 'PROCESSING'"),
+            sqlite_where=text("status = 'PROCESSING'"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Reminder(id={self.id}, user_id={self.user_id}, type={self.reminder_type.value}, status={self.status.value})>"
+
+
+class ReminderArchive(Base):
+    """
+    Finished reminders moved out of `reminders` by the retention job,
+    see ReminderService.archive_finished_reminders. Same columns plus archived_at;
+    user_id carries no foreign key so users can still be deleted.
+    """
+    __tablename__ = "reminders_archive"
+
+    # Keeps the id the reminder had
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False, index=True)
+    reminder_type = Column(Enum(ReminderType), nullable=False)
+    related_id = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=True)
+    scheduled_time = Column(DateTime, nullable=False)
+    status = Column(Enum(ReminderStatus), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.now, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ReminderArchive(id={self.id}, user_id={self.user_id}, status={self.status.value})>"
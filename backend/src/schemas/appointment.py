@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 import datetime
 
@@ -30,6 +30,14 @@ class AppointmentResponse(AppointmentBase):
     doctor_id: int = Field(..., example=1, description="Doctor ID for the appointment")
     medicines: Optional[List[int]] = Field(None, description="List of medicine IDs for this appointment (optional)")
 
+    @field_validator('medicines', mode='before')
+    @classmethod
+    def medicine_ids(cls, v):
+        """Accept the ORM relationship and keep only the medicine IDs"""
+        if v is None:
+            return v
+        return [getattr(medicine, 'id', medicine) for medicine in v]
+
     class Config:
         from_attributes = True
         json_schema_extra = {
@@ -1,35 +1,59 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from src.models.appointment import Appointment
-from src.schemas.appointment import AppointmentCreate, AppointmentUpdate
+from src.schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import Page, paginate
 from src.models.medicine import Medicine
 
 class AppointmentService:
     """Service class for Appointment CRUD operations."""
 
+    @staticmethod
+    def _query(db: Session):
+        """Appointments with the medicine IDs the response schema serializes, loaded in one extra query per page."""
+        return db.query(Appointment).options(selectinload(Appointment.medicines))
+
     @staticmethod
     def create_appointment(db: Session, appointment_in: AppointmentCreate) -> Appointment:
         """Create a new appointment record."""
         appointment = Appointment(**appointment_in.model_dump())
         db.add(appointment)
-        db.commit()
-        db.refresh(appointment)
+        db.flush()
+        EntityCache.put_on_commit(db, appointment)
         return appointment
 
     @staticmethod
     def get_appointment(db: Session, appointment_id: int) -> Optional[Appointment]:
         """Get an appointment by ID."""
-        return db.query(Appointment).filter(Appointment.id == appointment_id).first()
+        return AppointmentService._query(db).filter(Appointment.id == appointment_id).first()
+
+    @staticmethod
+    def get_appointment_cached(db: Session, appointment_id: int) -> Optional[AppointmentResponse]:
+        """Get an appointment by its ID through the entity cache."""
+        return EntityCache.get_or_load(Appointment, appointment_id, db, lambda session: AppointmentService.get_appointment(session, appointment_id))
 
     @staticmethod
     def get_appointments_by_user(db: Session, user_id: int) -> List[Appointment]:
         """Get all appointments for a user."""
-        return db.query(Appointment).filter(Appointment.user_id == user_id).all()
+        return AppointmentService._query(db).filter(Appointment.user_id == user_id).all()
 
     @staticmethod
     def get_appointments_by_doctor(db: Session, doctor_id: int) -> List[Appointment]:
         """Get all appointments for a doctor."""
-        return db.query(Appointment).filter(Appointment.doctor_id == doctor_id).all()
+        return AppointmentService._query(db).filter(Appointment.doctor_id == doctor_id).all()
+
+    @staticmethod
+    def get_appointments_page_by_user(db: Session, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a user's appointments in schedule order."""
+        query = AppointmentService._query(db).filter(Appointment.user_id == user_id)
+        return paginate(query, [Appointment.date, Appointment.time, Appointment.id], limit=limit, cursor=cursor)
+
+    @staticmethod
+    def get_appointments_page_by_doctor(db: Session, doctor_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a doctor's appointments in schedule order."""
+        query = AppointmentService._query(db).filter(Appointment.doctor_id == doctor_id)
+        return paginate(query, [Appointment.date, Appointment.time, Appointment.id], limit=limit, cursor=cursor)
 
     @staticmethod
     def update_appointment(db: Session, appointment_id: int, appointment_in: AppointmentUpdate) -> Optional[Appointment]:
@@ -39,8 +63,8 @@ class AppointmentService:
             return None
         for field, value in appointment_in.model_dump(exclude_unset=True).items():
             setattr(appointment, field, value)
-        db.commit()
-        db.refresh(appointment)
+        db.flush()
+        EntityCache.put_on_commit(db, appointment)
         return appointment
 
     @staticmethod
@@ -50,5 +74,6 @@ class AppointmentService:
         if not appointment:
             return False
         db.delete(appointment)
-        db.commit()
+        db.flush()
+        EntityCache.evict_on_commit(db, Appointment, appointment_id)
         return True
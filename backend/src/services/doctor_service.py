@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from src.models.doctor import Doctor
-from src.schemas.doctor import DoctorCreate, DoctorUpdate
+from src.schemas.doctor import DoctorCreate, DoctorUpdate, DoctorResponse
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import Page, paginate
 
 class DoctorService:
     """Service class for Doctor CRUD operations."""
@@ -11,8 +13,8 @@ class DoctorService:
         """Create a new doctor record."""
         doctor = Doctor(**doctor_in.model_dump())
         db.add(doctor)
-        db.commit()
-        db.refresh(doctor)
+        db.flush()
+        EntityCache.put_on_commit(db, doctor)
         return doctor
 
     @staticmethod
@@ -20,11 +22,21 @@ class DoctorService:
         """Get a doctor by ID."""
         return db.query(Doctor).filter(Doctor.id == doctor_id).first()
 
+    @staticmethod
+    def get_doctor_cached(db: Session, doctor_id: int) -> Optional[DoctorResponse]:
+        """Get a doctor by its ID through the entity cache."""
+        return EntityCache.get_or_load(Doctor, doctor_id, db, lambda session: DoctorService.get_doctor(session, doctor_id))
+
     @staticmethod
     def get_all_doctors(db: Session) -> List[Doctor]:
         """Get all doctors."""
         return db.query(Doctor).all()
 
+    @staticmethod
+    def get_doctors_page(db: Session, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of doctors in ID order."""
+        return paginate(db.query(Doctor), [Doctor.id], limit=limit, cursor=cursor)
+
     @staticmethod
     def update_doctor(db: Session, doctor_id: int, doctor_in: DoctorUpdate) -> Optional[Doctor]:
         """Update a doctor record."""
@@ -33,8 +45,8 @@ class DoctorService:
             return None
         for field, value in doctor_in.model_dump(exclude_unset=True).items():
             setattr(doctor, field, value)
-        db.commit()
-        db.refresh(doctor)
+        db.flush()
+        EntityCache.put_on_commit(db, doctor)
         return doctor
 
     @staticmethod
@@ -44,5 +56,6 @@ class DoctorService:
         if not doctor:
             return False
         db.delete(doctor)
-        db.commit()
+        db.flush()
+        EntityCache.evict_on_commit(db, Doctor, doctor_id)
         return True
@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from src.models.document import Document
-from src.schemas.document import DocumentCreate, DocumentUpdate
+from src.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import Page, paginate
 
 class DocumentService:
     """Service class for Document CRUD operations."""
@@ -11,8 +13,8 @@ class DocumentService:
         """Create a new document record."""
         document = Document(**document_in.model_dump())
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        db.flush()
+        EntityCache.put_on_commit(db, document)
         return document
 
     @staticmethod
@@ -20,11 +22,22 @@ class DocumentService:
         """Get a document by its ID."""
         return db.query(Document).filter(Document.id == document_id).first()
 
+    @staticmethod
+    def get_document_cached(db: Session, document_id: int) -> Optional[DocumentResponse]:
+        """Get a document by its ID through the entity cache."""
+        return EntityCache.get_or_load(Document, document_id, db, lambda session: DocumentService.get_document(session, document_id))
+
     @staticmethod
     def get_documents_by_user(db: Session, user_id: int) -> List[Document]:
         """Get all documents for a user."""
         return db.query(Document).filter(Document.user_id == user_id).all()
 
+    @staticmethod
+    def get_documents_page(db: Session, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a user's documents in ID order."""
+        query = db.query(Document).filter(Document.user_id == user_id)
+        return paginate(query, [Document.id], limit=limit, cursor=cursor)
+
     @staticmethod
     def update_document(db: Session, document_id: int, document_in: DocumentUpdate) -> Optional[Document]:
         """Update a document record."""
@@ -33,8 +46,8 @@ class DocumentService:
             return None
         for field, value in document_in.model_dump(exclude_unset=True).items():
             setattr(document, field, value)
-        db.commit()
-        db.refresh(document)
+        db.flush()
+        EntityCache.put_on_commit(db, document)
         return document
 
     @staticmethod
@@ -44,5 +57,6 @@ class DocumentService:
         if not document:
             return False
         db.delete(document)
-        db.commit()
+        db.flush()
+        EntityCache.evict_on_commit(db, Document, document_id)
         return True
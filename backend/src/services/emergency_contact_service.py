@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from src.models.emergency_contact import EmergencyContact
-from src.schemas.emergency_contact import EmergencyContactCreate, EmergencyContactUpdate
+from src.schemas.emergency_contact import EmergencyContactCreate, EmergencyContactUpdate, EmergencyContactResponse
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import Page, paginate
 from typing import List, Optional
 
 class EmergencyContactService:
@@ -21,8 +23,8 @@ class EmergencyContactService:
             phone=contact.phone
         )
         db.add(db_contact)
-        db.commit()
-        db.refresh(db_contact)
+        db.flush()
+        EntityCache.put_on_commit(db, db_contact)
         return db_contact
 
     @staticmethod
@@ -30,11 +32,22 @@ class EmergencyContactService:
         """Get an emergency contact by its ID."""
         return db.query(EmergencyContact).filter(EmergencyContact.id == contact_id).first()
 
+    @staticmethod
+    def get_contact_cached(db: Session, contact_id: int) -> Optional[EmergencyContactResponse]:
+        """Get an emergency contact by its ID through the entity cache."""
+        return EntityCache.get_or_load(EmergencyContact, contact_id, db, lambda session: EmergencyContactService.get_contact_by_id(session, contact_id))
+
     @staticmethod
     def get_contacts_by_user(db: Session, user_id: int) -> List[EmergencyContact]:
         """Get all emergency contacts for a user."""
         return db.query(EmergencyContact).filter(EmergencyContact.user_id == user_id).all()
 
+    @staticmethod
+    def get_contacts_page(db: Session, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a user's emergency contacts in ID order."""
+        query = db.query(EmergencyContact).filter(EmergencyContact.user_id == user_id)
+        return paginate(query, [EmergencyContact.id], limit=limit, cursor=cursor)
+
     @staticmethod
     def update_contact(db: Session, contact_id: int, contact_update: EmergencyContactUpdate) -> Optional[EmergencyContact]:
         """Update an existing emergency contact."""
@@ -44,8 +57,8 @@ class EmergencyContactService:
         update_data = contact_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_contact, field, value)
-        db.commit()
-        db.refresh(db_contact)
+        db.flush()
+        EntityCache.put_on_commit(db, db_contact)
         return db_contact
 
     @staticmethod
@@ -55,5 +68,6 @@ class EmergencyContactService:
         if not db_contact:
             return False
         db.delete(db_contact)
-        db.commit()
+        db.flush()
+        EntityCache.evict_on_commit(db, EmergencyContact, contact_id)
         return True
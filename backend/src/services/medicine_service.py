@@ -1,18 +1,35 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from src.db.database import on_commit
+from src.models.appointment import Appointment
 from src.models.medicine import Medicine
-from src.schemas.medicine import MedicineCreate, MedicineUpdate
+from src.schemas.medicine import MedicineCreate, MedicineUpdate, MedicineResponse
+from src.utils.cache import Cache, doctor_tag
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import Page, paginate
 
 class MedicineService:
     """Service class for Medicine CRUD operations."""
 
+    @staticmethod
+    def _evict_appointments_on_commit(db: Session, *appointment_ids: Optional[int]) -> None:
+        """Cached appointments (the entity and doctor lists) carry their medicine ids; drop them when those change."""
+        appointment_ids = {appointment_id for appointment_id in appointment_ids if appointment_id is not None}
+        if not appointment_ids:
+            return
+        for appointment_id in appointment_ids:
+            EntityCache.evict_on_commit(db, Appointment, appointment_id)
+        doctor_ids = db.query(Appointment.doctor_id).filter(Appointment.id.in_(appointment_ids)).distinct()
+        on_commit(db, Cache.invalidate_tags, *(doctor_tag(doctor_id) for (doctor_id,) in doctor_ids))
+
     @staticmethod
     def create_medicine(db: Session, medicine_in: MedicineCreate) -> Medicine:
         """Create a new medicine record."""
         medicine = Medicine(**medicine_in.model_dump())
         db.add(medicine)
-        db.commit()
-        db.refresh(medicine)
+        db.flush()
+        EntityCache.put_on_commit(db, medicine)
+        MedicineService._evict_appointments_on_commit(db, medicine.appointment_id)
         return medicine
 
     @staticmethod
@@ -20,21 +37,34 @@ class MedicineService:
         """Get a medicine by its ID."""
         return db.query(Medicine).filter(Medicine.id == medicine_id).first()
 
+    @staticmethod
+    def get_medicine_cached(db: Session, medicine_id: int) -> Optional[MedicineResponse]:
+        """Get a medicine by its ID through the entity cache."""
+        return EntityCache.get_or_load(Medicine, medicine_id, db, lambda session: MedicineService.get_medicine(session, medicine_id))
+
     @staticmethod
     def get_medicines_by_user(db: Session, user_id: int) -> List[Medicine]:
         """Get all medicines for a user."""
         return db.query(Medicine).filter(Medicine.user_id == user_id).all()
 
+    @staticmethod
+    def get_medicines_page(db: Session, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        """Get one page of a user's medicines in ID order."""
+        query = db.query(Medicine).filter(Medicine.user_id == user_id)
+        return paginate(query, [Medicine.id], limit=limit, cursor=cursor)
+
     @staticmethod
     def update_medicine(db: Session, medicine_id: int, medicine_in: MedicineUpdate) -> Optional[Medicine]:
         """Update a medicine record."""
         medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
         if not medicine:
             return None
+        previous_appointment_id = medicine.appointment_id
         for field, value in medicine_in.model_dump(exclude_unset=True).items():
             setattr(medicine, field, value)
-        db.commit()
-        db.refresh(medicine)
+        db.flush()
+        EntityCache.put_on_commit(db, medicine)
+        MedicineService._evict_appointments_on_commit(db, previous_appointment_id, medicine.appointment_id)
         return medicine
 
     @staticmethod
@@ -43,6 +73,9 @@ class MedicineService:
         medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
         if not medicine:
             return False
+        appointment_id = medicine.appointment_id
         db.delete(medicine)
-        db.commit()
+        db.flush()
+        EntityCache.evict_on_commit(db, Medicine, medicine_id)
+        MedicineService._evict_appointments_on_commit(db, appointment_id)
         return True
@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+from src.core.config import settings
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by encode_cursor for this sort key."""
+
+
+class Page:
+    """One page of results and the cursor for the next page (None on the last page)."""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Page size within 1..PAGE_SIZE_MAX, defaulting to PAGE_SIZE_DEFAULT."""
+    if not limit:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+
+def _dump(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime, time)) else value
+
+
+def _load(value: Any, column) -> Any:
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type in (date, datetime, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(row: Any, keys: Sequence) -> str:
+    """Opaque cursor holding the sort-key values of the last row on a page."""
+    raw = json.dumps([_dump(getattr(row, key.key)) for key in keys])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    """Sort-key values from a cursor; raises InvalidCursor for anything encode_cursor did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_load(value, key) for value, key in zip(values, keys)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def _after(keys: Sequence, values: Sequence, descending: bool):
+    """Rows strictly after `values` in the lexicographic order of `keys`."""
+    clauses = []
+    for i, key in enumerate(keys):
+        beyond = key < values[i] if descending else key > values[i]
+        clauses.append(and_(*[keys[j] == values[j] for j in range(i)], beyond))
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    keys: Sequence,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    skip: int = 0,
+) -> Page:
+    """
+    Keyset pagination of a query ordered by `keys`
+
+    `keys` must end with a unique column (normally the primary key) so the
+    order is total. With a cursor the page starts right after the row it
+    encodes, so fetching page N costs the same as page 1; `skip` is an OFFSET
+    kept for endpoints that already exposed it and is ignored with a cursor.
+    One extra row is fetched to know whether there is a next page.
+    """
+    limit = clamp_page_size(limit)
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys), descending))
+    query = query.order_by(*[key.desc() if descending else key.asc() for key in keys])
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, encode_cursor(rows[-1], keys))
+    return Page(rows)
+
+
+def page_cache_key(base: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> str:
+    """Cache key for one page of a cached list; every page keeps `base` as its prefix."""
+    return f"{base}:{clamp_page_size(limit)}:{cursor or ''}"
+
+
+def page_payload(page: Page, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON-ready form of a page, as cached and served by the list endpoints."""
+    return {
+        "items": [schema.model_validate(item).model_dump() for item in page.items],
+        "next_cursor": page.next_cursor,
+    }
@@ -5,7 +5,6 @@ from typing import Optional, List, Dict, Any
 from datetime import date
 from webauthn import generate_registration_options, verify_registration_response, generate_authentication_options, verify_authentication_response, base64url_to_bytes
 from webauthn.helpers.structs import AuthenticatorSelectionCriteria, UserVerificationRequirement, RegistrationCredential, AuthenticatorAttestationResponse, AuthenticationCredential, AuthenticatorAssertionResponse
-import json
 import base64
 
 from src.services.user_service import UserService
@@ -118,7 +117,7 @@ class PasskeyService:
         )
         
         challenge_dict = PasskeyService._serialize_challenge_data(challenge_data)
-        Cache.set(f"webauthn_signup_challenge_{user_id}", json.dumps(challenge_dict.model_dump()), expiry=settings.CHALLENGE_CACHE_EXPIRY)
+        Cache.set(f"webauthn_signup_challenge_{user_id}", challenge_dict, expiry=settings.CHALLENGE_CACHE_EXPIRY)
     
         return challenge_dict
 
@@ -139,14 +138,13 @@ class PasskeyService:
                 detail="User not found"
             )
         
-        challenge_data_json = Cache.get(f"webauthn_signup_challenge_{existing_user.id}")
-        if not challenge_data_json:
+        challenge_data = Cache.get(f"webauthn_signup_challenge_{existing_user.id}")
+        if not challenge_data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Registration challenge expired or not found"
             )
         
-        challenge_data = json.loads(challenge_data_json)
         raw_credential_id = base64.urlsafe_b64decode(response_data.credential_id + '=' * (-len(response_data.credential_id) % 4))
         expected_challenge =  challenge_data.get('challenge') if isinstance(challenge_data, dict) else challenge_data
 
@@ -230,7 +228,7 @@ class PasskeyService:
         )
 
         challenge_dict = PasskeyService._serialize_challenge_data(challenge_data)
-        Cache.set(f"webauthn_login_challenge_{credential.user_id}", json.dumps(challenge_dict.model_dump()), expiry=settings.CHALLENGE_CACHE_EXPIRY)     
+        Cache.set(f"webauthn_login_challenge_{credential.user_id}", challenge_dict, expiry=settings.CHALLENGE_CACHE_EXPIRY)     
         
         return challenge_dict
 
@@ -254,14 +252,13 @@ class PasskeyService:
                 detail="Credential not found"
             )
 
-        challenge_data_json = Cache.get(f"webauthn_login_challenge_{credential.user_id}")
-        if not challenge_data_json:
+        challenge_data = Cache.get(f"webauthn_login_challenge_{credential.user_id}")
+        if not challenge_data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Login challenge expired or not found"
             )
         
-        challenge_data = json.loads(challenge_data_json)
         raw_credential_id = base64.urlsafe_b64decode(response_data.credential_id + '=' * (-len(response_data.credential_id) % 4))
         expected_challenge =  challenge_data.get('challenge') if isinstance(challenge_data, dict) else challenge_data
 
@@ -287,7 +284,7 @@ class PasskeyService:
 
         ## NOTE: Might have to think about the sign_count logic here
         credential.sign_count = response.new_sign_count
-        db.commit()
+        db.flush()
 
         return PasskeyVerificationResult(
             user_id=credential.user_id,
@@ -317,12 +314,11 @@ class PasskeyService:
         credential = PasskeyCredential(**credential_data.model_dump())
         
         try:
-            db.add(credential)
-            db.commit()
-            db.refresh(credential)
+            # Savepoint, so a duplicate only undoes this insert and not the rest of the request
+            with db.begin_nested():
+                db.add(credential)
             return credential
         except IntegrityError:
-            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Credential already exists"
@@ -363,7 +359,7 @@ class PasskeyService:
             )
         
         db.delete(credential)
-        db.commit()
+        db.flush()
         return True
 
     @staticmethod
@@ -390,6 +386,5 @@ class PasskeyService:
         for field, value in update_data.dict(exclude_unset=True).items():
             setattr(credential, field, value)
         
-        db.commit()
-        db.refresh(credential)
+        db.flush()
         return credential
\ No newline at end of file
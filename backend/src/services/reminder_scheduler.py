@@ -1,11 +1,15 @@
+import os
+import socket
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
 
-from src.db.database import get_db
+from src.db.database import SessionLocal
 from src.services.reminder_service import ReminderService
+from src.services.reminder_timer import ReminderTimer, reminder_event_listener, reminder_timer
 from src.services.sms_service import sms_service
 from src.models.reminder import Reminder
 from src.core.config import settings
@@ -20,10 +24,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads; rate <= 0 disables it"""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self.interval: float = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: float = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class ReminderScheduler:
     def __init__(self) -> None:
         self.running: bool = False
         self.thread: Optional[threading.Thread] = None
+        # Identifies this dispatcher's claims; every uvicorn worker runs its own
+        self.worker_id: str = f"{socket.gethostname()}:{os.getpid()}"
+        self.rate_limiter = RateLimiter(settings.REMINDER_SEND_RATE_PER_SECOND)
+        self.timer: ReminderTimer = reminder_timer
+        self._send_pool: Optional[ThreadPoolExecutor] = None
+        # time.monotonic() of the last loop iteration and the last successful reload, for health checks
+        self.last_heartbeat: Optional[float] = None
+        self.last_reload: Optional[float] = None
     
     def send_notification(self, reminder: Reminder) -> bool:
         try:
@@ -46,55 +77,132 @@ class ReminderScheduler:
             logger.error(f"Error sending notification for reminder {reminder.id}: {str(e)}")
             return False
     
-    def process_due_reminders(self) -> None:
+    def _send(self, reminder: Reminder) -> bool:
+        self.rate_limiter.acquire()
+        return self.send_notification(reminder)
+
+    def send_batch(self, reminders: List[Reminder]) -> Dict[int, bool]:
+        """Send a batch from the bounded pool; returns whether each reminder was delivered"""
+        if self._send_pool is None:
+            self._send_pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.REMINDER_SEND_CONCURRENCY), thread_name_prefix="reminder-send"
+            )
+        futures = {reminder.id: self._send_pool.submit(self._send, reminder) for reminder in reminders}
+        results: Dict[int, bool] = {}
+        for reminder_id, future in futures.items():
+            try:
+                results[reminder_id] = future.result()
+            except Exception as e:
+                logger.error(f"Error processing reminder {reminder_id}: {str(e)}")
+                results[reminder_id] = False
+        return results
+
+    def reload_schedule(self) -> None:
+        """Return expired claims to the queue and reload the timer with everything due within the horizon"""
+        db: Session = SessionLocal()
+        try:
+            self.timer.begin_reload()
+            recovered = ReminderService.recover_expired_claims(db)
+            if recovered:
+                logger.warning(f"Returned {recovered} reminders with expired claims to the queue")
+            horizon_end = datetime.now() + timedelta(minutes=settings.REMINDER_TIMER_HORIZON_MINUTES)
+            entries = ReminderService.get_pending_schedule(db, horizon_end)
+            db.commit()
+            self.timer.reload(entries, horizon_end)
+            self.last_reload = time.monotonic()
+            logger.debug(f"Reminder timer reloaded: {len(entries)} due by {horizon_end}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def process_due_reminders(self) -> int:
+        """Claim, send and complete one batch of due reminders; returns how many were claimed"""
         logger.info("Checking for due reminders...")
         
-        db_gen = get_db()
-        db: Session = next(db_gen)
+        # Outside a request there is no unit of work, so this loop commits itself.
+        # Rows stay loaded across commits; only their ids and phone numbers are read.
+        db: Session = SessionLocal(expire_on_commit=False)
         
         try:
-            due_reminders = ReminderService.get_due_reminders(db, limit=100)
+            # The claim is committed before sending, so other dispatchers skip these rows
+            due_reminders = ReminderService.claim_due_reminders(db, self.worker_id)
+            db.commit()
             
             if not due_reminders:
                 logger.debug("No due reminders found")
-                return
+                return 0
                 
-            logger.info(f"Found {len(due_reminders)} due reminders")
-            
-            for reminder in due_reminders:
-                try:
-                    logger.info(f"Processing reminder {reminder.id} for user {reminder.user_id}")
-                    
-                    if self.send_notification(reminder):
-                        ReminderService.mark_reminder_as_sent(db, reminder.id)
-                        logger.info(f"Reminder {reminder.id} marked as sent")
-                    else:
-                        ReminderService.mark_reminder_as_failed(db, reminder.id)
-                        logger.error(f"Reminder {reminder.id} marked as failed")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing reminder {reminder.id}: {str(e)}")
-                    ReminderService.mark_reminder_as_failed(db, reminder.id)
+            logger.info(f"Claimed {len(due_reminders)} due reminders")
+            results = self.send_batch(due_reminders)
+
+            # One UPDATE for the whole batch. If this worker dies before it commits,
+            # the lease expires and the batch is sent again: at-least-once delivery.
+            updated = ReminderService.complete_claims(db, self.worker_id, results)
+            db.commit()
+            sent = sum(results.values())
+            logger.info(f"Reminders sent: {sent}, failed: {len(results) - sent}")
+            if updated < len(results):
+                logger.warning(f"{len(results) - updated} reminders were cancelled or reclaimed while sending")
+            return len(due_reminders)
         
         except Exception as e:
             logger.error(f"Error in reminder processing: {str(e)}")
+            db.rollback()
+            # Whatever the timer handed over is back in the database's hands
+            self.timer.request_reload()
+            return 0
         finally:
             db.close()
+
+    def run_once(self) -> None:
+        """Dispatch whatever the timer says is due, batch after batch until a claim comes back short"""
+        if not self.timer.pop_due():
+            return
+        while self.running and self.process_due_reminders() >= settings.REMINDER_CLAIM_BATCH_SIZE:
+            pass
+
+    def seconds_until_next_due(self) -> Optional[float]:
+        next_due = self.timer.next_due()
+        return (next_due - datetime.now()).total_seconds() if next_due else None
     
-    def cleanup_old_reminders(self) -> None:
+    def cleanup_old_reminders(self) -> int:
+        """Archive (or delete) finished reminders older than REMINDER_CLEANUP_DAYS; returns how many.
+
+        Works in chunks of REMINDER_CLEANUP_BATCH_SIZE rows, one transaction each, pausing
+        REMINDER_CLEANUP_PAUSE_SECONDS in between so locks and WAL stay small. Due
+        reminders are still dispatched during the pauses.
+        """
         logger.info("Running reminder cleanup...")
-        
-        db_gen = get_db()
-        db: Session = next(db_gen)
-        
-        try:
-            cutoff_date = datetime.now() - timedelta(days=settings.REMINDER_CLEANUP_DAYS)
-            logger.info(f"Would clean up reminders older than {cutoff_date}")
-            
-        except Exception as e:
-            logger.error(f"Error in reminder cleanup: {str(e)}")
-        finally:
-            db.close()
+        cutoff_date = datetime.now() - timedelta(days=settings.REMINDER_CLEANUP_DAYS)
+        batch_size = settings.REMINDER_CLEANUP_BATCH_SIZE
+        on_dispatch_thread = self.thread is threading.current_thread()
+        total = 0
+
+        while True:
+            db: Session = SessionLocal()
+            try:
+                removed = ReminderService.archive_finished_reminders(db, cutoff_date, batch_size)
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error in reminder cleanup: {str(e)}")
+                db.rollback()
+                break
+            finally:
+                db.close()
+
+            total += removed
+            # A short chunk means nothing is left; on the dispatch thread, stop() ends the job early
+            if removed < batch_size or (on_dispatch_thread and not self.running):
+                break
+            time.sleep(settings.REMINDER_CLEANUP_PAUSE_SECONDS)
+            if on_dispatch_thread:
+                self.run_once()
+
+        action = "Archived" if settings.REMINDER_CLEANUP_ARCHIVE else "Deleted"
+        logger.info(f"{action} {total} reminders scheduled before {cutoff_date}")
+        return total
     
     def start(self) -> None:
         if self.running:
@@ -107,11 +215,18 @@ class ReminderScheduler:
         
         def run_scheduler() -> None:
             last_cleanup = datetime.now()
-            check_interval_seconds = int(settings.REMINDER_CHECK_INTERVAL_MINUTES * 60)
+            # The database is only read on this interval (a reconciliation), or when due reminders are claimed
+            reload_interval_seconds = settings.REMINDER_CHECK_INTERVAL_MINUTES * 60
+            next_reload = 0.0
             
             while self.running:
+                self.last_heartbeat = time.monotonic()
                 try:
-                    self.process_due_reminders()
+                    if time.monotonic() >= next_reload or self.timer.reload_requested:
+                        next_reload = time.monotonic() + reload_interval_seconds
+                        self.reload_schedule()
+
+                    self.run_once()
                     
                     now = datetime.now()
                     if (now - last_cleanup).days >= 1 and now.hour == settings.REMINDER_CLEANUP_HOUR:
@@ -120,28 +235,54 @@ class ReminderScheduler:
                     
                 except Exception as e:
                     logger.error(f"Error in scheduler loop: {str(e)}")
-                
-                for _ in range(check_interval_seconds):
-                    if not self.running:
-                        break
+                    # Retry soon rather than at the next reconciliation, without spinning
+                    next_reload = min(next_reload, time.monotonic() + 5)
                     time.sleep(1)
+                
+                # Sleep until the next reminder is due, a schedule change arrives or it is time to reconcile
+                timeout = next_reload - time.monotonic()
+                until_due = self.seconds_until_next_due()
+                if until_due is not None:
+                    timeout = min(timeout, until_due)
+                if self.running and timeout > 0 and not self.timer.reload_requested:
+                    self.timer.wait(timeout)
         
+        reminder_event_listener.start()
         self.thread = threading.Thread(target=run_scheduler)
         self.thread.daemon = True
         self.thread.start()
         
         logger.info("Reminder scheduler started successfully")
     
-    def stop(self) -> None:
+    def is_alive(self) -> bool:
+        """The dispatch thread is running"""
+        return self.running and self.thread is not None and self.thread.is_alive()
+
+    def is_ready(self) -> bool:
+        """Alive, and the timer was reloaded from the database within the last two reconciliation intervals"""
+        max_age = 2 * settings.REMINDER_CHECK_INTERVAL_MINUTES * 60
+        return self.is_alive() and self.last_reload is not None and time.monotonic() - self.last_reload <= max_age
+
+    def stop(self, timeout: float = 10) -> None:
+        """Stop after the batch in flight is sent and recorded, waiting at most timeout seconds"""
         if not self.running:
             logger.warning("Scheduler is not running")
             return
         
         logger.info("Stopping reminder scheduler...")
         self.running = False
+        self.timer.wake()
+        reminder_event_listener.stop()
         
         if self.thread:
-            self.thread.join(timeout=10)
+            self.thread.join(timeout=timeout)
+        drained = not (self.thread and self.thread.is_alive())
+        if not drained:
+            logger.warning(f"Reminder batch still in flight after {timeout}s; its claims are recovered once the lease expires")
+
+        if self._send_pool is not None:
+            self._send_pool.shutdown(wait=drained, cancel_futures=not drained)
+            self._send_pool = None
         
         logger.info("Reminder scheduler stopped")
 
@@ -154,14 +295,6 @@ def stop_reminder_scheduler() -> None:
     reminder_scheduler.stop()
 
 if __name__ == "__main__":
-    try:
-        reminder_scheduler.start()
-        logger.info("Reminder scheduler service started. Press Ctrl+C to stop.")
-        
-        while True:
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
-        logger.info("Shutdown signal received")
-        reminder_scheduler.stop()
-        logger.info("Reminder scheduler service stopped")
+    # Kept for old scripts; the service entry point is `python -m src.workers.reminders`
+    from src.workers.reminders import main
+    main()
@@ -1,24 +1,54 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from sqlalchemy import DateTime, case, cast, delete, insert, literal, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, time
-from src.models.reminder import Reminder, ReminderType, ReminderStatus
+from src.core.config import settings
+from src.db.database import on_commit
+from src.models.reminder import Reminder, ReminderArchive, ReminderType, ReminderStatus
 from src.models.appointment import Appointment
 from src.models.medicine import Medicine
 from src.schemas.reminder import ReminderCreate, ReminderUpdate
 from src.services.ai_service import AIService
+from src.services.pagination import Page, paginate
+from src.services.reminder_timer import publish_reminder_changes
 
 class ReminderService:
     """Service class for Reminder CRUD operations and scheduling."""
 
+    @staticmethod
+    def _publish_on_commit(db: Session, reminders: List[Reminder]) -> None:
+        """Tell the dispatch timers about the reminders' new schedule once the transaction commits."""
+        changes = [
+            (reminder.id,
+             reminder.scheduled_time if reminder.status == ReminderStatus.PENDING and reminder.is_active else None)
+            for reminder in reminders
+        ]
+        on_commit(db, publish_reminder_changes, changes)
+
     @staticmethod
     def create_reminder(db: Session, reminder_in: ReminderCreate) -> Reminder:
         """Create a new reminder record."""
         reminder = Reminder(**reminder_in.model_dump())
         db.add(reminder)
-        db.commit()
-        db.refresh(reminder)
+        db.flush()
+        ReminderService._publish_on_commit(db, [reminder])
         return reminder
 
+    @staticmethod
+    def bulk_create_reminders(db: Session, rows: List[Dict[str, Any]]) -> List[Reminder]:
+        """Insert many reminders in one batched INSERT.
+
+        Each row holds ReminderCreate fields; column defaults fill in the rest.
+        """
+        if not rows:
+            return []
+        reminders = list(db.scalars(
+            insert(Reminder).returning(Reminder),
+            rows,
+        ))
+        ReminderService._publish_on_commit(db, reminders)
+        return reminders
+
     @staticmethod
     def get_reminder(db: Session, reminder_id: int) -> Optional[Reminder]:
         """Get a reminder by ID."""
@@ -32,6 +62,29 @@ class ReminderService:
             query = query.filter(Reminder.is_active == True)
         return query.order_by(Reminder.scheduled_time.desc()).all()
 
+    @staticmethod
+    def get_reminders_page(
+        db: Session,
+        user_id: int,
+        include_inactive: bool = False,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        before: Optional[datetime] = None,
+    ) -> Page:
+        """
+        Get one page of a user's reminders, newest first, with filtering and limits done in SQL.
+
+        With a cursor the page starts right after the reminder it encodes
+        (keyset pagination on scheduled_time, id) and skip is ignored.
+        """
+        query = db.query(Reminder).filter(Reminder.user_id == user_id)
+        if not include_inactive:
+            query = query.filter(Reminder.is_active == True)
+        if before is not None:
+            query = query.filter(Reminder.scheduled_time < before)
+        return paginate(query, [Reminder.scheduled_time, Reminder.id], limit=limit, cursor=cursor, descending=True, skip=skip)
+
     @staticmethod
     def get_pending_reminders_by_user(db: Session, user_id: int) -> List[Reminder]:
         """Get all pending reminders for a user."""
@@ -43,14 +96,140 @@ class ReminderService:
 
     @staticmethod
     def get_due_reminders(db: Session, limit: int = 100) -> List[Reminder]:
-        """Get all reminders that are due (scheduled time has passed and status is pending)."""
+        """Get all reminders that are due (scheduled time has passed and status is pending).
+
+        The owning user is joined in, since dispatch reads every reminder's phone number.
+        """
         current_time = datetime.now()
-        return db.query(Reminder).filter(
+        return db.query(Reminder).options(joinedload(Reminder.user)).filter(
             Reminder.scheduled_time <= current_time,
             Reminder.status == ReminderStatus.PENDING,
             Reminder.is_active == True
         ).order_by(Reminder.scheduled_time.asc()).limit(limit).all()
 
+    @staticmethod
+    def claim_due_reminders(db: Session, worker_id: str, limit: Optional[int] = None) -> List[Reminder]:
+        """Atomically move up to `limit` due reminders from PENDING to PROCESSING, owned by worker_id.
+
+        One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING statement:
+        on PostgreSQL concurrent dispatchers skip each other's rows instead of waiting on
+        them, and the outer status check drops any row claimed in the meantime. On SQLite
+        writers are serialized, so the same statement is atomic without row locks. Users
+        are loaded in a second query for the phone numbers.
+        """
+        now = datetime.now()
+        due = select(Reminder.id).where(
+            Reminder.scheduled_time <= now,
+            Reminder.status == ReminderStatus.PENDING,
+            Reminder.is_active == True
+        ).order_by(Reminder.scheduled_time.asc()).limit(limit or settings.REMINDER_CLAIM_BATCH_SIZE)
+        claimed = db.scalars(
+            update(Reminder)
+            .where(Reminder.id.in_(due.with_for_update(skip_locked=True).scalar_subquery()),
+                   Reminder.status == ReminderStatus.PENDING)
+            .values(status=ReminderStatus.PROCESSING, claimed_by=worker_id, claimed_at=now, updated_at=now)
+            .returning(Reminder)
+            .options(selectinload(Reminder.user)),
+            execution_options={"synchronize_session": False},
+        ).all()
+        # RETURNING order is unspecified
+        return sorted(claimed, key=lambda reminder: (reminder.scheduled_time, reminder.id))
+
+    @staticmethod
+    def complete_claims(db: Session, worker_id: str, results: Dict[int, bool]) -> int:
+        """Finish a batch of claimed reminders in one UPDATE: SENT where results[id] is True, else FAILED.
+
+        Only rows worker_id still holds are changed; a reminder cancelled meanwhile,
+        or whose lease expired and was reclaimed elsewhere, is left alone. Returns
+        how many rows were updated.
+        """
+        if not results:
+            return 0
+        status_type = Reminder.status.type
+        sent_ids = [reminder_id for reminder_id, sent in results.items() if sent]
+        result = db.execute(
+            update(Reminder)
+            .where(Reminder.id.in_(list(results)),
+                   Reminder.status == ReminderStatus.PROCESSING,
+                   Reminder.claimed_by == worker_id)
+            .values(
+                # CAST, because PostgreSQL types a CASE of bare literals as text, not reminderstatus
+                status=case((Reminder.id.in_(sent_ids), cast(ReminderStatus.SENT, status_type)),
+                            else_=cast(ReminderStatus.FAILED, status_type)),
+                updated_at=datetime.now(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    @staticmethod
+    def complete_claim(db: Session, reminder_id: int, worker_id: str, sent: bool) -> bool:
+        """Finish one claimed reminder as SENT or FAILED; False if worker_id no longer holds it."""
+        return ReminderService.complete_claims(db, worker_id, {reminder_id: sent}) == 1
+
+    @staticmethod
+    def recover_expired_claims(db: Session, lease_seconds: Optional[int] = None) -> int:
+        """Return PROCESSING reminders whose claim is older than the lease to PENDING; returns how many."""
+        lease = lease_seconds if lease_seconds is not None else settings.REMINDER_CLAIM_LEASE_SECONDS
+        expired_before = datetime.now() - timedelta(seconds=lease)
+        recovered = db.execute(
+            update(Reminder)
+            .where(Reminder.status == ReminderStatus.PROCESSING,
+                   Reminder.claimed_at < expired_before)
+            .values(status=ReminderStatus.PENDING, claimed_by=None, claimed_at=None, updated_at=datetime.now())
+            .returning(Reminder.id, Reminder.scheduled_time),
+            execution_options={"synchronize_session": False},
+        ).all()
+        if recovered:
+            on_commit(db, publish_reminder_changes, [tuple(row) for row in recovered])
+        return len(recovered)
+
+    @staticmethod
+    def get_pending_schedule(db: Session, until: datetime) -> List[Tuple[int, datetime]]:
+        """(id, scheduled_time) of every pending, active reminder due by `until`, overdue ones included.
+
+        Only two columns, read through the partial due index, to load the dispatch timer.
+        """
+        return [tuple(row) for row in db.execute(
+            select(Reminder.id, Reminder.scheduled_time).where(
+                Reminder.scheduled_time <= until,
+                Reminder.status == ReminderStatus.PENDING,
+                Reminder.is_active == True
+            )
+        )]
+
+    @staticmethod
+    def archive_finished_reminders(db: Session, before: datetime, limit: Optional[int] = None,
+                                   archive: Optional[bool] = None) -> int:
+        """Remove one chunk of SENT/FAILED/CANCELLED reminders scheduled before `before`; returns how many.
+
+        The oldest `limit` rows are locked (FOR UPDATE SKIP LOCKED, so concurrent
+        cleanups take different rows and a reminder being edited is left for the next
+        run), copied into reminders_archive unless archiving is off, then deleted.
+        The caller commits, one transaction per chunk.
+        """
+        archive = settings.REMINDER_CLEANUP_ARCHIVE if archive is None else archive
+        finished = [ReminderStatus.SENT, ReminderStatus.FAILED, ReminderStatus.CANCELLED]
+        ids = db.scalars(
+            select(Reminder.id)
+            .where(Reminder.scheduled_time < before, Reminder.status.in_(finished))
+            .order_by(Reminder.scheduled_time.asc())
+            .limit(limit or settings.REMINDER_CLEANUP_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            return 0
+        if archive:
+            columns = [column.name for column in Reminder.__table__.columns]
+            db.execute(
+                insert(ReminderArchive).from_select(
+                    columns + ["archived_at"],
+                    select(*Reminder.__table__.columns, literal(datetime.now(), DateTime)).where(Reminder.id.in_(ids)),
+                )
+            )
+        db.execute(delete(Reminder).where(Reminder.id.in_(ids)), execution_options={"synchronize_session": False})
+        return len(ids)
+
     @staticmethod
     def get_upcoming_reminders(db: Session, user_id: int, hours_ahead: int = 24) -> List[Reminder]:
         """Get reminders scheduled within the next X hours for a user."""
@@ -75,8 +254,8 @@ class ReminderService:
             setattr(reminder, field, value)
         
         reminder.updated_at = datetime.now()
-        db.commit()
-        db.refresh(reminder)
+        db.flush()
+        ReminderService._publish_on_commit(db, [reminder])
         return reminder
 
     @staticmethod
@@ -86,7 +265,8 @@ class ReminderService:
         if not reminder:
             return False
         db.delete(reminder)
-        db.commit()
+        db.flush()
+        on_commit(db, publish_reminder_changes, [(reminder_id, None)])
         return True
 
     @staticmethod
@@ -98,8 +278,7 @@ class ReminderService:
         
         reminder.status = ReminderStatus.SENT
         reminder.updated_at = datetime.now()
-        db.commit()
-        db.refresh(reminder)
+        db.flush()
         return reminder
 
     @staticmethod
@@ -111,8 +290,7 @@ class ReminderService:
         
         reminder.status = ReminderStatus.FAILED
         reminder.updated_at = datetime.now()
-        db.commit()
-        db.refresh(reminder)
+        db.flush()
         return reminder
 
     @staticmethod
@@ -125,8 +303,8 @@ class ReminderService:
         reminder.status = ReminderStatus.CANCELLED
         reminder.is_active = False
         reminder.updated_at = datetime.now()
-        db.commit()
-        db.refresh(reminder)
+        db.flush()
+        ReminderService._publish_on_commit(db, [reminder])
         return reminder
 
     @staticmethod
@@ -141,19 +319,27 @@ class ReminderService:
         if not appointment:
             return None
         
+        reminder_data = ReminderService._appointment_reminder(appointment, reminder_time, custom_message)
+        return ReminderService.create_reminder(db, reminder_data)
+
+    @staticmethod
+    def _appointment_reminder(
+        appointment: Appointment,
+        reminder_time: datetime,
+        custom_message: Optional[str] = None
+    ) -> ReminderCreate:
+        """Reminder fields for an appointment occurrence."""
         title = f"Appointment Reminder: {appointment.name}"
         message = custom_message or f"You have an appointment '{appointment.name}' scheduled for {appointment.date} at {appointment.time}"
         
-        reminder_data = ReminderCreate(
+        return ReminderCreate(
             user_id=appointment.user_id,
             reminder_type=ReminderType.APPOINTMENT,
-            related_id=appointment_id,
+            related_id=appointment.id,
             title=title,
             message=message,
             scheduled_time=reminder_time
         )
-        
-        return ReminderService.create_reminder(db, reminder_data)
 
     @staticmethod
     def create_medicine_reminder(
@@ -167,19 +353,27 @@ class ReminderService:
         if not medicine:
             return None
         
+        reminder_data = ReminderService._medicine_reminder(medicine, reminder_time, custom_message)
+        return ReminderService.create_reminder(db, reminder_data)
+
+    @staticmethod
+    def _medicine_reminder(
+        medicine: Medicine,
+        reminder_time: datetime,
+        custom_message: Optional[str] = None
+    ) -> ReminderCreate:
+        """Reminder fields for a medicine dose."""
         title = f"Medicine Reminder: {medicine.name}"
         message = custom_message or f"Time to take your medicine '{medicine.name}' - Dosage: {medicine.dosage}, Frequency: {medicine.frequency}"
         
-        reminder_data = ReminderCreate(
+        return ReminderCreate(
             user_id=medicine.user_id,
             reminder_type=ReminderType.MEDICINE,
-            related_id=medicine_id,
+            related_id=medicine.id,
             title=title,
             message=message,
             scheduled_time=reminder_time
         )
-        
-        return ReminderService.create_reminder(db, reminder_data)
 
     @staticmethod
     def auto_create_appointment_reminders(
@@ -202,29 +396,22 @@ class ReminderService:
         
         appointment_datetime = datetime.combine(appointment.date, appointment.time)
         
-        reminders = []
+        rows = []
         for offset in reminder_offsets:
             reminder_time = appointment_datetime - offset
             if reminder_time > datetime.now():
-                reminder = ReminderService.create_appointment_reminder(
-                    db, appointment_id, reminder_time
-                )
-                if reminder:
-                    reminders.append(reminder)
+                rows.append(ReminderService._appointment_reminder(appointment, reminder_time).model_dump())
         
-        return reminders
+        return ReminderService.bulk_create_reminders(db, rows)
 
     @staticmethod
-    def auto_create_medicine_reminders(
-        db: Session, 
-        medicine: Medicine,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[Reminder]:
-        """Automatically create reminders for medicine based on frequency."""
-        if not medicine:
-            return []
+    def medicine_frequency_pattern(medicine: Medicine) -> dict:
+        """
+        Resolve a medicine's frequency text to its reminder interval and times of day.
 
+        Falls back to AI parsing (a network call), so resolve before the first
+        write of a transaction rather than while it holds the write lock.
+        """
         frequency_patterns = {
             "once daily": {
                 "interval": timedelta(days=1),
@@ -296,30 +483,41 @@ class ReminderService:
                 "interval": timedelta(days=1),
                 "times_per_day": [time(9, 0)]
             }
+        return pattern
+
+    @staticmethod
+    def auto_create_medicine_reminders(
+        db: Session, 
+        medicine: Medicine,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        pattern: Optional[dict] = None
+    ) -> List[Reminder]:
+        """Automatically create reminders for medicine based on frequency (or a pattern resolved up front)."""
+        if not medicine:
+            return []
+        if pattern is None:
+            pattern = ReminderService.medicine_frequency_pattern(medicine)
         
         start_date_only = start_date.date() if start_date else medicine.start_date
         end_date_only = end_date.date() if end_date else (medicine.end_date if medicine.end_date else start_date_only + timedelta(days=30))
         
-        reminders = []
+        # Every occurrence is computed up front and inserted in one batch
+        rows = []
         current_date = start_date_only
         max_reminders = 200  
-        count = 0
+        now = datetime.now()
         
-        while current_date <= end_date_only and count < max_reminders:
+        while current_date <= end_date_only and len(rows) < max_reminders:
             for reminder_time in pattern["times_per_day"]:
                 reminder_datetime = datetime.combine(current_date, reminder_time)
                 
-                if reminder_datetime > datetime.now():
-                    reminder = ReminderService.create_medicine_reminder(
-                        db, medicine.id, reminder_datetime
-                    )
-                    if reminder:
-                        reminders.append(reminder)
-                        count += 1
+                if reminder_datetime > now:
+                    rows.append(ReminderService._medicine_reminder(medicine, reminder_datetime).model_dump())
             
             if pattern["interval"].days >= 1:
                 current_date += timedelta(days=pattern["interval"].days)
             else:
                 current_date += timedelta(days=1)
         
-        return reminders
\ No newline at end of file
+        return ReminderService.bulk_create_reminders(db, rows)
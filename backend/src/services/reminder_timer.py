@@ -0,0 +1,203 @@
+"""
+In-memory timer for reminder dispatch
+
+The scheduler keeps the pending reminders due within the next
+REMINDER_TIMER_HORIZON_MINUTES in a heap. It sleeps until the earliest one
+is due, instead of polling the database on a fixed interval. ReminderService
+publishes every schedule change after its transaction commits:
+- to the timer in this process directly;
+- to other processes (the other uvicorn workers) over Redis pub/sub,
+  on REMINDER_EVENTS_CHANNEL.
+
+Whatever is missed (Redis down, a write from outside the app) is caught
+when the scheduler reloads the horizon from the database every
+REMINDER_CHECK_INTERVAL_MINUTES.
+"""
+import heapq
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import settings
+from src.utils.cache import INSTANCE_ID, circuit_breaker, redis_client
+from src.utils.memory_redis import MemoryRedis
+
+# (reminder id, scheduled time); a time of None means the reminder no longer needs sending
+ScheduleChange = Tuple[int, Optional[datetime]]
+
+
+class ReminderTimer:
+    """Thread-safe min-heap of (scheduled_time, reminder_id) with lazy removal"""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}
+        self._condition = threading.Condition()
+        # Nothing is tracked until the first reload; processes without a scheduler stay empty
+        self.horizon_end: Optional[datetime] = None
+        self.reload_requested: bool = False
+        # Changes applied while a reload's query runs, replayed on top of its result
+        self._replay: Optional[List[ScheduleChange]] = None
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def _push(self, reminder_id: int, when: datetime) -> None:
+        self._scheduled[reminder_id] = when
+        heapq.heappush(self._heap, (when, reminder_id))
+
+    def begin_reload(self) -> None:
+        """Call before querying the database for reload(), so changes committed meanwhile are kept"""
+        with self._condition:
+            self._replay = []
+
+    def reload(self, entries: Iterable[ScheduleChange], horizon_end: datetime) -> None:
+        """Replace the schedule with entries due up to horizon_end"""
+        with self._condition:
+            replay, self._replay = self._replay or [], None
+            self._heap, self._scheduled = [], {}
+            for reminder_id, when in entries:
+                self._push(reminder_id, when)
+            self.horizon_end = horizon_end
+            self.reload_requested = False
+            self.apply(replay)
+
+    def apply(self, changes: Iterable[ScheduleChange]) -> None:
+        """Add, move or drop reminders, and wake the scheduler to recompute its sleep"""
+        changes = list(changes)
+        with self._condition:
+            if self._replay is not None:
+                self._replay.extend(changes)
+            if self.horizon_end is None:
+                return
+            for reminder_id, when in changes:
+                # Superseded heap entries are skipped when they surface
+                self._scheduled.pop(reminder_id, None)
+                if when is not None and when <= self.horizon_end:
+                    self._push(reminder_id, when)
+            self._condition.notify_all()
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[int]:
+        """Remove and return the reminders due at now"""
+        now = now or datetime.now()
+        due = []
+        with self._condition:
+            self._discard_stale()
+            while self._heap and self._heap[0][0] <= now:
+                _, reminder_id = heapq.heappop(self._heap)
+                del self._scheduled[reminder_id]
+                due.append(reminder_id)
+                self._discard_stale()
+        return due
+
+    def wait(self, timeout: float) -> None:
+        """Sleep up to timeout seconds, or until the schedule changes or someone wakes the timer"""
+        with self._condition:
+            self._condition.wait(timeout=max(timeout, 0))
+
+    def wake(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def request_reload(self) -> None:
+        """Ask the scheduler to reload from the database now, e.g. after missing events"""
+        with self._condition:
+            self.reload_requested = True
+            self._condition.notify_all()
+
+
+reminder_timer = ReminderTimer()
+
+
+def publish_reminder_changes(changes: List[ScheduleChange]) -> None:
+    """Hand schedule changes to this process's timer and to every other process"""
+    if not changes:
+        return
+    reminder_timer.apply(changes)
+    # While Redis is down, skip straight to relying on the periodic reload
+    if isinstance(redis_client, MemoryRedis) or not circuit_breaker.allow():
+        return
+    message = json.dumps({
+        "origin": INSTANCE_ID,
+        "changes": [[reminder_id, when.isoformat() if when else None] for reminder_id, when in changes],
+    })
+    try:
+        redis_client.publish(settings.REMINDER_EVENTS_CHANNEL, message)
+    except Exception as e:
+        circuit_breaker.record_failure(e)
+        print(f"Reminder event publish error: {e}")
+
+
+def apply_reminder_event(data: str) -> None:
+    """Apply a schedule change published by another process"""
+    try:
+        message = json.loads(data)
+        if message.get("origin") == INSTANCE_ID:
+            return
+        changes = [(int(reminder_id), datetime.fromisoformat(when) if when else None)
+                   for reminder_id, when in message.get("changes", [])]
+    except (TypeError, ValueError, AttributeError):
+        return
+    reminder_timer.apply(changes)
+
+
+class ReminderEventListener:
+    """Background subscriber feeding other processes' schedule changes into the timer"""
+
+    def __init__(self) -> None:
+        self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
+
+    def _listen(self) -> None:
+        backoff = 1
+        while self.running:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.REMINDER_EVENTS_CHANNEL)
+                backoff = 1
+                while self.running:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        apply_reminder_event(message["data"])
+            except Exception as e:
+                print(f"Reminder event listener error: {e}")
+                # Changes published meanwhile were missed; reload early
+                reminder_timer.request_reload()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        # A memory:// backend lives in this process, so there is nobody to hear from
+        if self.running or isinstance(redis_client, MemoryRedis):
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+
+
+reminder_event_listener = ReminderEventListener()
@@ -1,6 +1,5 @@
 import random
 import string
-import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from twilio.rest import Client
@@ -51,10 +50,9 @@ class SMSService:
         """
         try:
             cache_key = self._get_verification_cache_key(phone)
-            existing_code_data = Cache.get(cache_key)
+            existing_data = Cache.get(cache_key)
             
-            if existing_code_data:
-                existing_data = json.loads(existing_code_data)
+            if existing_data:
                 sent_at = datetime.fromisoformat(existing_data['sent_at'])
                 if datetime.now() - sent_at < timedelta(minutes=1):
                     raise HTTPException(
@@ -82,7 +80,7 @@ class SMSService:
             
             Cache.set(
                 cache_key,
-                json.dumps(verification_data),
+                verification_data,
                 expiry=settings.SMS_VERIFICATION_EXPIRY
             )
             
@@ -121,16 +119,14 @@ class SMSService:
         """
         try:
             cache_key = self._get_verification_cache_key(phone)
-            verification_data_json = Cache.get(cache_key)
+            verification_data = Cache.get(cache_key)
             
-            if not verification_data_json:
+            if not verification_data:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Verification code expired or not found. Please request a new code."
                 )
             
-            verification_data = json.loads(verification_data_json)
-            
             if verification_data.get('attempts', 0) >= 3:
                 Cache.delete(cache_key)
                 raise HTTPException(
@@ -142,7 +138,7 @@ class SMSService:
                 verification_data['attempts'] = verification_data.get('attempts', 0) + 1
                 Cache.set(
                     cache_key,
-                    json.dumps(verification_data),
+                    verification_data,
                     expiry=settings.SMS_VERIFICATION_EXPIRY
                 )
                 
@@ -159,13 +155,13 @@ class SMSService:
             }
             
             verified_cache_key = self._get_verified_status_cache_key(phone)
-            Cache.set(
-                verified_cache_key,
-                json.dumps(verified_status),
-                expiry=settings.SMS_VERIFICATION_CACHE_EXPIRY
-            )
-            
-            Cache.delete(cache_key)
+            with Cache.batch():
+                Cache.set(
+                    verified_cache_key,
+                    verified_status,
+                    expiry=settings.SMS_VERIFICATION_CACHE_EXPIRY
+                )
+                Cache.delete(cache_key)
             
             return {
                 'success': True,
@@ -193,12 +189,11 @@ class SMSService:
         """
         try:
             verified_cache_key = self._get_verified_status_cache_key(phone)
-            verified_data_json = Cache.get(verified_cache_key)
+            verified_data = Cache.get(verified_cache_key)
             
-            if not verified_data_json:
+            if not verified_data:
                 return False
             
-            verified_data = json.loads(verified_data_json)
             expires_at = datetime.fromisoformat(verified_data['expires_at'])
             
             if datetime.now() > expires_at:
@@ -222,16 +217,15 @@ class SMSService:
         """
         try:
             verified_cache_key = self._get_verified_status_cache_key(phone)
-            verified_data_json = Cache.get(verified_cache_key)
+            verified_data = Cache.get(verified_cache_key)
             
-            if not verified_data_json:
+            if not verified_data:
                 return {
                     'verified': False,
                     'message': 'Phone number not verified',
                     'expires_at': None
                 }
             
-            verified_data = json.loads(verified_data_json)
             expires_at = datetime.fromisoformat(verified_data['expires_at'])
             
             if datetime.now() > expires_at:
@@ -4,6 +4,7 @@ from src.schemas.user import UserCreate, UserUpdate, UserLogin, UserSession
 from src.services.sms_service import sms_service
 from src.core.config import settings
 from src.utils.cache import Cache
+from src.services.pagination import Page, paginate
 from fastapi import HTTPException, status
 
 from typing import List, Optional
@@ -78,8 +79,7 @@ class UserService:
             is_active=user.is_active
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        db.flush()
         return db_user
     
     @staticmethod
@@ -147,7 +147,7 @@ class UserService:
             "created_at": datetime.datetime.now().isoformat()
         }
 
-        Cache.set(f"session_{session_token}", json.dumps(session_data), expiry=int(settings.SESSION_TOKEN_EXPIRY.total_seconds()))
+        Cache.set(f"session_{session_token}", session_data, expiry=int(settings.SESSION_TOKEN_EXPIRY.total_seconds()))
         
         print(f"Session issued for user {user_id}: {session_token}")
         return session_data
@@ -182,7 +182,7 @@ class UserService:
             return False
         
         user.is_active = True
-        db.commit()
+        db.flush()
         return True
     
     @staticmethod
@@ -194,12 +194,13 @@ class UserService:
         if not session_token:
             return None
         
-        session_data_json = Cache.get(f"session_{session_token}")
-        if not session_data_json:
+        session_data = Cache.get(f"session_{session_token}")
+        if not session_data:
             return None
         
         try:
-            session_data = json.loads(session_data_json)
+            if not isinstance(session_data, dict):
+                raise ValueError("Malformed session data")
             user_id = session_data.get("user_id")
             expires_at_str = session_data.get("expires_at")
             
@@ -233,6 +234,11 @@ class UserService:
         """Get all users with pagination"""
         return db.query(User).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_users_page(db: Session, limit: Optional[int] = None, cursor: Optional[str] = None, skip: int = 0) -> Page:
+        """Get one page of users in ID order; skip is only honoured without a cursor"""
+        return paginate(db.query(User), [User.id], limit=limit, cursor=cursor, skip=skip)
+
     @staticmethod
     def get_active_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         """Get all active users with pagination"""
@@ -249,8 +255,7 @@ class UserService:
         for field, value in update_data.items():
             setattr(db_user, field, value)
         
-        db.commit()
-        db.refresh(db_user)
+        db.flush()
         return db_user
     
     @staticmethod
@@ -261,5 +266,5 @@ class UserService:
             return False
         
         db.delete(db_user)
-        db.commit()
+        db.flush()
         return True
@@ -1,3 +1,3 @@
-from .cache import Cache
+from .cache import Cache, AsyncCache
 
-__all__ = ["Cache"]
+__all__ = ["Cache", "AsyncCache"]
\ No newline at end of file
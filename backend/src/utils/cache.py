@@ -1,62 +1,1161 @@
 import redis
+import redis.asyncio as aioredis
 import json
-from typing import Any, Optional
+import math
+import asyncio
+import time
+import uuid
+import random
+import fnmatch
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.core.config import settings
+from src.utils.codec import decode, get_codec
+from src.utils.memory_redis import MemoryRedis, AsyncMemoryRedis
+from src.utils.cache_metrics import KEY_PREFIXES, cache_metrics
+
+# Payloads are binary (version byte + codec body), so responses are not decoded to str
+_pool_options = {
+    "decode_responses": False,
+    "max_connections": settings.REDIS_MAX_CONNECTIONS,
+    "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+}
+
+
+
+def _build_clients(url: str):
+    """Create the sync and async clients for REDIS_URL; memory:// and fakeredis:// stay in-process"""
+    if url.startswith("memory://"):
+        client = MemoryRedis(settings.CACHE_FALLBACK_MAX_ENTRIES)
+        return client, AsyncMemoryRedis(client)
+    if url.startswith("fakeredis://"):
+        try:
+            import fakeredis
+        except ImportError:
+            raise ImportError("REDIS_URL=fakeredis:// requires the fakeredis package; run `pip install fakeredis`")
+        server = fakeredis.FakeServer()
+        return fakeredis.FakeRedis(server=server), fakeredis.aioredis.FakeRedis(server=server)
+    # Connections are opened lazily on first use
+    return redis.from_url(url, **_pool_options), aioredis.from_url(url, **_pool_options)
+
+
+# Sync client serves routes and the scheduler thread, async client serves async routes
+redis_client, async_redis_client = _build_clients(settings.REDIS_URL)
+
+# Serves reads and writes while the circuit breaker is open; the keys it touched are invalidated in Redis on recovery
+fallback_client = MemoryRedis(settings.CACHE_FALLBACK_MAX_ENTRIES, journaling=True)
+async_fallback_client = AsyncMemoryRedis(fallback_client)
+
+codec = get_codec(settings.CACHE_CODEC)
+
+# Identifies this worker on the invalidation channel so it can skip its own messages
+INSTANCE_ID = uuid.uuid4().hex
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with a TTL per key"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 30):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get encoded value, dropping it if its TTL has passed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store encoded value, evicting the least recently used entry when full"""
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0:
+            self.delete(key)
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def delete_pattern(self, pattern: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for each cache tier"""
+
+    TIERS = ("local", "redis")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {tier: {"hits": 0, "misses": 0} for tier in self.TIERS}
+
+    def record(self, tier: str, hit: bool) -> None:
+        with self._lock:
+            self._counters[tier]["hits" if hit else "misses"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {tier: dict(counts) for tier, counts in self._counters.items()}
+
+
+# Local tier is optional and shared by every Cache call in this process
+local_cache: Optional[LocalCache] = (
+    LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_TTL_SECONDS)
+    if settings.CACHE_LOCAL_ENABLED else None
+)
+cache_stats = CacheStats()
+
+
+def _is_outage(error: Exception) -> bool:
+    """Connection-level failures mean Redis is unreachable; anything else is a per-call problem"""
+    return isinstance(error, (redis.ConnectionError, redis.TimeoutError, OSError))
+
+
+class CircuitBreaker:
+    """
+    Stops sending cache traffic to Redis after repeated connection failures
+
+    Trips once failure_threshold outages happen within window seconds. While
+    open, callers use the in-memory fallback instead of paying a connect
+    timeout per request. After reset_timeout a single background probe
+    (PING) runs; if it succeeds, on_recover is called and the breaker closes.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        window: float,
+        reset_timeout: float,
+        probe: Callable[[], Any],
+        on_recover: Optional[Callable[[], None]] = None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._probe = probe
+        self._on_recover = on_recover
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures: List[float] = []
+            self._opened_at = 0.0
+
+    def record_failure(self, error: Exception) -> None:
+        if not _is_outage(error):
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                return
+            now = time.monotonic()
+            self._failures = [at for at in self._failures if now - at < self.window]
+            self._failures.append(now)
+            if len(self._failures) >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = now
+                self._failures = []
+                print(f"Cache circuit breaker opened after {self.failure_threshold} Redis failures; using in-memory fallback")
+
+    def allow(self) -> bool:
+        """True if callers should use Redis; never blocks on the probe"""
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            if self.state != self.OPEN or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        threading.Thread(target=self._run_probe, daemon=True).start()
+        return False
+
+    def _run_probe(self) -> None:
+        try:
+            self._probe()
+            if self._on_recover is not None:
+                self._on_recover()
+        except Exception as e:
+            print(f"Cache circuit breaker probe failed: {e}")
+            with self._lock:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            return
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = []
+        print("Cache circuit breaker closed; Redis is reachable again")
+
+
+def _replay_fallback() -> None:
+    """
+    Replay the invalidations made to the fallback during an outage onto Redis
+
+    Values are not copied back: other workers may have written newer ones,
+    or invalidated the key, while this one was cut off. Every key touched
+    here is deleted from Redis instead, so the worst case is a miss and a
+    reload, never a stale entry. Sessions and challenges issued during the
+    outage only ever lived in this worker and are dropped with it.
+
+    If the outage touched more keys than the journal holds, the dropped ones
+    (a session revocation, say) are unknown, so every key the app writes is
+    deleted instead, sessions included; only locks held by other workers stay.
+    """
+    overflowed = fallback_client.journal_overflowed
+    entries = fallback_client.drain_journal()
+    if overflowed:
+        for prefix in KEY_PREFIXES:
+            if prefix == "lock_":
+                continue
+            batch: List = []
+            for key in redis_client.scan_iter(match=f"{prefix}*", count=settings.CACHE_SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                    redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                redis_client.unlink(*batch)
+    if entries:
+        keys = [key for key, _, _ in entries]
+        # Tags touched during the outage may have members in Redis the fallback never saw
+        tag_keys = [key for key in keys if key.startswith("tag_")]
+        stale: set = set()
+        if tag_keys:
+            pipe = redis_client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            stale = {_as_str(key) for members in pipe.execute() for key in members}
+        redis_client.unlink(*stale.union(keys))
+    fallback_client.flushall()
+    # Invalidations published by other workers during the outage were missed
+    if local_cache is not None:
+        local_cache.clear()
+
+
+circuit_breaker = CircuitBreaker(
+    settings.CACHE_BREAKER_FAILURE_THRESHOLD,
+    settings.CACHE_BREAKER_WINDOW_SECONDS,
+    settings.CACHE_BREAKER_RESET_SECONDS,
+    probe=lambda: redis_client.ping(),
+    on_recover=_replay_fallback,
+)
+
+
+def _client():
+    return redis_client if circuit_breaker.allow() else fallback_client
+
+
+def _async_client():
+    return async_redis_client if circuit_breaker.allow() else async_fallback_client
+
+
+def user_tag(user_id: int) -> str:
+    """Tag shared by every cache entry derived from one user's data"""
+    return f"user_{user_id}"
+
+
+def doctor_tag(doctor_id: int) -> str:
+    """Tag shared by every cache entry derived from one doctor's data"""
+    return f"doctor_{doctor_id}"
+
+
+def doctors_tag() -> str:
+    """Tag shared by every cached page of the doctor list"""
+    return "doctors_all"
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag_{tag}"
+
+
+def _as_str(key: Any) -> str:
+    return key.decode("utf-8") if isinstance(key, bytes) else key
+
+
+def _add_to_tags(pipe, key: str, tags: Optional[List[str]], expiry: int) -> None:
+    # Tag sets outlive their members; stale members only cost a no-op delete
+    for tag in tags or []:
+        tag_key = _tag_key(tag)
+        pipe.sadd(tag_key, key)
+        pipe.expire(tag_key, max(expiry, settings.CACHE_TAG_TTL_SECONDS))
+
+
+def _should_refresh(entry: Any, beta: float) -> bool:
+    """XFetch: recompute early with a probability that grows as expiry nears and with recompute cost"""
+    if not isinstance(entry, dict) or "expires_at" not in entry:
+        return True
+    delta = entry.get("delta", 0)
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= entry["expires_at"]
+
+
+def _invalidation_message(keys: Optional[List[str]] = None, pattern: Optional[str] = None) -> str:
+    return json.dumps({"origin": INSTANCE_ID, "keys": keys or [], "pattern": pattern})
+
+
+def apply_invalidation_message(data: str) -> None:
+    """Evict local entries named by an invalidation message from another worker"""
+    if local_cache is None:
+        return
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+    if message.get("origin") == INSTANCE_ID:
+        return
+    for key in message.get("keys", []):
+        local_cache.delete(key)
+    if message.get("pattern"):
+        local_cache.delete_pattern(message["pattern"])
+
+
+class InvalidationListener:
+    """Background subscriber that keeps the local tier coherent across workers"""
+
+    def __init__(self) -> None:
+        self.running: bool = False
+        self.thread: Optional[threading.Thread] = None
+
+    def _listen(self) -> None:
+        backoff = 1
+        while self.running:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                backoff = 1
+                while self.running:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        apply_invalidation_message(message["data"])
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                # Anything cached while disconnected may have missed invalidations
+                if local_cache is not None:
+                    local_cache.clear()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        # A memory:// backend lives in this process, so there is nobody to hear from
+        if self.running or local_cache is None or isinstance(redis_client, MemoryRedis):
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=5)
+
+
+invalidation_listener = InvalidationListener()
+
+
+class CacheBatch:
+    """
+    Buffers Cache mutations and writes them to Redis in one pipeline on exit
+
+    Sets and deletes made through Cache while the batch is open are visible
+    to Cache reads in the same context. Pending tag invalidations are not:
+    their members are only resolved at flush time. Nested batches join the
+    outermost one, which does the flush.
+    """
+
+    def __init__(self) -> None:
+        self._ops: List[Tuple] = []
+        self._pending: Dict[str, Optional[bytes]] = {}
+        self._token = None
+        # Contexts copied from the request (e.g. threads) may outlive it; stop buffering once flushed
+        self.active = False
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    def peek(self, key: str) -> Optional[bytes]:
+        """Encoded value buffered for key, or None if the key is pending deletion"""
+        return self._pending.get(key)
+
+    def add_set(self, key: str, payload: bytes, expiry: int, tags: Optional[List[str]] = None) -> None:
+        self._ops.append(("set", key, payload, expiry, tuple(tags or ())))
+        self._pending[key] = payload
+
+    def add_delete(self, keys: List[str]) -> None:
+        self._ops.append(("delete", list(keys)))
+        for key in keys:
+            self._pending[key] = None
+
+    def add_invalidate(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        self._ops.append(("tags", tags))
+        for op in self._ops:
+            if op[0] == "set" and set(op[4]) & set(tags):
+                self._pending[op[1]] = None
+
+    def flush(self) -> None:
+        """Write every buffered mutation: one transaction to resolve tags (if any) and one pipeline"""
+        ops, self._ops = self._ops, []
+        self._pending.clear()
+        if not ops:
+            return
+        try:
+            tags = sorted({tag for op in ops if op[0] == "tags" for tag in op[1]})
+            members: Dict[str, set] = {}
+            if tags:
+                pipe = _client().pipeline(transaction=True)
+                for tag in tags:
+                    pipe.smembers(_tag_key(tag))
+                pipe.delete(*[_tag_key(tag) for tag in tags])
+                results = pipe.execute()[:-1]
+                members = {tag: {_as_str(key) for key in keys} for tag, keys in zip(tags, results)}
+
+            pipe = _client().pipeline(transaction=False)
+            written: Dict[str, Tuple[bytes, int]] = {}
+            touched: List[str] = []
+            # Keys set earlier in this batch that a later tag invalidation must also remove
+            tagged: Dict[str, set] = {}
+            for op in ops:
+                if op[0] == "set":
+                    _, key, payload, expiry, op_tags = op
+                    pipe.setex(key, expiry, payload)
+                    _add_to_tags(pipe, key, list(op_tags), expiry)
+                    for tag in op_tags:
+                        tagged.setdefault(tag, set()).add(key)
+                    written[key] = (payload, expiry)
+                    touched.append(key)
+                    continue
+                if op[0] == "delete":
+                    keys = op[1]
+                else:
+                    keys = sorted(set().union(*(members.pop(tag, set()) | tagged.pop(tag, set()) for tag in op[1])))
+                if keys:
+                    pipe.unlink(*keys)
+                    for key in keys:
+                        written.pop(key, None)
+                    touched.extend(keys)
+
+            if local_cache is not None:
+                for key in touched:
+                    local_cache.delete(key)
+                if touched:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=sorted(set(touched))))
+            pipe.execute()
+            if local_cache is not None:
+                for key, (payload, expiry) in written.items():
+                    local_cache.set(key, payload, ttl=expiry)
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache batch flush error: {e}")
+
+    def __enter__(self) -> "CacheBatch":
+        if _active_batch() is None:
+            self._token = _current_batch.set(self)
+            self.active = True
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        if self._token is not None:
+            _current_batch.reset(self._token)
+            self._token = None
+            self.active = False
+            self.flush()
+        return False
+
+    async def __aenter__(self) -> "CacheBatch":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> bool:
+        # Flush off the event loop; the sync client would otherwise block it
+        if self._token is not None:
+            _current_batch.reset(self._token)
+            self._token = None
+            self.active = False
+            await asyncio.to_thread(self.flush)
+        return False
+
+
+_current_batch: ContextVar[Optional[CacheBatch]] = ContextVar("cache_batch", default=None)
+
+
+def _active_batch() -> Optional[CacheBatch]:
+    batch = _current_batch.get()
+    return batch if batch is not None and batch.active else None
 
-# Redis client for caching
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
 class Cache:
-    """Simple Redis cache wrapper with JSON support"""
-    
+    """Redis cache wrapper with a pluggable codec and an optional in-process tier"""
+
+    @staticmethod
+    def batch() -> CacheBatch:
+        """Context manager that buffers mutations until exit and writes them in one pipeline"""
+        return CacheBatch()
+
     @staticmethod
     def get(key: str) -> Optional[Any]:
         """Get value from cache"""
+        started = time.perf_counter()
         try:
-            value = redis_client.get(key)
+            batch = _active_batch()
+            if batch is not None and key in batch:
+                return decode(batch.peek(key))
+
+            value = None
+            if local_cache is not None:
+                value = local_cache.get(key)
+                cache_stats.record("local", value is not None)
+
+            if value is None:
+                if local_cache is not None:
+                    # Fetch the remaining TTL in the same round trip so the local copy never outlives Redis
+                    pipe = _client().pipeline(transaction=False)
+                    pipe.get(key)
+                    pipe.pttl(key)
+                    value, ttl_ms = pipe.execute()
+                    if value and ttl_ms and ttl_ms > 0:
+                        local_cache.set(key, value, ttl=ttl_ms / 1000)
+                else:
+                    value = _client().get(key)
+                cache_stats.record("redis", bool(value))
+
+            cache_metrics.record_get([key], {key: len(value)} if value else {}, time.perf_counter() - started)
             if value:
-                return json.loads(value)
+                return decode(value)
             return None
         except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
             print(f"Cache get error: {e}")
             return None
-    
+
     @staticmethod
-    def set(key: str, value: Any, expiry: int = 3600) -> bool:
-        """Set value in cache with expiry in seconds"""
+    def set(key: str, value: Any, expiry: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """Set value in cache with expiry in seconds, optionally registering it under tags"""
+        started = time.perf_counter()
         try:
-            json_value = json.dumps(value, default=str)
-            return redis_client.setex(key, expiry, json_value)
+            payload = codec.encode(value)
+            batch = _active_batch()
+            if batch is not None:
+                batch.add_set(key, payload, expiry, tags)
+                result = True
+            elif local_cache is None and not tags:
+                result = _client().setex(key, expiry, payload)
+            else:
+                pipe = _client().pipeline(transaction=False)
+                pipe.setex(key, expiry, payload)
+                _add_to_tags(pipe, key, tags, expiry)
+                if local_cache is not None:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+                result = pipe.execute()[0]
+                if local_cache is not None:
+                    local_cache.set(key, payload, ttl=expiry)
+            cache_metrics.record_set({key: len(payload)}, time.perf_counter() - started)
+            return result
         except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
             print(f"Cache set error: {e}")
             return False
-    
+
+    @staticmethod
+    def claim(key: str, expiry: int) -> bool:
+        """Set key only if it is absent (SET NX), so one worker wins; False if another holds it or the cache errored"""
+        try:
+            return bool(_client().set(key, uuid.uuid4().hex, nx=True, ex=expiry))
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache claim error: {e}")
+            return False
+
     @staticmethod
     def delete(key: str) -> bool:
         """Delete key from cache"""
+        started = time.perf_counter()
         try:
-            return bool(redis_client.delete(key))
+            batch = _active_batch()
+            if batch is not None:
+                batch.add_delete([key])
+                result = True
+            elif local_cache is None:
+                result = bool(_client().delete(key))
+            else:
+                local_cache.delete(key)
+                pipe = _client().pipeline(transaction=False)
+                pipe.delete(key)
+                pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+                result = bool(pipe.execute()[0])
+            cache_metrics.record_delete([key], time.perf_counter() - started)
+            return result
         except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
             print(f"Cache delete error: {e}")
             return False
-    
+
     @staticmethod
     def exists(key: str) -> bool:
         """Check if key exists in cache"""
         try:
-            return bool(redis_client.exists(key))
+            batch = _active_batch()
+            if batch is not None and key in batch:
+                return batch.peek(key) is not None
+            if local_cache is not None and local_cache.get(key) is not None:
+                return True
+            return bool(_client().exists(key))
         except Exception as e:
+            circuit_breaker.record_failure(e)
             print(f"Cache exists error: {e}")
             return False
-    
+
     @staticmethod
-    def clear_pattern(pattern: str) -> int:
-        """Delete all keys matching pattern"""
+    def get_many(keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round trip; missing keys are left out of the result"""
+        started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        sizes: Dict[str, int] = {}
+        looked_up: List[str] = []
+        try:
+            batch = _active_batch()
+            missing: List[str] = []
+            for key in keys:
+                if batch is not None and key in batch:
+                    if batch.peek(key) is not None:
+                        results[key] = decode(batch.peek(key))
+                    continue
+                looked_up.append(key)
+                if local_cache is not None:
+                    value = local_cache.get(key)
+                    cache_stats.record("local", value is not None)
+                    if value is not None:
+                        results[key] = decode(value)
+                        sizes[key] = len(value)
+                        continue
+                missing.append(key)
+            if not missing:
+                cache_metrics.record_get(looked_up, sizes, time.perf_counter() - started)
+                return results
+
+            if local_cache is not None:
+                pipe = _client().pipeline(transaction=False)
+                pipe.mget(missing)
+                for key in missing:
+                    pipe.pttl(key)
+                values, *ttls = pipe.execute()
+                for key, value, ttl_ms in zip(missing, values, ttls):
+                    if value and ttl_ms and ttl_ms > 0:
+                        local_cache.set(key, value, ttl=ttl_ms / 1000)
+            else:
+                values = _client().mget(missing)
+
+            for key, value in zip(missing, values):
+                cache_stats.record("redis", bool(value))
+                if value:
+                    results[key] = decode(value)
+                    sizes[key] = len(value)
+            cache_metrics.record_get(looked_up, sizes, time.perf_counter() - started)
+            return results
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(keys)
+            print(f"Cache get many error: {e}")
+            return results
+
+    @staticmethod
+    def set_many(mapping: Dict[str, Any], expiry: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """Set several values with the same expiry and tags in one round trip"""
+        if not mapping:
+            return True
+        started = time.perf_counter()
         try:
-            keys = redis_client.keys(pattern)
-            if keys:
-                return redis_client.delete(*keys)
+            payloads = {key: codec.encode(value) for key, value in mapping.items()}
+            batch = _active_batch()
+            if batch is not None:
+                for key, payload in payloads.items():
+                    batch.add_set(key, payload, expiry, tags)
+            else:
+                pipe = _client().pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipe.setex(key, expiry, payload)
+                    _add_to_tags(pipe, key, tags, expiry)
+                if local_cache is not None:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=list(payloads)))
+                pipe.execute()
+                if local_cache is not None:
+                    for key, payload in payloads.items():
+                        local_cache.set(key, payload, ttl=expiry)
+            cache_metrics.record_set({key: len(payload) for key, payload in payloads.items()}, time.perf_counter() - started)
+            return True
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(mapping)
+            print(f"Cache set many error: {e}")
+            return False
+
+    @staticmethod
+    def delete_many(*keys: str) -> int:
+        """Delete several keys in one round trip, returning how many existed"""
+        if not keys:
             return 0
+        started = time.perf_counter()
+        try:
+            batch = _active_batch()
+            if batch is not None:
+                batch.add_delete(list(keys))
+                deleted = 0
+            else:
+                deleted = Cache._unlink_keys(list(keys))
+            cache_metrics.record_delete(keys, time.perf_counter() - started)
+            return deleted
         except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(keys)
+            print(f"Cache delete many error: {e}")
+            return 0
+
+    @staticmethod
+    def _unlink_keys(keys: List[str]) -> int:
+        """Unlink keys in one pipelined round trip and evict them from every worker's local tier"""
+        if not keys:
+            return 0
+        pipe = _client().pipeline(transaction=False)
+        pipe.unlink(*keys)
+        if local_cache is not None:
+            for key in keys:
+                local_cache.delete(key)
+            pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=keys))
+        return pipe.execute()[0]
+
+    @staticmethod
+    def clear_pattern(pattern: str) -> int:
+        """Delete all keys matching pattern using incremental SCAN instead of KEYS"""
+        try:
+            # SCAN cannot see buffered writes, so apply them before matching
+            pending = _active_batch()
+            if pending is not None:
+                pending.flush()
+            deleted = 0
+            batch: List[str] = []
+            for key in _client().scan_iter(match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE):
+                batch.append(_as_str(key))
+                if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                    deleted += Cache._unlink_keys(batch)
+                    batch = []
+            deleted += Cache._unlink_keys(batch)
+            return deleted
+        except Exception as e:
+            circuit_breaker.record_failure(e)
             print(f"Cache clear pattern error: {e}")
             return 0
+
+    @staticmethod
+    def iter_keys(pattern: str) -> Iterator[str]:
+        """Yield keys matching pattern using incremental SCAN; stops quietly if the cache is unreachable"""
+        try:
+            for key in _client().scan_iter(match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE):
+                yield _as_str(key)
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache scan error: {e}")
+
+    @staticmethod
+    def invalidate_tags(*tags: str) -> int:
+        """Delete every key registered under any of the given tags"""
+        if not tags:
+            return 0
+        try:
+            batch = _active_batch()
+            if batch is not None:
+                batch.add_invalidate(tags)
+                return 0
+            tag_keys = [_tag_key(tag) for tag in tags]
+            # Read and drop the tag sets atomically so keys tagged afterwards land in a fresh set
+            pipe = _client().pipeline(transaction=True)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            pipe.delete(*tag_keys)
+            members = pipe.execute()[:-1]
+            keys = sorted({_as_str(key) for member_keys in members for key in member_keys})
+            return Cache._unlink_keys(keys)
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache invalidate tags error: {e}")
+            return 0
+
+    @staticmethod
+    def refresh(key: str, loader: Callable[[], Any], expiry: int = 3600, tags: Optional[List[str]] = None) -> Any:
+        """Run loader and store its result with the bookkeeping get_or_load needs for early refresh"""
+        started = time.monotonic()
+        value = loader()
+        entry = {
+            "value": value,
+            "delta": time.monotonic() - started,
+            "expires_at": time.time() + expiry,
+        }
+        # Fills are written through immediately so workers waiting on the lock can see them
+        token = _current_batch.set(None)
+        try:
+            Cache.set(key, entry, expiry=expiry, tags=tags)
+        finally:
+            _current_batch.reset(token)
+        return value
+
+    @staticmethod
+    def get_or_load(
+        key: str,
+        loader: Callable[[], Any],
+        expiry: int = 3600,
+        tags: Optional[List[str]] = None,
+        beta: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, calling loader to fill it when needed.
+
+        Hot keys are refreshed early (XFetch) and only one worker at a time
+        recomputes a key; the others serve the stale value or wait briefly
+        for the winner instead of all hitting the database.
+        """
+        beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+        entry = Cache.get(key)
+        if not _should_refresh(entry, beta):
+            return entry["value"]
+
+        lock_key = f"lock_{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = _client().set(lock_key, token, nx=True, ex=settings.CACHE_LOCK_TIMEOUT_SECONDS)
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache lock error: {e}")
+            return loader()
+
+        if acquired:
+            try:
+                return Cache.refresh(key, loader, expiry=expiry, tags=tags)
+            finally:
+                Cache._release_lock(lock_key, token)
+
+        # Another worker is recomputing: serve what we have, or wait for its result
+        if isinstance(entry, dict) and "value" in entry:
+            return entry["value"]
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = Cache.get(key)
+            if isinstance(entry, dict) and "value" in entry:
+                return entry["value"]
+        return loader()
+
+    @staticmethod
+    def _release_lock(lock_key: str, token: str) -> None:
+        """Delete the lock only if we still own it"""
+        try:
+            with _client().pipeline() as pipe:
+                pipe.watch(lock_key)
+                if _as_str(pipe.get(lock_key)) == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Cache lock release error: {e}")
+
+    @staticmethod
+    def stats() -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per tier; redis counters only cover lookups the local tier missed"""
+        return cache_stats.snapshot()
+
+    @staticmethod
+    def prometheus_metrics() -> str:
+        """Per-prefix metrics plus tier counters and breaker state in Prometheus text format"""
+        tiers = cache_stats.snapshot()
+        extra = [
+            "# HELP cache_tier_lookups_total Lookups per cache tier",
+            "# TYPE cache_tier_lookups_total counter",
+        ]
+        for tier, counts in tiers.items():
+            for result, count in counts.items():
+                extra.append(f'cache_tier_lookups_total{{tier="{tier}",result="{result}"}} {count}')
+        extra += [
+            "# HELP cache_circuit_breaker_open Whether the cache is serving from the in-memory fallback",
+            "# TYPE cache_circuit_breaker_open gauge",
+            f"cache_circuit_breaker_open {int(circuit_breaker.state != CircuitBreaker.CLOSED)}",
+        ]
+        return cache_metrics.render_prometheus(extra)
+
+
+class AsyncCache:
+    """Async counterpart of Cache built on redis.asyncio, sharing the same local tier"""
+
+    @staticmethod
+    async def get(key: str) -> Optional[Any]:
+        """Get value from cache"""
+        started = time.perf_counter()
+        try:
+            value = None
+            if local_cache is not None:
+                value = local_cache.get(key)
+                cache_stats.record("local", value is not None)
+
+            if value is None:
+                if local_cache is not None:
+                    async with _async_client().pipeline(transaction=False) as pipe:
+                        pipe.get(key)
+                        pipe.pttl(key)
+                        value, ttl_ms = await pipe.execute()
+                    if value and ttl_ms and ttl_ms > 0:
+                        local_cache.set(key, value, ttl=ttl_ms / 1000)
+                else:
+                    value = await _async_client().get(key)
+                cache_stats.record("redis", bool(value))
+
+            cache_metrics.record_get([key], {key: len(value)} if value else {}, time.perf_counter() - started)
+            if value:
+                return decode(value)
+            return None
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
+            print(f"Async cache get error: {e}")
+            return None
+
+    @staticmethod
+    async def set(key: str, value: Any, expiry: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """Set value in cache with expiry in seconds, optionally registering it under tags"""
+        started = time.perf_counter()
+        try:
+            payload = codec.encode(value)
+            if local_cache is None and not tags:
+                result = await _async_client().setex(key, expiry, payload)
+            else:
+                async with _async_client().pipeline(transaction=False) as pipe:
+                    pipe.setex(key, expiry, payload)
+                    _add_to_tags(pipe, key, tags, expiry)
+                    if local_cache is not None:
+                        pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+                    result = (await pipe.execute())[0]
+                if local_cache is not None:
+                    local_cache.set(key, payload, ttl=expiry)
+            cache_metrics.record_set({key: len(payload)}, time.perf_counter() - started)
+            return result
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
+            print(f"Async cache set error: {e}")
+            return False
+
+    @staticmethod
+    async def delete(key: str) -> bool:
+        """Delete key from cache"""
+        started = time.perf_counter()
+        try:
+            if local_cache is None:
+                result = bool(await _async_client().delete(key))
+            else:
+                local_cache.delete(key)
+                async with _async_client().pipeline(transaction=False) as pipe:
+                    pipe.delete(key)
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+                    result = bool((await pipe.execute())[0])
+            cache_metrics.record_delete([key], time.perf_counter() - started)
+            return result
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error([key])
+            print(f"Async cache delete error: {e}")
+            return False
+
+    @staticmethod
+    async def exists(key: str) -> bool:
+        """Check if key exists in cache"""
+        try:
+            if local_cache is not None and local_cache.get(key) is not None:
+                return True
+            return bool(await _async_client().exists(key))
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Async cache exists error: {e}")
+            return False
+
+    @staticmethod
+    async def get_many(keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round trip; missing keys are left out of the result"""
+        started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        sizes: Dict[str, int] = {}
+        try:
+            missing: List[str] = []
+            for key in keys:
+                if local_cache is not None:
+                    value = local_cache.get(key)
+                    cache_stats.record("local", value is not None)
+                    if value is not None:
+                        results[key] = decode(value)
+                        sizes[key] = len(value)
+                        continue
+                missing.append(key)
+            if not missing:
+                cache_metrics.record_get(keys, sizes, time.perf_counter() - started)
+                return results
+
+            if local_cache is not None:
+                async with _async_client().pipeline(transaction=False) as pipe:
+                    pipe.mget(missing)
+                    for key in missing:
+                        pipe.pttl(key)
+                    values, *ttls = await pipe.execute()
+                for key, value, ttl_ms in zip(missing, values, ttls):
+                    if value and ttl_ms and ttl_ms > 0:
+                        local_cache.set(key, value, ttl=ttl_ms / 1000)
+            else:
+                values = await _async_client().mget(missing)
+
+            for key, value in zip(missing, values):
+                cache_stats.record("redis", bool(value))
+                if value:
+                    results[key] = decode(value)
+                    sizes[key] = len(value)
+            cache_metrics.record_get(keys, sizes, time.perf_counter() - started)
+            return results
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(keys)
+            print(f"Async cache get many error: {e}")
+            return results
+
+    @staticmethod
+    async def set_many(mapping: Dict[str, Any], expiry: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """Set several values with the same expiry and tags in one round trip"""
+        if not mapping:
+            return True
+        started = time.perf_counter()
+        try:
+            payloads = {key: codec.encode(value) for key, value in mapping.items()}
+            async with _async_client().pipeline(transaction=False) as pipe:
+                for key, payload in payloads.items():
+                    pipe.setex(key, expiry, payload)
+                    _add_to_tags(pipe, key, tags, expiry)
+                if local_cache is not None:
+                    pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=list(payloads)))
+                await pipe.execute()
+            if local_cache is not None:
+                for key, payload in payloads.items():
+                    local_cache.set(key, payload, ttl=expiry)
+            cache_metrics.record_set({key: len(payload) for key, payload in payloads.items()}, time.perf_counter() - started)
+            return True
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(mapping)
+            print(f"Async cache set many error: {e}")
+            return False
+
+    @staticmethod
+    async def delete_many(*keys: str) -> int:
+        """Delete several keys in one round trip, returning how many existed"""
+        if not keys:
+            return 0
+        started = time.perf_counter()
+        try:
+            deleted = await AsyncCache._unlink_keys(list(keys))
+            cache_metrics.record_delete(keys, time.perf_counter() - started)
+            return deleted
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            cache_metrics.record_error(keys)
+            print(f"Async cache delete many error: {e}")
+            return 0
+
+    @staticmethod
+    async def _unlink_keys(keys: List[str]) -> int:
+        if not keys:
+            return 0
+        async with _async_client().pipeline(transaction=False) as pipe:
+            pipe.unlink(*keys)
+            if local_cache is not None:
+                for key in keys:
+                    local_cache.delete(key)
+                pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, _invalidation_message(keys=keys))
+            return (await pipe.execute())[0]
+
+    @staticmethod
+    async def clear_pattern(pattern: str) -> int:
+        """Delete all keys matching pattern using incremental SCAN instead of KEYS"""
+        try:
+            deleted = 0
+            batch: List[str] = []
+            async for key in _async_client().scan_iter(match=pattern, count=settings.CACHE_SCAN_BATCH_SIZE):
+                batch.append(_as_str(key))
+                if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                    deleted += await AsyncCache._unlink_keys(batch)
+                    batch = []
+            deleted += await AsyncCache._unlink_keys(batch)
+            return deleted
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Async cache clear pattern error: {e}")
+            return 0
+
+    @staticmethod
+    async def invalidate_tags(*tags: str) -> int:
+        """Delete every key registered under any of the given tags"""
+        if not tags:
+            return 0
+        try:
+            tag_keys = [_tag_key(tag) for tag in tags]
+            async with _async_client().pipeline(transaction=True) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                pipe.delete(*tag_keys)
+                members = (await pipe.execute())[:-1]
+            keys = sorted({_as_str(key) for member_keys in members for key in member_keys})
+            return await AsyncCache._unlink_keys(keys)
+        except Exception as e:
+            circuit_breaker.record_failure(e)
+            print(f"Async cache invalidate tags error: {e}")
+            return 0
+
+    @staticmethod
+    async def close() -> None:
+        """Release the async connection pool"""
+        await async_redis_client.aclose()
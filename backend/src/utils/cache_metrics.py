@@ -0,0 +1,252 @@
+import hashlib
+import random
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import settings
+
+# Known cache key families; keys are grouped by the longest matching prefix
+KEY_PREFIXES = (
+    "session_",
+    "sms_verification_code_",
+    "sms_verified_status_",
+    "webauthn_signup_challenge_",
+    "webauthn_login_challenge_",
+    "medicines_user_",
+    "documents_user_",
+    "emergency_contacts_user_",
+    "appointments_user_",
+    "appointments_doctor_",
+    "doctors_all",
+    "entity_appointments_",
+    "entity_doctors_",
+    "entity_documents_",
+    "entity_emergency_contacts_",
+    "entity_medicines_",
+    "tag_",
+    "lock_",
+    "db_primary_pin_",
+)
+
+# Keys under these prefixes embed secrets or phone numbers and are never exported verbatim
+SENSITIVE_PREFIXES = (
+    "session_",
+    "sms_verification_code_",
+    "sms_verified_status_",
+    "webauthn_signup_challenge_",
+    "webauthn_login_challenge_",
+)
+
+_SORTED_PREFIXES = sorted(KEY_PREFIXES, key=len, reverse=True)
+_QUANTILES = (0.5, 0.99)
+
+
+def key_prefix(key: str) -> str:
+    """Metric label for a cache key"""
+    for prefix in _SORTED_PREFIXES:
+        if key.startswith(prefix):
+            return prefix
+    return "other"
+
+
+def redact_key(key: str) -> str:
+    """Replace the identifying part of sensitive keys with a short stable hash"""
+    prefix = key_prefix(key)
+    if prefix in SENSITIVE_PREFIXES:
+        return prefix + hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+    return key
+
+
+class HotKeyTracker:
+    """
+    Approximate top-N of sampled key reads (Space-Saving)
+
+    Tracks at most `capacity` keys; when full, the least counted key is
+    replaced and the newcomer inherits its count, which bounds the error
+    of every estimate by the smallest tracked count.
+    """
+
+    def __init__(self, capacity: int, sample_rate: float):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str) -> None:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] += 1
+            elif len(self._counts) < self.capacity:
+                self._counts[key] = 1
+            else:
+                victim = min(self._counts, key=self._counts.get)
+                self._counts[key] = self._counts.pop(victim) + 1
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """(redacted key, estimated reads) for the n hottest keys"""
+        with self._lock:
+            ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(redact_key(key), count / self.sample_rate) for key, count in ranked]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class CacheMetrics:
+    """Per-prefix counters, latency reservoirs and payload sizes for cache operations"""
+
+    COUNTERS = ("hits", "misses", "sets", "deletes", "errors", "bytes_read", "bytes_written")
+
+    def __init__(self, enabled: bool = True, latency_samples: int = 1024, hot_keys: Optional[HotKeyTracker] = None):
+        self.enabled = enabled
+        self.latency_samples = latency_samples
+        self.hot_keys = hot_keys
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters: Dict[str, Dict[str, int]] = {}
+            self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+            self._latency_totals: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        if self.hot_keys is not None:
+            self.hot_keys.reset()
+
+    def _bump(self, prefix: str, counter: str, amount: int = 1) -> None:
+        counters = self._counters.get(prefix)
+        if counters is None:
+            counters = self._counters[prefix] = dict.fromkeys(self.COUNTERS, 0)
+        counters[counter] += amount
+
+    def _time(self, prefix: str, operation: str, seconds: float) -> None:
+        series = (prefix, operation)
+        samples = self._latencies.get(series)
+        if samples is None:
+            samples = self._latencies[series] = deque(maxlen=self.latency_samples)
+        samples.append(seconds)
+        count, total = self._latency_totals.get(series, (0, 0.0))
+        self._latency_totals[series] = (count + 1, total + seconds)
+
+    def record_get(self, keys: Iterable[str], hits: Dict[str, int], seconds: float) -> None:
+        """Record a lookup; hits maps each found key to its payload size"""
+        if not self.enabled:
+            return
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                prefix = key_prefix(key)
+                if key in hits:
+                    self._bump(prefix, "hits")
+                    self._bump(prefix, "bytes_read", hits[key])
+                else:
+                    self._bump(prefix, "misses")
+            for prefix in {key_prefix(key) for key in keys}:
+                self._time(prefix, "get", seconds)
+        if self.hot_keys is not None:
+            for key in keys:
+                self.hot_keys.observe(key)
+
+    def record_set(self, sizes: Dict[str, int], seconds: float) -> None:
+        """Record a write; sizes maps each written key to its payload size"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for key, size in sizes.items():
+                prefix = key_prefix(key)
+                self._bump(prefix, "sets")
+                self._bump(prefix, "bytes_written", size)
+            for prefix in {key_prefix(key) for key in sizes}:
+                self._time(prefix, "set", seconds)
+
+    def record_delete(self, keys: Iterable[str], seconds: float) -> None:
+        if not self.enabled:
+            return
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                self._bump(key_prefix(key), "deletes")
+            for prefix in {key_prefix(key) for key in keys}:
+                self._time(prefix, "delete", seconds)
+
+    def record_error(self, keys: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for prefix in {key_prefix(key) for key in keys}:
+                self._bump(prefix, "errors")
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Counters and latency quantiles per prefix"""
+        with self._lock:
+            result: Dict[str, Dict[str, float]] = {prefix: dict(counts) for prefix, counts in self._counters.items()}
+            for (prefix, operation), samples in self._latencies.items():
+                ordered = sorted(samples)
+                stats = result.setdefault(prefix, dict.fromkeys(self.COUNTERS, 0))
+                for quantile in _QUANTILES:
+                    stats[f"{operation}_p{int(quantile * 100)}"] = _quantile(ordered, quantile)
+            return result
+
+    def render_prometheus(self, extra: Iterable[str] = ()) -> str:
+        """Prometheus text exposition of every tracked series"""
+        with self._lock:
+            counters = {prefix: dict(counts) for prefix, counts in self._counters.items()}
+            latencies = {series: sorted(samples) for series, samples in self._latencies.items()}
+            totals = dict(self._latency_totals)
+
+        lines: List[str] = []
+        described = {
+            "hits": ("cache_hits_total", "Cache lookups that found a value"),
+            "misses": ("cache_misses_total", "Cache lookups that found nothing"),
+            "sets": ("cache_sets_total", "Cache writes"),
+            "deletes": ("cache_deletes_total", "Cache deletes"),
+            "errors": ("cache_errors_total", "Cache operations that raised"),
+            "bytes_read": ("cache_payload_read_bytes_total", "Encoded payload bytes returned by lookups"),
+            "bytes_written": ("cache_payload_written_bytes_total", "Encoded payload bytes written"),
+        }
+        for counter, (name, help_text) in described.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for prefix in sorted(counters):
+                lines.append(f'{name}{{prefix="{prefix}"}} {counters[prefix][counter]}')
+
+        name = "cache_operation_latency_seconds"
+        lines.append(f"# HELP {name} Cache operation latency including Redis round trips")
+        lines.append(f"# TYPE {name} summary")
+        for (prefix, operation), ordered in sorted(latencies.items()):
+            labels = f'prefix="{prefix}",operation="{operation}"'
+            for quantile in _QUANTILES:
+                lines.append(f'{name}{{{labels},quantile="{quantile}"}} {_quantile(ordered, quantile):.6f}')
+            count, total = totals[(prefix, operation)]
+            lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        if self.hot_keys is not None:
+            name = "cache_hot_key_reads"
+            lines.append(f"# HELP {name} Estimated reads of the hottest keys (sampled; sensitive keys hashed)")
+            lines.append(f"# TYPE {name} gauge")
+            for key, estimate in self.hot_keys.top(settings.CACHE_HOT_KEY_TOP_N):
+                lines.append(f'{name}{{key="{_escape(key)}"}} {estimate:.0f}')
+
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+def _quantile(ordered: List[float], quantile: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+cache_metrics = CacheMetrics(
+    enabled=settings.CACHE_METRICS_ENABLED,
+    latency_samples=settings.CACHE_METRICS_LATENCY_SAMPLES,
+    hot_keys=HotKeyTracker(settings.CACHE_HOT_KEY_TOP_N * 10, settings.CACHE_HOT_KEY_SAMPLE_RATE),
+)
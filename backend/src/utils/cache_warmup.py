@@ -0,0 +1,249 @@
+"""
+Cache warm-up after a deploy
+
+Preloads the first page of `doctors_all`, the list endpoints of recently active users and the
+entity cache so the first minutes of traffic do not all fall through to the
+database. Runs from the application lifespan (before the app starts serving,
+so the health check only answers once it is done) or standalone:
+
+    python -m src.utils.cache_warmup --recency-hours 24 --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+
+from src.core.config import settings
+from src.db.database import SessionLocal
+from src.models.appointment import Appointment
+from src.models.reminder import Reminder
+from src.schemas.appointment import AppointmentResponse
+from src.schemas.doctor import DoctorResponse
+from src.schemas.document import DocumentResponse
+from src.schemas.emergency_contact import EmergencyContactResponse
+from src.schemas.medicine import MedicineResponse
+from src.services.appointment_service import AppointmentService
+from src.services.doctor_service import DoctorService
+from src.services.document_service import DocumentService
+from src.services.emergency_contact_service import EmergencyContactService
+from src.services.medicine_service import MedicineService
+from src.services.pagination import Page, page_cache_key, page_payload
+from src.utils.cache import Cache, doctors_tag, user_tag
+from src.utils.entity_cache import EntityCache
+
+logger = logging.getLogger(__name__)
+
+# Same expiry as the list endpoints that read these keys
+LIST_EXPIRY_SECONDS = 300
+
+# Claimed by the first worker to start; the others skip the warm-up while it is held
+STARTUP_LOCK_KEY = "lock_cache_warmup"
+
+# Per-user list keys and how to load their first page; mirrors the /user/{user_id} endpoints
+USER_LISTS = (
+    ("medicines_user_{}", MedicineService.get_medicines_page, MedicineResponse),
+    ("documents_user_{}", DocumentService.get_documents_page, DocumentResponse),
+    ("appointments_user_{}", AppointmentService.get_appointments_page_by_user, AppointmentResponse),
+    ("emergency_contacts_user_{}", EmergencyContactService.get_contacts_page, EmergencyContactResponse),
+)
+
+
+def _page_loader(load_page: Callable[[], Page], schema) -> Callable[[], Dict[str, Any]]:
+    """Loader that also writes every row through to the entity cache"""
+    def load():
+        page = load_page()
+        EntityCache.put_many(page.items)
+        return page_payload(page, schema)
+    return load
+
+
+def _past_deadline(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _latest(activity: Dict[int, datetime], user_id: int, at: datetime) -> None:
+    if user_id not in activity or at > activity[user_id]:
+        activity[user_id] = at
+
+
+def _session_activity(since: datetime, deadline: Optional[float] = None) -> Dict[int, datetime]:
+    """Latest issue time of each user's sessions issued after `since`; the SCAN stops at the deadline"""
+    activity: Dict[int, datetime] = {}
+    batch: List[str] = []
+
+    def collect():
+        for data in Cache.get_many(batch).values():
+            if not isinstance(data, dict) or "user_id" not in data:
+                continue
+            try:
+                created_at = datetime.fromisoformat(data["created_at"])
+                if created_at >= since:
+                    _latest(activity, int(data["user_id"]), created_at)
+            except (KeyError, TypeError, ValueError):
+                continue
+        batch.clear()
+
+    for key in Cache.iter_keys("session_*"):
+        batch.append(key)
+        if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+            collect()
+            if _past_deadline(deadline):
+                break
+    collect()
+    return activity
+
+
+def recently_active_user_ids(recency: timedelta, limit: int, deadline: Optional[float] = None) -> List[int]:
+    """
+    Users worth warming, most recently active first: a session issued within
+    the window, a reminder touched within it, or an appointment dated inside
+    it (either side of today; upcoming ones count as active now)
+    """
+    now = datetime.now()
+    since = now - recency
+    today = date.today()
+    activity = _session_activity(since, deadline)
+
+    db = SessionLocal()
+    try:
+        reminder_users = (
+            db.query(Reminder.user_id, func.max(Reminder.updated_at).label("updated_at"))
+            .filter(Reminder.updated_at >= since)
+            .group_by(Reminder.user_id)
+        )
+        appointments = db.query(Appointment.user_id, Appointment.date, Appointment.time).filter(
+            Appointment.date >= since.date(),
+            Appointment.date <= today + recency,
+        )
+        for row in reminder_users:
+            _latest(activity, row.user_id, row.updated_at)
+        for row in appointments:
+            _latest(activity, row.user_id, min(datetime.combine(row.date, row.time), now))
+    finally:
+        db.close()
+
+    return sorted(activity, key=lambda user_id: (activity[user_id], -user_id), reverse=True)[:limit]
+
+
+def warm_doctors() -> int:
+    """Fill the first page of `doctors_all` and the doctor entity entries; returns the number of doctors"""
+    db = SessionLocal()
+    try:
+        doctors = Cache.refresh(
+            page_cache_key("doctors_all"),
+            _page_loader(lambda: DoctorService.get_doctors_page(db), DoctorResponse),
+            expiry=LIST_EXPIRY_SECONDS,
+            tags=[doctors_tag()],
+        )
+        return len(doctors["items"])
+    finally:
+        db.close()
+
+
+def warm_user(user_id: int, deadline: Optional[float] = None) -> int:
+    """Fill the first page of every cached list of one user, stopping at the deadline; returns the number of rows loaded"""
+    db = SessionLocal()
+    try:
+        loaded = 0
+        for key, load_page, schema in USER_LISTS:
+            if _past_deadline(deadline):
+                break
+            value = Cache.refresh(
+                page_cache_key(key.format(user_id)),
+                _page_loader(lambda load_page=load_page: load_page(db, user_id), schema),
+                expiry=LIST_EXPIRY_SECONDS,
+                tags=[user_tag(user_id)],
+            )
+            loaded += len(value["items"])
+        return loaded
+    finally:
+        db.close()
+
+
+async def warm_cache(
+    recency: Optional[timedelta] = None,
+    concurrency: Optional[int] = None,
+    max_users: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Warm the cache, loading at most `concurrency` users at a time
+
+    Database work runs in worker threads with a session each. Failures are
+    logged and counted rather than raised: a cold cache is slower, not broken.
+    Cancelling the task cannot stop those threads, so they check `deadline`
+    (a time.monotonic() value) themselves and wind down once it has passed.
+    """
+    recency = recency if recency is not None else timedelta(hours=settings.CACHE_WARMUP_RECENCY_HOURS)
+    concurrency = max(1, concurrency or settings.CACHE_WARMUP_CONCURRENCY)
+    max_users = max_users if max_users is not None else settings.CACHE_WARMUP_MAX_USERS
+    started = time.monotonic()
+    summary: Dict[str, Any] = {"doctors": 0, "users": 0, "rows": 0, "failed": 0}
+
+    try:
+        summary["doctors"] = await asyncio.to_thread(warm_doctors)
+        user_ids = await asyncio.to_thread(recently_active_user_ids, recency, max_users, deadline)
+    except Exception as e:
+        logger.error(f"Cache warm-up could not start: {str(e)}")
+        summary["failed"] += 1
+        user_ids = []
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm_one(user_id: int) -> None:
+        async with semaphore:
+            if _past_deadline(deadline):
+                return
+            try:
+                rows = await asyncio.to_thread(warm_user, user_id, deadline)
+                summary["rows"] += rows
+                summary["users"] += 1
+            except Exception as e:
+                logger.error(f"Cache warm-up failed for user {user_id}: {str(e)}")
+                summary["failed"] += 1
+
+    await asyncio.gather(*(warm_one(user_id) for user_id in user_ids))
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    logger.info(f"Cache warm-up finished: {summary}")
+    return summary
+
+
+async def run_startup_warmup() -> None:
+    """
+    Lifespan hook: warm the cache within CACHE_WARMUP_TIMEOUT_SECONDS, then let the app serve regardless
+
+    The cache is shared, so only the first worker to start warms it; the rest
+    find STARTUP_LOCK_KEY held and skip the session SCAN and the loads.
+    """
+    if not settings.CACHE_WARMUP_ENABLED:
+        logger.info("Cache warm-up disabled")
+        return
+    timeout = settings.CACHE_WARMUP_TIMEOUT_SECONDS
+    if not Cache.claim(STARTUP_LOCK_KEY, expiry=max(1, math.ceil(timeout))):
+        logger.info("Cache warm-up already run by another worker")
+        return
+    try:
+        await asyncio.wait_for(warm_cache(deadline=time.monotonic() + timeout), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Cache warm-up timed out after {settings.CACHE_WARMUP_TIMEOUT_SECONDS}s; continuing with a partially warm cache")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preload the cache with doctors and recently active users' data")
+    parser.add_argument("--recency-hours", type=float, default=settings.CACHE_WARMUP_RECENCY_HOURS)
+    parser.add_argument("--concurrency", type=int, default=settings.CACHE_WARMUP_CONCURRENCY)
+    parser.add_argument("--max-users", type=int, default=settings.CACHE_WARMUP_MAX_USERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(warm_cache(timedelta(hours=args.recency_hours), args.concurrency, args.max_users))
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import datetime
+import decimal
+import enum
+import uuid
+from typing import Any, Dict, Optional
+
+import orjson
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, only needed for CACHE_CODEC=msgpack
+    msgpack = None
+
+
+def _to_primitive(value: Any) -> Any:
+    """Fallback for types the underlying serializer does not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not cache-serializable")
+
+
+class Codec:
+    """
+    Base class for cache payload codecs
+
+    Every payload starts with the codec's version byte so entries written by
+    one codec stay readable after CACHE_CODEC is switched.
+    """
+
+    version: int = 0
+    name: str = ""
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, body: bytes) -> Any:
+        raise NotImplementedError
+
+    def encode(self, value: Any) -> bytes:
+        return bytes([self.version]) + self.dumps(value)
+
+
+class OrjsonCodec(Codec):
+    """JSON via orjson; datetimes, enums and Pydantic models are serialized directly"""
+
+    version = 1
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_to_primitive, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, body: bytes) -> Any:
+        return orjson.loads(body)
+
+
+class MsgpackCodec(Codec):
+    """Compact binary encoding via msgpack"""
+
+    version = 2
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed; run `pip install msgpack` or use CACHE_CODEC=orjson")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_to_primitive, use_bin_type=True)
+
+    def loads(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[str, type] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+
+_codecs_by_version: Dict[int, Codec] = {}
+
+
+def get_codec(name: str) -> Codec:
+    """Build the codec configured by name"""
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec '{name}'. Choose one of: {', '.join(CODECS)}")
+    codec = CODECS[name]()
+    _codecs_by_version[codec.version] = codec
+    return codec
+
+
+def _codec_for_version(version: int) -> Optional[Codec]:
+    if version not in _codecs_by_version:
+        for codec_cls in CODECS.values():
+            if codec_cls.version == version:
+                try:
+                    _codecs_by_version[version] = codec_cls()
+                except ImportError:
+                    return None
+                break
+    return _codecs_by_version.get(version)
+
+
+def decode(payload: Any) -> Any:
+    """
+    Decode a cached payload written by any codec
+
+    Entries written before codecs existed are plain JSON text, and some of
+    them were JSON-encoded twice (a JSON string holding a JSON document);
+    both are unwrapped so readers always get the original value.
+    """
+    if payload is None:
+        return None
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    if payload:
+        codec = _codec_for_version(payload[0])
+        if codec is not None:
+            return codec.loads(payload[1:])
+
+    value = json.loads(payload)
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
@@ -0,0 +1,97 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.db.database import cache_fill_session, on_commit
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.document import Document
+from src.models.emergency_contact import EmergencyContact
+from src.models.medicine import Medicine
+from src.schemas.appointment import AppointmentResponse
+from src.schemas.doctor import DoctorResponse
+from src.schemas.document import DocumentResponse
+from src.schemas.emergency_contact import EmergencyContactResponse
+from src.schemas.medicine import MedicineResponse
+from src.utils.cache import Cache
+
+# Cached models and the response schema their rows are stored as
+ENTITY_SCHEMAS: Dict[type, Type[BaseModel]] = {
+    Appointment: AppointmentResponse,
+    Doctor: DoctorResponse,
+    Document: DocumentResponse,
+    EmergencyContact: EmergencyContactResponse,
+    Medicine: MedicineResponse,
+}
+
+
+class EntityCache:
+    """
+    Write-through cache of single rows keyed by model and primary key
+
+    Rows are stored as their response schema, so reads return a validated
+    schema instance (attribute access works like on the ORM object) and
+    never a live ORM object bound to another session. Services put rows on
+    create/update and evict them on delete, once the transaction commits.
+    """
+
+    @staticmethod
+    def key(model: type, pk: Any) -> str:
+        return f"entity_{model.__tablename__}_{pk}"
+
+    @staticmethod
+    def get(model: type, pk: Any) -> Optional[BaseModel]:
+        """Cached row as its response schema, or None on a miss"""
+        data = Cache.get(EntityCache.key(model, pk))
+        if not isinstance(data, dict):
+            return None
+        return ENTITY_SCHEMAS[model].model_validate(data)
+
+    @staticmethod
+    def put(instance: Any) -> None:
+        """Store a freshly committed ORM row"""
+        model = type(instance)
+        data = ENTITY_SCHEMAS[model].model_validate(instance).model_dump()
+        Cache.set(EntityCache.key(model, instance.id), data, expiry=settings.CACHE_ENTITY_TTL_SECONDS)
+
+    @staticmethod
+    def put_on_commit(db: Any, instance: Any) -> None:
+        """Store a row once db commits; it is serialized now, while its session can still load it"""
+        model = type(instance)
+        data = ENTITY_SCHEMAS[model].model_validate(instance).model_dump()
+        on_commit(db, Cache.set, EntityCache.key(model, instance.id), data, settings.CACHE_ENTITY_TTL_SECONDS)
+
+    @staticmethod
+    def put_many(instances: Iterable[Any]) -> None:
+        """Store several rows in one round trip"""
+        mapping = {
+            EntityCache.key(type(instance), instance.id): ENTITY_SCHEMAS[type(instance)].model_validate(instance).model_dump()
+            for instance in instances
+        }
+        Cache.set_many(mapping, expiry=settings.CACHE_ENTITY_TTL_SECONDS)
+
+    @staticmethod
+    def evict(model: type, pk: Any) -> None:
+        Cache.delete(EntityCache.key(model, pk))
+
+    @staticmethod
+    def evict_on_commit(db: Any, model: type, pk: Any) -> None:
+        on_commit(db, Cache.delete, EntityCache.key(model, pk))
+
+    @staticmethod
+    def get_or_load(model: type, pk: Any, db: Session, loader: Callable[[Session], Any]) -> Optional[BaseModel]:
+        """Read through the cache, calling loader(session) and storing the row on a miss; missing rows are not cached.
+
+        On a replica-backed db the row is loaded from the primary (see cache_fill_session).
+        """
+        cached = EntityCache.get(model, pk)
+        if cached is not None:
+            return cached
+        with cache_fill_session(db) as source:
+            instance = loader(source)
+            if instance is None:
+                return None
+            EntityCache.put(instance)
+            return ENTITY_SCHEMAS[model].model_validate(instance)
@@ -0,0 +1,271 @@
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _key(key: Any) -> str:
+    return key.decode("utf-8") if isinstance(key, bytes) else key
+
+
+def _value(value: Any) -> Any:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+class MemoryRedis:
+    """
+    Bounded in-process stand-in for the subset of the Redis API the cache uses
+
+    Backs REDIS_URL=memory:// on single-node deployments and serves as the
+    fallback while Redis is unreachable. When journaling is on, every key it
+    mutates is remembered so it can be invalidated in Redis once Redis is back.
+    The journal is bounded too; once it has dropped a key, journal_overflowed
+    stays set until the journal is drained.
+    """
+
+    def __init__(self, max_entries: int = 10000, journaling: bool = False):
+        self.max_entries = max_entries
+        self.journaling = journaling
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._journal: "OrderedDict[str, None]" = OrderedDict()
+        self.journal_overflowed = False
+        self._lock = threading.RLock()
+
+    def _lookup(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _touch(self, key: str) -> None:
+        if not self.journaling:
+            return
+        self._journal[key] = None
+        self._journal.move_to_end(key)
+        while len(self._journal) > self.max_entries:
+            self._journal.popitem(last=False)
+            self.journal_overflowed = True
+
+    def _store(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        self._touch(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _remove(self, keys) -> int:
+        removed = 0
+        for key in map(_key, keys):
+            if self._lookup(key) is not None:
+                removed += 1
+            self._data.pop(key, None)
+            self._touch(key)
+        return removed
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            value = self._lookup(_key(key))
+            return value if isinstance(value, bytes) else None
+
+    def mget(self, keys, *args) -> List[Optional[bytes]]:
+        keys = [keys, *args] if isinstance(keys, (str, bytes)) else list(keys) + list(args)
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex: Optional[float] = None, px: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            key = _key(key)
+            if nx and self._lookup(key) is not None:
+                return None
+            ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+            self._store(key, _value(value), ttl)
+            return True
+
+    def setex(self, key, time: float, value) -> bool:
+        return self.set(key, value, ex=time)
+
+    def delete(self, *keys) -> int:
+        with self._lock:
+            return self._remove(keys)
+
+    def unlink(self, *keys) -> int:
+        return self.delete(*keys)
+
+    def exists(self, *keys) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._lookup(_key(key)) is not None)
+
+    def pttl(self, key) -> int:
+        with self._lock:
+            key = _key(key)
+            if self._lookup(key) is None:
+                return -2
+            expires_at = self._data[key][0]
+            if expires_at is None:
+                return -1
+            return max(int((expires_at - time.monotonic()) * 1000), 0)
+
+    def expire(self, key, time_seconds: float) -> bool:
+        with self._lock:
+            key = _key(key)
+            value = self._lookup(key)
+            if value is None:
+                return False
+            self._store(key, value, time_seconds)
+            return True
+
+    def sadd(self, key, *members) -> int:
+        with self._lock:
+            key = _key(key)
+            current = self._lookup(key)
+            current = set(current) if isinstance(current, set) else set()
+            added = {_key(member) for member in members} - current
+            expires_at = self._data[key][0] if key in self._data else None
+            ttl = expires_at - time.monotonic() if expires_at is not None else None
+            self._store(key, current | added, ttl)
+            return len(added)
+
+    def smembers(self, key) -> set:
+        with self._lock:
+            value = self._lookup(_key(key))
+            return set(value) if isinstance(value, set) else set()
+
+    def publish(self, channel, message) -> int:
+        # No subscribers: a memory backend is only ever shared within one process
+        return 0
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None) -> Iterator[str]:
+        with self._lock:
+            keys = [key for key in list(self._data) if self._lookup(key) is not None]
+        for key in keys:
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def flushall(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            self._journal.clear()
+            self.journal_overflowed = False
+            return True
+
+    def drain_journal(self) -> List[Tuple[str, Any, int]]:
+        """Return (key, value, ttl_ms) for every journaled key and reset the journal; value is None for deletions"""
+        with self._lock:
+            entries = []
+            for key in self._journal:
+                value = self._lookup(key)
+                entries.append((key, value, self.pttl(key) if value is not None else -2))
+            self._journal.clear()
+            self.journal_overflowed = False
+            return entries
+
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MemoryPipeline:
+    """Queues commands and runs them under the store's lock, mirroring redis-py pipelines"""
+
+    def __init__(self, client: MemoryRedis):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, Dict[str, Any]]] = []
+        self._immediate = False
+
+    def __getattr__(self, name: str):
+        command = getattr(self._client, name)
+
+        def queue(*args, **kwargs):
+            if self._immediate:
+                return command(*args, **kwargs)
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def watch(self, *keys) -> bool:
+        # Commands after WATCH run immediately until MULTI, as in redis-py
+        self._immediate = True
+        return True
+
+    def multi(self) -> None:
+        self._immediate = False
+
+    def execute(self) -> List[Any]:
+        with self._client._lock:
+            commands, self._commands = self._commands, []
+            return [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    def reset(self) -> None:
+        self._commands = []
+        self._immediate = False
+
+    def __enter__(self) -> "MemoryPipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.reset()
+
+
+class AsyncMemoryRedis:
+    """redis.asyncio-style facade over a MemoryRedis"""
+
+    def __init__(self, client: MemoryRedis):
+        self._client = client
+
+    def __getattr__(self, name: str):
+        command = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return call
+
+    def pipeline(self, transaction: bool = True) -> "AsyncMemoryPipeline":
+        return AsyncMemoryPipeline(self._client.pipeline(transaction=transaction))
+
+    async def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        for key in self._client.scan_iter(match=match, count=count):
+            yield key
+
+    async def aclose(self) -> None:
+        pass
+
+
+class AsyncMemoryPipeline:
+    """Async pipeline wrapper matching redis.asyncio's `async with client.pipeline()` usage"""
+
+    def __init__(self, pipe: MemoryPipeline):
+        self._pipe = pipe
+
+    def __getattr__(self, name: str):
+        queue = getattr(self._pipe, name)
+
+        def call(*args, **kwargs):
+            queue(*args, **kwargs)
+            return self
+
+        return call
+
+    async def execute(self) -> List[Any]:
+        return self._pipe.execute()
+
+    async def __aenter__(self) -> "AsyncMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._pipe.reset()
@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+from src.core.config import settings
+from src.db.database import dispose_async_engine
+from src.db.schema import verify_schema
 from src.services.reminder_scheduler import reminder_scheduler
+from src.utils.cache import AsyncCache, invalidation_listener
+from src.utils.cache_warmup import run_startup_warmup
 import logging
 import os
 
@@ -14,11 +19,23 @@ async def lifespan(app: FastAPI):
     if os.environ.get("TESTING", "False").lower() == "true":
         logger.info("Testing mode detected - skipping reminder scheduler startup")
     else:
-        try:
-            reminder_scheduler.start()
-            logger.info("Reminder scheduler started with application")
-        except Exception as e:
-            logger.error(f"Failed to start reminder scheduler: {str(e)}")
+        # One query against alembic_version; raises (SCHEMA_CHECK=error) so an unmigrated database never serves
+        verify_schema()
+
+        # Reminders are normally sent by `python -m src.workers.reminders`
+        if settings.REMINDER_SCHEDULER_EMBEDDED:
+            try:
+                reminder_scheduler.start()
+                logger.info("Reminder scheduler started with application")
+            except Exception as e:
+                logger.error(f"Failed to start reminder scheduler: {str(e)}")
+        else:
+            logger.info("Reminder scheduler not embedded; dispatch runs in the reminder worker")
+
+        invalidation_listener.start()
+
+        # Runs before the app accepts requests, so the health check only passes once the cache is warm
+        await run_startup_warmup()
     
     yield 
     
@@ -28,8 +45,13 @@ async def lifespan(app: FastAPI):
     if os.environ.get("TESTING", "False").lower() == "true":
         logger.info("Testing mode detected - skipping reminder scheduler shutdown")
     else:
-        try:
-            reminder_scheduler.stop()
-            logger.info("Reminder scheduler stopped with application")
-        except Exception as e:
-            logger.error(f"Error stopping reminder scheduler: {str(e)}")
+        if settings.REMINDER_SCHEDULER_EMBEDDED:
+            try:
+                reminder_scheduler.stop()
+                logger.info("Reminder scheduler stopped with application")
+            except Exception as e:
+                logger.error(f"Error stopping reminder scheduler: {str(e)}")
+
+        invalidation_listener.stop()
+        await AsyncCache.close()
+        await dispose_async_engine()
@@ -0,0 +1,107 @@
+"""
+Reminder worker: dispatches due reminders in its own process
+
+    python -m src.workers.reminders
+
+Runs the ReminderScheduler away from the API, so sending does not compete
+with request handling for the GIL. It can be scaled independently of the
+API workers; claims keep several worker replicas from sending the same
+reminder. The API process only runs the scheduler itself when
+REMINDER_SCHEDULER_EMBEDDED=True.
+
+A small HTTP server on REMINDER_WORKER_HEALTH_PORT (or $PORT) answers:
+- GET /health/live: 200 while the dispatch thread runs;
+- GET /health/ready: 200 once the timer has been loaded from the database,
+  for as long as reconciliations keep succeeding.
+
+SIGTERM and SIGINT stop new claims. The batch in flight is then sent and
+recorded, for at most REMINDER_WORKER_DRAIN_SECONDS, before the process
+exits.
+"""
+import json
+import logging
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from src.core.config import settings
+from src.db.schema import verify_schema
+from src.services.reminder_scheduler import ReminderScheduler, reminder_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+def health_status(scheduler: ReminderScheduler, path: str) -> Tuple[int, dict]:
+    """HTTP status and body for a health endpoint"""
+    if path == "/health/live":
+        alive = scheduler.is_alive()
+        return (200 if alive else 503), {"status": "alive" if alive else "stopped"}
+    if path == "/health/ready":
+        ready = scheduler.is_ready()
+        return (200 if ready else 503), {
+            "status": "ready" if ready else "not ready",
+            "scheduled": len(scheduler.timer),
+        }
+    return 404, {"detail": "Not found"}
+
+
+def make_health_server(scheduler: ReminderScheduler, host: str, port: int) -> ThreadingHTTPServer:
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            status, body = health_status(scheduler, self.path.split("?", 1)[0])
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args) -> None:
+            # Probes hit this every few seconds; keep them out of the logs
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    return server
+
+
+def run(scheduler: ReminderScheduler = reminder_scheduler, stop_event: Optional[threading.Event] = None) -> None:
+    """Start the scheduler and health server, block until stop_event is set (SIGTERM), then drain"""
+    stop_event = stop_event or threading.Event()
+    verify_schema()
+
+    server = None
+    if settings.REMINDER_WORKER_HEALTH_PORT:
+        server = make_health_server(scheduler, settings.REMINDER_WORKER_HEALTH_HOST, settings.REMINDER_WORKER_HEALTH_PORT)
+        threading.Thread(target=server.serve_forever, name="reminder-health", daemon=True).start()
+        logger.info(f"Reminder worker health checks on port {server.server_address[1]}")
+
+    scheduler.start()
+    logger.info(f"Reminder worker {scheduler.worker_id} started")
+    try:
+        stop_event.wait()
+    finally:
+        logger.info("Reminder worker draining...")
+        scheduler.stop(timeout=settings.REMINDER_WORKER_DRAIN_SECONDS)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        logger.info("Reminder worker stopped")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame) -> None:
+        logger.info(f"Received {signal.Signals(signum).name}, shutting down")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    run(stop_event=stop_event)
+
+
+if __name__ == "__main__":
+    main()
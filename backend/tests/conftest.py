@@ -5,16 +5,17 @@ import pytest
 import os
 import tempfile
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 os.environ["SMS_VERIFICATION_ENABLED"] = "False"
 os.environ["TESTING"] = "True"
+os.environ.setdefault("REDIS_URL", "fakeredis://")
 
 from main import app
-from src.db.database import Base, get_db
+from src.db.database import Base, get_db, get_read_db
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -30,9 +31,21 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
-    """Override database dependency for testing"""
+    """Override database dependency for testing; commits once per request like get_db"""
+    db = TestingSessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def override_get_read_db():
+    """Override read-only database dependency for testing"""
+    db = TestingSessionLocal()
     try:
-        db = TestingSessionLocal()
         yield db
     finally:
         db.close()
@@ -58,6 +71,7 @@ def client():
     Base.metadata.create_all(bind=engine)
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
     
     with TestClient(app) as test_client:
         yield test_client
@@ -65,6 +79,56 @@ def client():
     app.dependency_overrides = {}
     Base.metadata.drop_all(bind=engine)
 
+class QueryCounter:
+    """SQL statements issued against the test engine inside a `with` block"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements issued while the block runs"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._record)
+
+@pytest.fixture
+def query_budget():
+    """Fail a test when the wrapped request issues more SQL statements than `budget`
+
+    Usage: `with query_budget(3): client.get(...)`. Catches lazy loads that
+    turn a list endpoint into one query per row.
+    """
+    @contextmanager
+    def check(budget):
+        with count_queries() as counter:
+            yield counter
+        assert len(counter) <= budget, (
+            f"{len(counter)} SQL statements, budget is {budget}:\n" + "\n".join(counter.statements)
+        )
+    return check
+
+@pytest.fixture
+def memory_redis():
+    """Run the cache on a fresh in-process MemoryRedis, without the local tier, and yield the store"""
+    from unittest.mock import patch
+    from src.utils import cache as cache_module
+    from src.utils.memory_redis import MemoryRedis
+    store = MemoryRedis()
+    cache_module.circuit_breaker.reset()
+    with patch.object(cache_module, "redis_client", store), \
+         patch.object(cache_module, "local_cache", None):
+        yield store
+
 @pytest.fixture(scope="session")
 def test_settings():
     """Test configuration settings - creates a separate instance"""
@@ -3,7 +3,6 @@ API endpoint tests for authentication-related endpoints with realistic mock WebA
 This file contains comprehensive tests for passkey registration, login, and session management.
 """
 import pytest
-import json
 import base64
 import concurrent.futures
 from unittest.mock import patch, MagicMock
@@ -199,6 +198,7 @@ class TestAuthenticatedEndpoints:
         """Helper to create an authenticated session"""
         user_data = UserCreate(name="Test User", phone="1234567890", is_active=True)
         user = UserService.register_user(test_db, user_data)
+        test_db.commit()
         
         session_data = UserService.issue_session(user.id)
         session_token = session_data["session_token"]
@@ -506,7 +506,7 @@ class TestPasskey:
             
             Cache.set(
                 f"webauthn_signup_challenge_{user.id}", 
-                json.dumps(real_challenge_data), 
+                real_challenge_data, 
                 expiry=settings.CHALLENGE_CACHE_EXPIRY
             )
             
@@ -586,7 +586,7 @@ class TestPasskey:
 
         Cache.set(
             f"webauthn_login_challenge_{user.id}",
-            json.dumps(real_login_challenge),
+            real_login_challenge,
             expiry=settings.CHALLENGE_CACHE_EXPIRY
         )
         
@@ -6,7 +6,6 @@ Tests cover user registration, login, logout, session management, and passkey op
 """
 
 import pytest
-import json
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
@@ -162,7 +161,7 @@ class TestUserService:
             "expires_at": (datetime.now() + timedelta(hours=1)).isoformat()
         }
         
-        with patch('src.utils.cache.Cache.get', return_value=json.dumps(session_data)):
+        with patch('src.utils.cache.Cache.get', return_value=session_data):
             result = UserService.validate_session(test_db, session_token)
             assert result == user_id
 
@@ -174,7 +173,7 @@ class TestUserService:
             "expires_at": (datetime.now() - timedelta(hours=1)).isoformat()
         }
         
-        with patch('src.utils.cache.Cache.get', return_value=json.dumps(session_data)):
+        with patch('src.utils.cache.Cache.get', return_value=session_data):
             with patch('src.utils.cache.Cache.delete') as mock_delete:
                 result = UserService.validate_session(test_db, session_token)
                 assert result is None
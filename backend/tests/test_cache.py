@@ -0,0 +1,790 @@
+"""
+Tests for the Redis cache wrapper and its in-process tier
+"""
+import json
+import time
+import asyncio
+import datetime
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.utils import cache as cache_module
+from src.utils.cache import Cache, AsyncCache, LocalCache, CacheStats, apply_invalidation_message, INSTANCE_ID
+from src.utils.codec import OrjsonCodec, MsgpackCodec, decode, get_codec
+from src.utils.memory_redis import MemoryRedis
+from src.utils.cache_metrics import CacheMetrics, HotKeyTracker, key_prefix, redact_key
+from src.utils.entity_cache import EntityCache
+from src.models.medicine import Medicine
+from src.schemas.medicine import MedicineCreate, MedicineResponse, MedicineUpdate
+from src.services.medicine_service import MedicineService
+
+codec = get_codec("orjson")
+
+
+@pytest.fixture(autouse=True)
+def closed_breaker():
+    """Failures simulated by one test must not trip the breaker for the next"""
+    cache_module.circuit_breaker.reset()
+    yield
+    cache_module.circuit_breaker.reset()
+
+
+class TestLocalCache:
+    """Test the bounded in-process LRU tier"""
+
+    def test_get_set_roundtrip(self):
+        """Test values can be stored and read back"""
+        local = LocalCache(max_entries=10, default_ttl=30)
+        local.set("key", "value")
+        assert local.get("key") == "value"
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted when full"""
+        local = LocalCache(max_entries=2, default_ttl=30)
+        local.set("a", "1")
+        local.set("b", "2")
+        local.get("a")
+        local.set("c", "3")
+
+        assert local.get("a") == "1"
+        assert local.get("b") is None
+        assert local.get("c") == "3"
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        local = LocalCache(max_entries=10, default_ttl=30)
+        with patch("src.utils.cache.time.monotonic", return_value=100.0):
+            local.set("key", "value", ttl=5)
+        with patch("src.utils.cache.time.monotonic", return_value=104.0):
+            assert local.get("key") == "value"
+        with patch("src.utils.cache.time.monotonic", return_value=106.0):
+            assert local.get("key") is None
+
+    def test_ttl_capped_by_default(self):
+        """Test per-key TTL never exceeds the tier's default TTL"""
+        local = LocalCache(max_entries=10, default_ttl=5)
+        with patch("src.utils.cache.time.monotonic", return_value=100.0):
+            local.set("key", "value", ttl=3600)
+        with patch("src.utils.cache.time.monotonic", return_value=106.0):
+            assert local.get("key") is None
+
+    def test_delete_pattern(self):
+        """Test glob-style pattern eviction"""
+        local = LocalCache(max_entries=10, default_ttl=30)
+        local.set("medicines_user_1", "a")
+        local.set("medicines_user_2", "b")
+        local.set("doctors_all", "c")
+
+        assert local.delete_pattern("medicines_user_*") == 2
+        assert local.get("doctors_all") == "c"
+
+
+class TestTwoTierCache:
+    """Test Cache with the local tier enabled in front of a mocked Redis"""
+
+    @pytest.fixture
+    def tiers(self):
+        local = LocalCache(max_entries=10, default_ttl=30)
+        mock_redis = MagicMock()
+        with patch.object(cache_module, "local_cache", local), \
+             patch.object(cache_module, "redis_client", mock_redis), \
+             patch.object(cache_module, "cache_stats", CacheStats()):
+            yield local, mock_redis
+
+    def test_local_hit_skips_redis(self, tiers):
+        """Test a local hit does not touch Redis"""
+        local, mock_redis = tiers
+        local.set("doctors_all", codec.encode([{"id": 1}]))
+
+        assert Cache.get("doctors_all") == [{"id": 1}]
+        mock_redis.pipeline.assert_not_called()
+        assert Cache.stats()["local"] == {"hits": 1, "misses": 0}
+
+    def test_redis_hit_populates_local(self, tiers):
+        """Test a Redis hit fills the local tier for later reads"""
+        local, mock_redis = tiers
+        mock_redis.pipeline.return_value.execute.return_value = [codec.encode({"a": 1}), 20000]
+
+        assert Cache.get("doctor_1") == {"a": 1}
+        assert local.get("doctor_1") == codec.encode({"a": 1})
+
+        stats = Cache.stats()
+        assert stats["local"] == {"hits": 0, "misses": 1}
+        assert stats["redis"] == {"hits": 1, "misses": 0}
+
+    def test_set_publishes_invalidation(self, tiers):
+        """Test set writes both tiers and notifies other workers"""
+        local, mock_redis = tiers
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.return_value = [True, 1]
+
+        assert Cache.set("doctors_all", [1, 2], expiry=300) is True
+        assert local.get("doctors_all") == codec.encode([1, 2])
+        pipe.setex.assert_called_once_with("doctors_all", 300, codec.encode([1, 2]))
+        pipe.publish.assert_called_once()
+
+    def test_delete_evicts_local(self, tiers):
+        """Test delete evicts the local copy and publishes invalidation"""
+        local, mock_redis = tiers
+        local.set("session_abc", "{}")
+        mock_redis.pipeline.return_value.execute.return_value = [1, 1]
+
+        assert Cache.delete("session_abc") is True
+        assert local.get("session_abc") is None
+        mock_redis.pipeline.return_value.publish.assert_called_once()
+
+    def test_invalidation_message_from_other_worker(self, tiers):
+        """Test messages from other workers evict local keys"""
+        local, _ = tiers
+        local.set("session_abc", "{}")
+        apply_invalidation_message(json.dumps({"origin": "other", "keys": ["session_abc"], "pattern": None}))
+        assert local.get("session_abc") is None
+
+    def test_invalidation_message_from_self_ignored(self, tiers):
+        """Test a worker does not evict what it just wrote"""
+        local, _ = tiers
+        local.set("session_abc", "{}")
+        apply_invalidation_message(json.dumps({"origin": INSTANCE_ID, "keys": ["session_abc"], "pattern": None}))
+        assert local.get("session_abc") == "{}"
+
+
+class TestAsyncCache:
+    """Test the redis.asyncio-backed cache API"""
+
+    @pytest.fixture
+    def async_redis(self):
+        mock_redis = AsyncMock()
+        with patch.object(cache_module, "async_redis_client", mock_redis), \
+             patch.object(cache_module, "local_cache", None):
+            yield mock_redis
+
+    def test_get_decodes_payload(self, async_redis):
+        """Test get awaits Redis and decodes the stored payload"""
+        async_redis.get.return_value = codec.encode({"user_id": 1})
+        assert asyncio.run(AsyncCache.get("session_abc")) == {"user_id": 1}
+        async_redis.get.assert_awaited_once_with("session_abc")
+
+    def test_get_miss(self, async_redis):
+        """Test get returns None when the key is absent"""
+        async_redis.get.return_value = None
+        assert asyncio.run(AsyncCache.get("missing")) is None
+
+    def test_set_and_delete(self, async_redis):
+        """Test set and delete await the matching Redis commands"""
+        async_redis.setex.return_value = True
+        async_redis.delete.return_value = 1
+
+        assert asyncio.run(AsyncCache.set("doctors_all", [1], expiry=300)) is True
+        async_redis.setex.assert_awaited_once_with("doctors_all", 300, codec.encode([1]))
+        assert asyncio.run(AsyncCache.delete("doctors_all")) is True
+
+    def test_errors_are_swallowed(self, async_redis):
+        """Test Redis errors degrade to a cache miss like the sync API"""
+        async_redis.get.side_effect = ConnectionError("down")
+        assert asyncio.run(AsyncCache.get("session_abc")) is None
+
+
+class TestPatternAndTagInvalidation:
+    """Test SCAN-based pattern deletion and tag-based invalidation"""
+
+    @pytest.fixture
+    def mock_redis(self):
+        mock_redis = MagicMock()
+        with patch.object(cache_module, "redis_client", mock_redis), \
+             patch.object(cache_module, "local_cache", None):
+            yield mock_redis
+
+    def test_clear_pattern_uses_scan_in_batches(self, mock_redis):
+        """Test clear_pattern never calls KEYS and unlinks in pipelined batches"""
+        mock_redis.scan_iter.return_value = iter(["session_1", "session_2", "session_3"])
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.side_effect = [[2], [1]]
+
+        with patch.object(cache_module.settings, "CACHE_SCAN_BATCH_SIZE", 2):
+            assert Cache.clear_pattern("session_*") == 3
+
+        mock_redis.keys.assert_not_called()
+        mock_redis.scan_iter.assert_called_once_with(match="session_*", count=2)
+        assert pipe.unlink.call_args_list[0].args == ("session_1", "session_2")
+        assert pipe.unlink.call_args_list[1].args == ("session_3",)
+
+    def test_set_registers_tags(self, mock_redis):
+        """Test set adds the key to each tag set in the same pipeline"""
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.return_value = [True, 1, True]
+
+        assert Cache.set("medicines_user_1", [], expiry=300, tags=["user_1"]) is True
+        pipe.setex.assert_called_once_with("medicines_user_1", 300, codec.encode([]))
+        pipe.sadd.assert_called_once_with("tag_user_1", "medicines_user_1")
+
+    def test_invalidate_tags_deletes_members(self, mock_redis):
+        """Test invalidating tags unlinks every member key and drops the tag sets"""
+        pipe = mock_redis.pipeline.return_value
+        pipe.execute.side_effect = [
+            [{"medicines_user_1", "documents_user_1"}, {"appointments_doctor_2"}, 2],
+            [3],
+        ]
+
+        assert Cache.invalidate_tags("user_1", "doctor_2") == 3
+        pipe.delete.assert_called_once_with("tag_user_1", "tag_doctor_2")
+        pipe.unlink.assert_called_once_with("appointments_doctor_2", "documents_user_1", "medicines_user_1")
+
+    def test_invalidate_tags_without_members(self, mock_redis):
+        """Test an empty tag is a no-op"""
+        mock_redis.pipeline.return_value.execute.return_value = [set(), 0]
+        assert Cache.invalidate_tags("user_9") == 0
+
+
+class TestGetOrLoad:
+    """Test the stampede-protected cached loader"""
+
+    @pytest.fixture
+    def mock_redis(self):
+        mock_redis = MagicMock()
+        with patch.object(cache_module, "redis_client", mock_redis), \
+             patch.object(cache_module, "local_cache", None):
+            yield mock_redis
+
+    def test_fresh_entry_skips_loader(self, mock_redis):
+        """Test a fresh entry is served without recomputing"""
+        entry = {"value": [1, 2], "delta": 0.01, "expires_at": time.time() + 300}
+        loader = MagicMock()
+        with patch.object(Cache, "get", return_value=entry):
+            assert Cache.get_or_load("doctors_all", loader, expiry=300) == [1, 2]
+        loader.assert_not_called()
+        mock_redis.set.assert_not_called()
+
+    def test_miss_recomputes_under_lock(self, mock_redis):
+        """Test a miss takes the lock, calls the loader once and stores the envelope"""
+        mock_redis.set.return_value = True
+        loader = MagicMock(return_value=[{"id": 1}])
+        with patch.object(Cache, "get", return_value=None), \
+             patch.object(Cache, "set") as mock_set:
+            assert Cache.get_or_load("doctors_all", loader, expiry=300, tags=["t"]) == [{"id": 1}]
+
+        loader.assert_called_once()
+        assert mock_redis.set.call_args.kwargs["nx"] is True
+        stored_key, stored_entry = mock_set.call_args.args
+        assert stored_key == "doctors_all"
+        assert stored_entry["value"] == [{"id": 1}]
+        assert mock_set.call_args.kwargs == {"expiry": 300, "tags": ["t"]}
+
+    def test_miss_waits_for_lock_holder(self, mock_redis):
+        """Test a worker that loses the lock waits for the winner's result"""
+        mock_redis.set.return_value = None
+        entry = {"value": ["loaded"], "delta": 0.01, "expires_at": time.time() + 300}
+        loader = MagicMock()
+        with patch.object(Cache, "get", side_effect=[None, None, entry]), \
+             patch("src.utils.cache.time.sleep"):
+            assert Cache.get_or_load("doctors_all", loader, expiry=300) == ["loaded"]
+        loader.assert_not_called()
+
+    def test_stale_entry_served_while_refreshing(self, mock_redis):
+        """Test an early-refresh candidate serves the old value when another worker holds the lock"""
+        mock_redis.set.return_value = None
+        entry = {"value": ["old"], "delta": 1.0, "expires_at": time.time() - 1}
+        loader = MagicMock()
+        with patch.object(Cache, "get", return_value=entry):
+            assert Cache.get_or_load("doctors_all", loader, expiry=300) == ["old"]
+        loader.assert_not_called()
+
+    def test_xfetch_refreshes_before_expiry(self, mock_redis):
+        """Test XFetch triggers recomputation shortly before expiry for slow loaders"""
+        mock_redis.set.return_value = True
+        entry = {"value": ["old"], "delta": 2.0, "expires_at": time.time() + 1}
+        loader = MagicMock(return_value=["new"])
+        # random() close to 1 makes -log(1 - r) large, forcing an early refresh
+        with patch.object(Cache, "get", return_value=entry), \
+             patch.object(Cache, "set"), \
+             patch("src.utils.cache.random.random", return_value=0.99):
+            assert Cache.get_or_load("doctors_all", loader, expiry=300) == ["new"]
+        loader.assert_called_once()
+
+    def test_redis_down_falls_back_to_loader(self, mock_redis):
+        """Test the loader still runs when the lock cannot be taken"""
+        mock_redis.set.side_effect = ConnectionError("down")
+        with patch.object(Cache, "get", return_value=None):
+            assert Cache.get_or_load("doctors_all", lambda: ["db"], expiry=300) == ["db"]
+
+
+class TestCodec:
+    """Test the versioned cache payload codecs"""
+
+    def test_orjson_roundtrip(self):
+        """Test values survive an encode/decode roundtrip"""
+        value = {"user_id": 1, "items": [1, 2], "nested": {"ok": True}}
+        payload = OrjsonCodec().encode(value)
+        assert payload[0] == OrjsonCodec.version
+        assert decode(payload) == value
+
+    def test_msgpack_roundtrip(self):
+        """Test the msgpack codec when the optional dependency is installed"""
+        pytest.importorskip("msgpack")
+        value = {"user_id": 1, "items": [1, 2]}
+        payload = MsgpackCodec().encode(value)
+        assert payload[0] == MsgpackCodec.version
+        assert decode(payload) == value
+
+    def test_encodes_rich_types(self):
+        """Test datetimes and Pydantic models are serialized without manual dumping"""
+        from pydantic import BaseModel
+
+        class Challenge(BaseModel):
+            challenge: str
+            timeout: int
+
+        payload = codec.encode({
+            "at": datetime.datetime(2025, 1, 2, 3, 4, 5),
+            "challenge": Challenge(challenge="abc", timeout=60000),
+        })
+        assert decode(payload) == {
+            "at": "2025-01-02T03:04:05",
+            "challenge": {"challenge": "abc", "timeout": 60000},
+        }
+
+    def test_decodes_legacy_json(self):
+        """Test entries written as plain JSON before codecs existed stay readable"""
+        assert decode(b'{"user_id": 1}') == {"user_id": 1}
+        assert decode('[1, 2]') == [1, 2]
+
+    def test_decodes_legacy_double_encoded_json(self):
+        """Test legacy entries that were JSON-encoded twice are unwrapped"""
+        assert decode(json.dumps(json.dumps({"user_id": 1}))) == {"user_id": 1}
+
+    def test_unknown_codec_rejected(self):
+        """Test a misconfigured CACHE_CODEC fails loudly"""
+        with pytest.raises(ValueError):
+            get_codec("pickle")
+
+
+class TestMultiKeyOperations:
+    """Test pipelined multi-key operations and per-request write batching"""
+
+    @pytest.fixture
+    def mock_redis(self):
+        mock_redis = MagicMock()
+        with patch.object(cache_module, "redis_client", mock_redis), \
+             patch.object(cache_module, "local_cache", None):
+            yield mock_redis
+
+    def test_get_many_uses_single_mget(self, mock_redis):
+        """Test get_many fetches every key in one MGET and omits misses"""
+        mock_redis.mget.return_value = [codec.encode({"id": 1}), None]
+
+        assert Cache.get_many(["doctor_1", "doctor_2"]) == {"doctor_1": {"id": 1}}
+        mock_redis.mget.assert_called_once_with(["doctor_1", "doctor_2"])
+        mock_redis.get.assert_not_called()
+
+    def test_set_many_single_pipeline(self, mock_redis):
+        """Test set_many writes every key in one pipeline"""
+        pipe = mock_redis.pipeline.return_value
+
+        assert Cache.set_many({"a": 1, "b": 2}, expiry=60, tags=["user_1"]) is True
+        assert pipe.setex.call_count == 2
+        assert pipe.sadd.call_count == 2
+        pipe.execute.assert_called_once()
+
+    def test_delete_many_single_unlink(self, mock_redis):
+        """Test delete_many removes every key with one UNLINK"""
+        mock_redis.pipeline.return_value.execute.return_value = [2]
+
+        assert Cache.delete_many("doctors_all", "doctor_1") == 2
+        mock_redis.pipeline.return_value.unlink.assert_called_once_with("doctors_all", "doctor_1")
+        mock_redis.delete.assert_not_called()
+
+    def test_batch_buffers_until_exit(self, mock_redis):
+        """Test mutations in a batch are visible to reads but reach Redis in one pipeline on exit"""
+        pipe = mock_redis.pipeline.return_value
+
+        with Cache.batch():
+            Cache.set("sms_verified_status_1", {"ok": True}, expiry=60)
+            Cache.delete("sms_verification_code_1")
+            assert Cache.get("sms_verified_status_1") == {"ok": True}
+            assert Cache.get("sms_verification_code_1") is None
+            mock_redis.pipeline.assert_not_called()
+
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        pipe.setex.assert_called_once_with("sms_verified_status_1", 60, codec.encode({"ok": True}))
+        pipe.unlink.assert_called_once_with("sms_verification_code_1")
+        pipe.execute.assert_called_once()
+
+    def test_nested_batch_joins_outer(self, mock_redis):
+        """Test only the outermost batch flushes"""
+        with Cache.batch():
+            with Cache.batch():
+                Cache.delete("doctors_all")
+            mock_redis.pipeline.assert_not_called()
+        mock_redis.pipeline.return_value.unlink.assert_called_once_with("doctors_all")
+
+    def test_batch_resolves_tags_at_flush(self, mock_redis):
+        """Test buffered tag invalidations read the tag sets once, then unlink in the write pipeline"""
+        tx_pipe, write_pipe = MagicMock(), MagicMock()
+        mock_redis.pipeline.side_effect = [tx_pipe, write_pipe]
+        tx_pipe.execute.return_value = [{b"medicines_user_1"}, 1]
+
+        with Cache.batch():
+            assert Cache.invalidate_tags("user_1") == 0
+
+        tx_pipe.smembers.assert_called_once_with("tag_user_1")
+        write_pipe.unlink.assert_called_once_with("medicines_user_1")
+
+    def test_get_or_load_fill_bypasses_batch(self, mock_redis):
+        """Test cache fills are written immediately so lock waiters can see them"""
+        mock_redis.set.return_value = True
+        mock_redis.get.return_value = None
+        with Cache.batch():
+            Cache.get_or_load("doctors_all", lambda: [1], expiry=300)
+            mock_redis.setex.assert_called_once()
+
+
+class TestMemoryRedis:
+    """Test the bounded in-process Redis stand-in"""
+
+    def test_get_set_with_ttl(self):
+        """Test values expire after their TTL"""
+        client = MemoryRedis(max_entries=10)
+        with patch("src.utils.memory_redis.time.monotonic", return_value=100.0):
+            assert client.setex("key", 5, b"value") is True
+            assert client.get("key") == b"value"
+            assert 0 < client.pttl("key") <= 5000
+        with patch("src.utils.memory_redis.time.monotonic", return_value=106.0):
+            assert client.get("key") is None
+            assert client.pttl("key") == -2
+
+    def test_bounded(self):
+        """Test the least recently used key is evicted when full"""
+        client = MemoryRedis(max_entries=2)
+        client.set("a", b"1")
+        client.set("b", b"2")
+        client.set("c", b"3")
+        assert client.get("a") is None
+        assert len(client) == 2
+
+    def test_set_nx_and_pipeline(self):
+        """Test NX locks and pipelined commands behave like redis-py"""
+        client = MemoryRedis()
+        assert client.set("lock_x", "t", nx=True, ex=10) is True
+        assert client.set("lock_x", "u", nx=True, ex=10) is None
+
+        pipe = client.pipeline(transaction=False)
+        pipe.sadd("tag_user_1", "medicines_user_1")
+        pipe.smembers("tag_user_1")
+        pipe.unlink("lock_x")
+        assert pipe.execute() == [1, {"medicines_user_1"}, 1]
+
+    def test_cache_api_on_memory_backend(self):
+        """Test the full Cache API, tags included, runs against the memory backend"""
+        with patch.object(cache_module, "redis_client", MemoryRedis()), \
+             patch.object(cache_module, "local_cache", None):
+            Cache.set("medicines_user_1", [1], tags=["user_1"])
+            assert Cache.get_many(["medicines_user_1"]) == {"medicines_user_1": [1]}
+            assert Cache.invalidate_tags("user_1") == 1
+            assert Cache.get("medicines_user_1") is None
+
+
+class TestCircuitBreaker:
+    """Test falling back to the in-memory backend while Redis is down"""
+
+    @pytest.fixture
+    def outage(self):
+        down = MagicMock()
+        down.get.side_effect = ConnectionError("down")
+        down.setex.side_effect = ConnectionError("down")
+        fallback = MemoryRedis(journaling=True)
+        with patch.object(cache_module, "redis_client", down), \
+             patch.object(cache_module, "fallback_client", fallback), \
+             patch.object(cache_module, "local_cache", None):
+            yield down, fallback
+
+    def test_trips_after_threshold(self, outage):
+        """Test the breaker opens after N outages and stops calling Redis"""
+        down, fallback = outage
+        threshold = cache_module.circuit_breaker.failure_threshold
+        for _ in range(threshold):
+            assert Cache.get("session_abc") is None
+        assert cache_module.circuit_breaker.state == "open"
+
+        assert Cache.set("session_abc", {"user_id": 1}) is True
+        assert Cache.get("session_abc") == {"user_id": 1}
+        assert down.get.call_count == threshold
+        down.setex.assert_not_called()
+
+    def test_other_errors_do_not_trip(self, outage):
+        """Test non-connection errors do not count towards the threshold"""
+        down, _ = outage
+        down.get.side_effect = ValueError("bad")
+        for _ in range(cache_module.circuit_breaker.failure_threshold + 1):
+            Cache.get("session_abc")
+        assert cache_module.circuit_breaker.state == "closed"
+
+    def test_probe_recovers_and_invalidates(self, outage):
+        """Test a successful half-open probe invalidates keys touched during the outage and closes"""
+        down, fallback = outage
+        breaker = cache_module.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            Cache.get("session_abc")
+        Cache.set("session_abc", {"user_id": 1}, expiry=60)
+        Cache.delete("session_old")
+
+        healthy = MemoryRedis()
+        healthy.set("session_old", b"x")
+        with patch.object(cache_module, "redis_client", healthy), \
+             patch.object(breaker, "reset_timeout", 0), \
+             patch("src.utils.cache.threading.Thread") as mock_thread:
+            assert breaker.allow() is False
+            assert breaker.state == "half_open"
+            breaker._run_probe()
+            mock_thread.return_value.start.assert_called_once()
+
+        assert breaker.state == "closed"
+        assert healthy.get("session_abc") is None
+        assert healthy.get("session_old") is None
+        assert len(fallback) == 0
+
+    def test_recovery_never_overwrites_other_workers(self, outage):
+        """Test values from this worker's outage do not replace or resurrect what other workers wrote to Redis"""
+        down, fallback = outage
+        breaker = cache_module.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            Cache.get("entity_medicines_1")
+        # Cut off, this worker caches versions other workers have since replaced or invalidated
+        Cache.set("entity_medicines_1", {"dosage": "500mg"})
+        Cache.set("entity_medicines_2", {"dosage": "10mg"})
+        Cache.set("medicines_user_1", [1], tags=["user_1"])
+        Cache.invalidate_tags("user_2")
+
+        # Meanwhile the others, still connected, wrote a newer row and cached pages and rows of their own
+        healthy = MemoryRedis()
+        healthy.set("entity_medicines_1", OrjsonCodec().encode({"dosage": "650mg"}))
+        healthy.set("appointments_user_2", OrjsonCodec().encode([7]))
+        healthy.sadd("tag_user_2", "appointments_user_2")
+        healthy.set("entity_medicines_3", OrjsonCodec().encode({"dosage": "1mg"}))
+        with patch.object(cache_module, "redis_client", healthy):
+            with patch.object(breaker, "reset_timeout", 0), \
+                 patch("src.utils.cache.threading.Thread"):
+                breaker.allow()
+                breaker._run_probe()
+
+            assert breaker.state == "closed"
+            assert Cache.get("entity_medicines_1") is None
+            assert Cache.get("entity_medicines_2") is None
+            assert Cache.get("medicines_user_1") is None
+            assert Cache.get("appointments_user_2") is None
+            assert Cache.get("entity_medicines_3") == {"dosage": "1mg"}
+
+    def test_recovery_after_journal_overflow_clears_broadly(self, outage):
+        """Test a revocation pushed out of a full journal is still applied, by clearing every app key"""
+        down, _ = outage
+        breaker = cache_module.circuit_breaker
+        fallback = MemoryRedis(max_entries=3, journaling=True)
+        with patch.object(cache_module, "fallback_client", fallback):
+            for _ in range(breaker.failure_threshold):
+                Cache.get("session_revoked")
+            Cache.delete("session_revoked")
+            for medicine_id in range(5):
+                Cache.set(f"entity_medicines_{medicine_id}", {"id": medicine_id})
+            assert fallback.journal_overflowed
+            assert "session_revoked" not in fallback._journal
+
+            healthy = MemoryRedis()
+            healthy.set("session_revoked", b"x")
+            healthy.set("session_other", b"x")
+            healthy.set("doctors_all", b"x")
+            healthy.set("lock_entity_medicines_9", b"x")
+            with patch.object(cache_module, "redis_client", healthy), \
+                 patch.object(breaker, "reset_timeout", 0), \
+                 patch("src.utils.cache.threading.Thread"):
+                breaker.allow()
+                breaker._run_probe()
+
+        assert breaker.state == "closed"
+        assert healthy.get("session_revoked") is None
+        assert healthy.get("session_other") is None
+        assert healthy.get("doctors_all") is None
+        assert healthy.get("lock_entity_medicines_9") == b"x"
+        assert not fallback.journal_overflowed
+
+    def test_failed_probe_reopens(self, outage):
+        """Test a failed probe keeps the breaker open"""
+        down, _ = outage
+        down.ping.side_effect = ConnectionError("still down")
+        breaker = cache_module.circuit_breaker
+        for _ in range(breaker.failure_threshold):
+            Cache.get("session_abc")
+        breaker.state = "half_open"
+        breaker._run_probe()
+        assert breaker.state == "open"
+
+
+class TestCacheMetrics:
+    """Test per-prefix cache instrumentation"""
+
+    def test_key_prefix_grouping(self):
+        """Test keys map to the longest known prefix"""
+        assert key_prefix("session_abc") == "session_"
+        assert key_prefix("appointments_doctor_2") == "appointments_doctor_"
+        assert key_prefix("doctors_all") == "doctors_all"
+        assert key_prefix("entity_doctors_7") == "entity_doctors_"
+        assert key_prefix("something_else") == "other"
+
+    def test_sensitive_keys_redacted(self):
+        """Test session tokens and phone numbers never appear in exported keys"""
+        redacted = redact_key("session_secret-token")
+        assert redacted.startswith("session_")
+        assert "secret-token" not in redacted
+        assert redact_key("sms_verification_code_+15550100").startswith("sms_verification_code_")
+        assert "+15550100" not in redact_key("sms_verification_code_+15550100")
+        assert redact_key("medicines_user_1") == "medicines_user_1"
+
+    def test_counters_and_latency(self):
+        """Test hits, misses, bytes and latency quantiles are tracked per prefix"""
+        metrics = CacheMetrics()
+        metrics.record_get(["session_a", "session_b"], {"session_a": 10}, 0.002)
+        metrics.record_set({"session_a": 10}, 0.001)
+        metrics.record_delete(["session_a"], 0.001)
+        metrics.record_error(["session_a"])
+
+        stats = metrics.snapshot()["session_"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes_read"] == 10
+        assert stats["sets"] == 1
+        assert stats["deletes"] == 1
+        assert stats["errors"] == 1
+        assert stats["get_p50"] == 0.002
+
+    def test_disabled_metrics_record_nothing(self):
+        """Test instrumentation can be switched off"""
+        metrics = CacheMetrics(enabled=False)
+        metrics.record_get(["session_a"], {}, 0.001)
+        assert metrics.snapshot() == {}
+
+    def test_hot_key_tracker_bounded(self):
+        """Test the tracker keeps at most capacity keys and ranks the hottest first"""
+        tracker = HotKeyTracker(capacity=2, sample_rate=1.0)
+        for key in ["doctors_all"] * 5 + ["doctor_1"] * 3 + ["doctor_2"]:
+            tracker.observe(key)
+        top = tracker.top(2)
+        assert top[0] == ("doctors_all", 5.0)
+        assert len(tracker._counts) == 2
+
+    def test_render_prometheus(self):
+        """Test the exposition format includes counters, summaries and hot keys"""
+        metrics = CacheMetrics(hot_keys=HotKeyTracker(capacity=10, sample_rate=1.0))
+        metrics.record_get(["session_secret"], {"session_secret": 5}, 0.004)
+        text = metrics.render_prometheus(["extra_metric 1"])
+
+        assert "# TYPE cache_hits_total counter" in text
+        assert 'cache_hits_total{prefix="session_"} 1' in text
+        assert 'cache_operation_latency_seconds{prefix="session_",operation="get",quantile="0.99"}' in text
+        assert 'cache_operation_latency_seconds_count{prefix="session_",operation="get"} 1' in text
+        assert "session_secret" not in text
+        assert text.endswith("extra_metric 1\n")
+
+    def test_cache_records_metrics(self):
+        """Test Cache operations feed the shared metrics"""
+        metrics = CacheMetrics()
+        mock_redis = MagicMock()
+        mock_redis.get.return_value = codec.encode([1])
+        with patch.object(cache_module, "redis_client", mock_redis), \
+             patch.object(cache_module, "local_cache", None), \
+             patch.object(cache_module, "cache_metrics", metrics):
+            Cache.get("medicines_user_1")
+            Cache.set("medicines_user_1", [1])
+        stats = metrics.snapshot()["medicines_user_"]
+        assert stats["hits"] == 1
+        assert stats["sets"] == 1
+
+
+class TestEntityCache:
+    """Test the write-through cache of single rows"""
+
+    def _medicine_in(self):
+        return MedicineCreate(
+            user_id=1, name="Paracetamol", dosage="500mg",
+            frequency="Once a day", start_date=datetime.date(2025, 6, 25)
+        )
+
+    def test_put_and_get_roundtrip(self, memory_redis):
+        """Test a stored row comes back as its response schema"""
+        medicine = Medicine(id=3, user_id=1, name="Paracetamol", dosage="500mg",
+                            frequency="Once a day", start_date=datetime.date(2025, 6, 25))
+        EntityCache.put(medicine)
+
+        assert EntityCache.key(Medicine, 3) == "entity_medicines_3"
+        cached = EntityCache.get(Medicine, 3)
+        assert isinstance(cached, MedicineResponse)
+        assert cached.user_id == 1
+        assert cached.start_date == datetime.date(2025, 6, 25)
+
+    def test_get_or_load_does_not_cache_missing_rows(self, memory_redis):
+        """Test a missing row is not remembered"""
+        loader = MagicMock(return_value=None)
+        db = MagicMock(info={})
+        assert EntityCache.get_or_load(Medicine, 99, db, loader) is None
+        assert EntityCache.get_or_load(Medicine, 99, db, loader) is None
+        assert loader.call_count == 2
+        assert memory_redis.get("entity_medicines_99") is None
+
+    def test_service_writes_through_and_evicts(self, memory_redis, test_db):
+        """Test create/update populate the entry on commit and delete evicts it"""
+        medicine = MedicineService.create_medicine(test_db, self._medicine_in())
+        assert EntityCache.get(Medicine, medicine.id) is None
+        test_db.commit()
+        assert EntityCache.get(Medicine, medicine.id).dosage == "500mg"
+
+        MedicineService.update_medicine(test_db, medicine.id, MedicineUpdate(dosage="650mg"))
+        test_db.commit()
+        assert EntityCache.get(Medicine, medicine.id).dosage == "650mg"
+
+        with patch.object(test_db, "query", side_effect=AssertionError("should be served from cache")):
+            assert MedicineService.get_medicine_cached(test_db, medicine.id).dosage == "650mg"
+
+        MedicineService.delete_medicine(test_db, medicine.id)
+        test_db.commit()
+        assert EntityCache.get(Medicine, medicine.id) is None
+        assert MedicineService.get_medicine_cached(test_db, medicine.id) is None
+
+    def test_medicine_writes_evict_parent_appointments(self, memory_redis, client, test_db):
+        """Test the cached appointment's medicine ids follow medicines created, reassigned and deleted"""
+        from src.core.config import settings
+        from src.models.appointment import Appointment
+        from src.models.doctor import Doctor
+        from src.models.user import User
+        user = User(name="Patient", phone="+919876500040")
+        doctor = Doctor(name="Dr. A. Kumar", location="Delhi")
+        test_db.add_all([user, doctor])
+        test_db.commit()
+        first, second = (Appointment(user_id=user.id, doctor_id=doctor.id, name="Checkup", date=datetime.date(2025, 7, 1),
+                                     time=datetime.time(10, 0)) for _ in range(2))
+        test_db.add_all([first, second])
+        test_db.commit()
+        client.cookies.set("session_token", settings.ADMIN_SESSION_TOKEN)
+
+        def medicine_ids(appointment_id):
+            return client.get(f"/api/v1/appointments/{appointment_id}").json()["medicines"] or []
+
+        def doctor_list_ids():
+            return {item["id"]: item["medicines"] or [] for item in client.get(f"/api/v1/appointments/doctor/{doctor.id}").json()}
+
+        assert medicine_ids(first.id) == []
+        assert doctor_list_ids()[first.id] == []
+        medicine = client.post("/api/v1/medicines/", json={
+            "name": "Paracetamol", "dosage": "500mg", "frequency": "Once a day", "start_date": "2025-07-01",
+            "user_id": user.id, "doctor_id": doctor.id, "appointment_id": first.id,
+        }).json()
+        assert medicine_ids(first.id) == [medicine["id"]]
+        assert doctor_list_ids()[first.id] == [medicine["id"]]
+
+        # MedicineUpdate has no appointment_id, so reassignment only happens through the service
+        assert medicine_ids(second.id) == []
+        reassign = SimpleNamespace(model_dump=lambda exclude_unset: {"appointment_id": second.id})
+        MedicineService.update_medicine(test_db, medicine["id"], reassign)
+        test_db.commit()
+        assert medicine_ids(first.id) == []
+        assert medicine_ids(second.id) == [medicine["id"]]
+
+        client.delete(f"/api/v1/medicines/{medicine['id']}")
+        assert medicine_ids(second.id) == []
+        assert doctor_list_ids()[second.id] == []
@@ -0,0 +1,114 @@
+"""
+Tests for the startup cache warm-up
+"""
+import asyncio
+import datetime
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.utils import cache as cache_module
+from src.utils import cache_warmup
+from src.utils.cache import Cache
+from src.utils.entity_cache import EntityCache
+from src.services.pagination import page_cache_key
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.medicine import Medicine
+from src.models.reminder import Reminder, ReminderType
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def warmup_sessions():
+    """Warm-up opens its own sessions; point them at the test database"""
+    with patch.object(cache_warmup, "SessionLocal", TestingSessionLocal):
+        yield
+
+
+class TestCacheWarmup:
+    """Test preloading lists and entities for recently active users"""
+
+    def test_warm_user_fills_lists_and_entities(self, memory_redis, test_db):
+        """Test a warmed user's lists are served without touching the loader"""
+        test_db.add(Medicine(id=1, user_id=7, name="Aspirin", dosage="75mg",
+                             frequency="Daily", start_date=datetime.date(2025, 6, 1)))
+        test_db.commit()
+
+        assert cache_warmup.warm_user(7) == 1
+
+        loader = MagicMock()
+        medicines = Cache.get_or_load(page_cache_key("medicines_user_7"), loader, expiry=300)
+        assert medicines["items"][0]["name"] == "Aspirin"
+        assert medicines["next_cursor"] is None
+        loader.assert_not_called()
+        assert Cache.get_or_load(page_cache_key("documents_user_7"), loader, expiry=300)["items"] == []
+        assert EntityCache.get(Medicine, 1).dosage == "75mg"
+
+        # Warmed lists are tagged, so writes still invalidate them
+        Cache.invalidate_tags(cache_module.user_tag(7))
+        assert Cache.get(page_cache_key("medicines_user_7")) is None
+
+    def test_recently_active_users(self, memory_redis, test_db):
+        """Test users are picked from fresh sessions, touched reminders and nearby appointments, latest first"""
+        now = datetime.datetime.now()
+        Cache.set("session_fresh", {"user_id": 1, "created_at": (now - datetime.timedelta(hours=5)).isoformat()})
+        Cache.set("session_stale", {"user_id": 2, "created_at": (now - datetime.timedelta(days=3)).isoformat()})
+        test_db.add(Appointment(user_id=3, doctor_id=1, name="Checkup",
+                                date=datetime.date.today() + datetime.timedelta(days=1), time=datetime.time(10, 0)))
+        test_db.add(Appointment(user_id=4, doctor_id=1, name="Old",
+                                date=datetime.date.today() - datetime.timedelta(days=30), time=datetime.time(10, 0)))
+        test_db.add(Reminder(user_id=5, reminder_type=ReminderType.MEDICINE, related_id=1, title="Dose",
+                             scheduled_time=now, updated_at=now - datetime.timedelta(hours=1)))
+        test_db.add(Reminder(user_id=0, reminder_type=ReminderType.MEDICINE, related_id=1, title="Dose",
+                             scheduled_time=now, updated_at=now - datetime.timedelta(days=2)))
+        test_db.commit()
+
+        assert cache_warmup.recently_active_user_ids(datetime.timedelta(hours=24), limit=10) == [3, 5, 1]
+        # The cap keeps the most recently active users, not the lowest ids
+        assert cache_warmup.recently_active_user_ids(datetime.timedelta(hours=24), limit=2) == [3, 5]
+
+    def test_warm_cache_limits_concurrency_and_counts_failures(self, memory_redis, test_db):
+        """Test no more than `concurrency` users load at once and failures do not abort the run"""
+        test_db.add(Doctor(id=1, name="Dr. Rao", location="Pune"))
+        test_db.commit()
+        running = []
+        peak = []
+
+        def fake_warm_user(user_id, deadline=None):
+            running.append(user_id)
+            peak.append(len(running))
+            time.sleep(0.02)
+            running.remove(user_id)
+            if user_id == 3:
+                raise RuntimeError("boom")
+            return 2
+
+        with patch.object(cache_warmup, "recently_active_user_ids", return_value=[1, 2, 3, 4, 5]), \
+             patch.object(cache_warmup, "warm_user", side_effect=fake_warm_user):
+            summary = asyncio.run(cache_warmup.warm_cache(concurrency=2))
+
+        assert max(peak) <= 2
+        assert summary["doctors"] == 1
+        assert summary["users"] == 4
+        assert summary["rows"] == 8
+        assert summary["failed"] == 1
+        assert EntityCache.get(Doctor, 1).name == "Dr. Rao"
+
+    def test_warm_cache_stops_at_deadline(self, memory_redis, test_db):
+        """Test users still queued when the deadline passes are not loaded"""
+        with patch.object(cache_warmup, "recently_active_user_ids", return_value=[1, 2]), \
+             patch.object(cache_warmup, "warm_user", return_value=1) as warm_user:
+            summary = asyncio.run(cache_warmup.warm_cache(deadline=time.monotonic() - 1))
+
+        warm_user.assert_not_called()
+        assert summary["users"] == 0
+
+    def test_startup_warmup_runs_on_one_worker(self, memory_redis, test_db):
+        """Test only the first worker to start warms the shared cache"""
+        with patch.object(cache_warmup, "warm_cache", return_value={}) as warm_cache:
+            asyncio.run(cache_warmup.run_startup_warmup())
+            asyncio.run(cache_warmup.run_startup_warmup())
+
+        warm_cache.assert_called_once()
+        assert warm_cache.call_args.kwargs["deadline"] > time.monotonic()
@@ -40,7 +40,7 @@ class TestConfiguration:
         """Test Redis URL is in correct format"""
         redis_url = settings.REDIS_URL
         assert isinstance(redis_url, str)
-        assert redis_url.startswith('redis://')
+        assert redis_url.startswith(('redis://', 'rediss://', 'memory://', 'fakeredis://'))
 
     def test_secret_key_exists(self):
         """Test that secret key is set"""
@@ -136,3 +136,414 @@ class TestModelDefinitions:
         passkey = PasskeyCredential(credential_id="test_credential")
         passkey_str = str(passkey)
         assert "test_cre..." in passkey_str
+
+    def test_reminder_hot_path_indexes(self, client):
+        """Test the scheduler and per-user listing indexes exist and the due index is partial"""
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("reminders")}
+
+        assert indexes["ix_reminders_user_schedule"]["column_names"] == ["user_id", "scheduled_time", "id"]
+        assert indexes["ix_reminders_due"]["column_names"] == ["scheduled_time"]
+        with engine.connect() as conn:
+            ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'ix_reminders_due'")).scalar()
+        assert "WHERE status = 'PENDING' AND is_active = 1" in ddl
+
+
+class TestEnginePooling:
+    """Test pool configuration and the async engine"""
+
+    def test_postgres_pool_options_come_from_settings(self):
+        """Test pool size, overflow, timeout and recycle are driven by settings"""
+        from unittest.mock import patch
+        from src.db import database
+        with patch.object(type(database.settings), "is_sqlite", new=property(lambda self: False)), \
+             patch.object(database.settings, "DB_POOL_SIZE", 20), \
+             patch.object(database.settings, "DB_MAX_OVERFLOW", 5), \
+             patch.object(database.settings, "DB_POOL_TIMEOUT", 3.0), \
+             patch.object(database.settings, "DB_POOL_RECYCLE", 600):
+            options = database._engine_options()
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 5
+        assert options["pool_timeout"] == 3.0
+        assert options["pool_recycle"] == 600
+        assert "connect_args" not in options
+
+    def test_async_database_url(self):
+        """Test the async URL swaps in an async driver"""
+        from unittest.mock import patch
+        from src.core.config import settings
+        with patch.object(settings, "DATABASE_URL", "postgresql://u:p@db:5432/app"):
+            assert settings.async_database_url == "postgresql+psycopg://u:p@db:5432/app"
+        with patch.object(settings, "DATABASE_URL", "sqlite:///./app.db"):
+            assert settings.async_database_url == "sqlite+aiosqlite:///./app.db"
+
+    def test_get_async_db(self, tmp_path):
+        """Test the async dependency yields a working session"""
+        import asyncio
+        from unittest.mock import patch
+        from src.db import database
+        from src.core.config import settings
+
+        async def run():
+            try:
+                async for db in database.get_async_db():
+                    result = await db.execute(text("SELECT 1"))
+                    return result.scalar()
+            finally:
+                await database.dispose_async_engine()
+
+        with patch.object(settings, "DATABASE_URL", f"sqlite:///{tmp_path}/async.db"):
+            assert asyncio.run(run()) == 1
+        assert database._async_engine is None
+
+
+class TestReadReplicaRouting:
+    """Test read-only sessions are spread over replicas with read-your-writes stickiness"""
+
+    @pytest.fixture
+    def replicas(self):
+        import itertools
+        from unittest.mock import MagicMock, patch
+        from src.db import database
+        from src.utils import cache as cache_module
+        from src.utils.memory_redis import MemoryRedis
+        factories = [MagicMock(name="replica0"), MagicMock(name="replica1")]
+        for factory in factories:
+            factory.return_value.info = {}
+        with patch.object(database, "ReplicaSessionLocals", factories), \
+             patch.object(database, "_replica_order", itertools.cycle(range(2))), \
+             patch.object(cache_module, "redis_client", MemoryRedis()), \
+             patch.object(cache_module, "local_cache", None):
+            yield factories
+
+    def _request(self, token="abc"):
+        from unittest.mock import MagicMock
+        request = MagicMock()
+        request.cookies = {"session_token": token}
+        return request
+
+    def _open(self, dependency, request):
+        generator = dependency(request)
+        db = next(generator)
+        generator.close()
+        return db
+
+    def test_round_robin_across_replicas(self, replicas):
+        """Test reads alternate between replicas and are marked read-only"""
+        from src.db import database
+        first = self._open(database.get_read_db, self._request())
+        second = self._open(database.get_read_db, self._request())
+        assert first is replicas[0].return_value
+        assert second is replicas[1].return_value
+        assert first.info["read_only"] is True
+
+    def test_writer_is_pinned_to_primary(self, replicas):
+        """Test a client that just wrote reads from the primary, others still use replicas"""
+        from src.db import database
+        request = self._request("writer")
+        generator = database.get_db(request)
+        db = next(generator)
+        db.info["has_writes"] = True
+        with pytest.raises(StopIteration):
+            next(generator)
+
+        assert database.is_pinned_to_primary(request)
+        pinned = self._open(database.get_read_db, request)
+        assert pinned.info.get("read_only") is None
+        assert replicas[0].call_count == 0
+        self._open(database.get_read_db, self._request("reader"))
+        assert replicas[0].call_count == 1
+
+    def test_new_session_token_is_pinned(self, replicas):
+        """Test the cookie issued at registration reads from the primary on its first requests"""
+        from src.db import database
+        database.pin_session_to_primary("fresh")
+        assert database.is_pinned_to_primary(self._request("fresh"))
+        assert not database.is_pinned_to_primary(self._request("other"))
+
+    def test_shared_dependencies_follow_the_method(self):
+        """Test auth dependencies read from the replica on GET and use the unit of work otherwise"""
+        from unittest.mock import MagicMock
+        from src.db import database
+        db, read_db = MagicMock(name="primary"), MagicMock(name="replica")
+        assert database.get_request_db(MagicMock(method="GET"), db, read_db) is read_db
+        assert database.get_request_db(MagicMock(method="HEAD"), db, read_db) is read_db
+        assert database.get_request_db(MagicMock(method="POST"), db, read_db) is db
+
+    def test_cache_is_filled_from_the_primary(self, replicas):
+        """Test values bound for the shared cache are not loaded from a replica that may lag"""
+        from unittest.mock import MagicMock, patch
+        from src.db import database
+        primary = MagicMock(name="primary")
+        replica = self._open(database.get_read_db, self._request())
+        with patch.object(database, "SessionLocal", return_value=primary):
+            with database.cache_fill_session(replica) as source:
+                assert source is primary
+            primary.close.assert_called_once()
+
+            writer = MagicMock(info={})
+            with database.cache_fill_session(writer) as source:
+                assert source is writer
+
+    def test_entity_cache_miss_loads_from_the_primary(self, replicas):
+        """Test a single-row cache miss on a replica session is loaded and stored from the primary"""
+        import datetime
+        from unittest.mock import MagicMock, patch
+        from src.db import database
+        from src.models.medicine import Medicine
+        from src.utils.entity_cache import EntityCache
+        primary = MagicMock(name="primary")
+        medicine = Medicine(id=5, user_id=1, name="Paracetamol", dosage="500mg",
+                            frequency="Once a day", start_date=datetime.date(2025, 6, 25))
+        loader = MagicMock(return_value=medicine)
+        replica = self._open(database.get_read_db, self._request())
+        with patch.object(database, "SessionLocal", return_value=primary):
+            assert EntityCache.get_or_load(Medicine, 5, replica, loader).dosage == "500mg"
+        loader.assert_called_once_with(primary)
+        assert EntityCache.get(Medicine, 5).dosage == "500mg"
+
+    def test_flush_through_replica_session_raises(self, client):
+        """Test writes are refused on read-only sessions"""
+        from sqlalchemy.orm import Session
+        from datetime import date
+        with Session(bind=engine) as db:
+            db.info["read_only"] = True
+            db.add(User(name="Nope", phone="+911234567890", dob=date(1990, 1, 1), gender="Other"))
+            with pytest.raises(RuntimeError):
+                db.flush()
+
+
+class TestUnitOfWork:
+    """Test services only flush and the request commits or rolls back once"""
+
+    @pytest.fixture
+    def session_factory(self, test_db):
+        from unittest.mock import patch
+        from src.db import database
+        from tests.conftest import TestingSessionLocal
+        with patch.object(database, "SessionLocal", TestingSessionLocal):
+            yield
+
+    def _user(self, phone):
+        from src.schemas.user import UserCreate
+        return UserCreate(name="Unit Of Work", phone=phone)
+
+    def test_request_commits_once_and_runs_commit_hooks(self, session_factory, test_db):
+        """Test writes from several service calls land together, with cache hooks after the commit"""
+        from unittest.mock import MagicMock
+        from src.db import database
+        from src.services.user_service import UserService
+        hook = MagicMock()
+
+        generator = database.get_db()
+        db = next(generator)
+        UserService.register_user(db, self._user("+919876500010"))
+        UserService.register_user(db, self._user("+919876500011"))
+        database.on_commit(db, hook, "users")
+        hook.assert_not_called()
+        with pytest.raises(StopIteration):
+            next(generator)
+
+        hook.assert_called_once_with("users")
+        assert test_db.query(User).count() == 2
+
+    def test_request_error_rolls_back_everything(self, session_factory, test_db):
+        """Test an exception in the endpoint discards every flushed write and the queued hooks"""
+        from unittest.mock import MagicMock
+        from fastapi import HTTPException
+        from src.db import database
+        from src.services.user_service import UserService
+        hook = MagicMock()
+
+        generator = database.get_db()
+        db = next(generator)
+        UserService.register_user(db, self._user("+919876500012"))
+        database.on_commit(db, hook)
+        with pytest.raises(HTTPException):
+            generator.throw(HTTPException(status_code=400, detail="boom"))
+
+        hook.assert_not_called()
+        assert test_db.query(User).count() == 0
+
+    def test_scheduler_commits_each_reminder(self, test_db):
+        """Test the scheduler, which runs outside any request, commits its status updates itself"""
+        import datetime
+        from unittest.mock import MagicMock, patch
+        from src.models.reminder import Reminder, ReminderType, ReminderStatus
+        from src.services import reminder_scheduler
+        from tests.conftest import TestingSessionLocal
+        user = User(name="Patient", phone="+919876500013")
+        test_db.add(user)
+        test_db.commit()
+        for _ in range(2):
+            test_db.add(Reminder(user_id=user.id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                                 title="Dose", message="Take it",
+                                 scheduled_time=datetime.datetime.now() - datetime.timedelta(minutes=1)))
+        test_db.commit()
+        sms = MagicMock()
+        sms.send_reminder_sms.return_value = {"success": True}
+
+        with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(reminder_scheduler, "sms_service", sms):
+            reminder_scheduler.ReminderScheduler().process_due_reminders()
+
+        test_db.expire_all()
+        assert {reminder.status for reminder in test_db.query(Reminder)} == {ReminderStatus.SENT}
+
+
+class TestSQLiteProfile:
+    """Test the single-node SQLite profile: pragmas, immediate write transactions and the writer queue"""
+
+    @pytest.fixture
+    def sqlite_engine(self, tmp_path):
+        from sqlalchemy import create_engine
+        from src.db.sqlite import configure_sqlite_engine
+        file_engine = create_engine(f"sqlite:///{tmp_path}/profile.db", connect_args={"check_same_thread": False})
+        writer_lock = configure_sqlite_engine(file_engine, single_writer=True)
+        with file_engine.begin() as conn:
+            conn.execute(text("CREATE TABLE counters (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)"))
+            conn.execute(text("INSERT INTO counters (id, value) VALUES (1, 0)"))
+        yield file_engine, writer_lock
+        file_engine.dispose()
+
+    def test_pragmas_applied_on_connect(self, sqlite_engine):
+        """Test WAL, synchronous=NORMAL and busy_timeout are set on every connection"""
+        file_engine, _ = sqlite_engine
+        with file_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+    def test_writer_lock_held_until_commit(self, sqlite_engine):
+        """Test reads take no lock, and a write holds it from its first statement until commit"""
+        file_engine, writer_lock = sqlite_engine
+        with file_engine.connect() as conn:
+            conn.execute(text("SELECT value FROM counters")).scalar()
+            assert not writer_lock._lock.locked()
+            conn.execute(text("UPDATE counters SET value = value + 1"))
+            assert writer_lock._lock.locked()
+            assert conn.connection.dbapi_connection.in_transaction
+            conn.commit()
+            assert not writer_lock._lock.locked()
+
+            conn.execute(text("UPDATE counters SET value = value + 1"))
+            conn.rollback()
+            assert not writer_lock._lock.locked()
+            assert conn.execute(text("SELECT value FROM counters")).scalar() == 1
+
+    def test_concurrent_writers_do_not_hit_busy(self, sqlite_engine):
+        """Test writes from many threads all commit, without SQLITE_BUSY or lost updates"""
+        from concurrent.futures import ThreadPoolExecutor
+        from sqlalchemy.orm import sessionmaker
+        file_engine, _ = sqlite_engine
+        Session = sessionmaker(bind=file_engine)
+
+        def increment(_):
+            with Session() as db:
+                db.execute(text("UPDATE counters SET value = value + 1 WHERE id = 1"))
+                db.commit()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(increment, range(200)))
+
+        with file_engine.connect() as conn:
+            assert conn.execute(text("SELECT value FROM counters")).scalar() == 200
+
+
+class TestSchemaManagement:
+    """Test the schema CLI and the startup check against the Alembic head"""
+
+    @pytest.fixture
+    def file_engine(self, tmp_path):
+        from sqlalchemy import create_engine
+        file_engine = create_engine(f"sqlite:///{tmp_path}/schema.db")
+        yield file_engine
+        file_engine.dispose()
+
+    def test_head_revisions_match_alembic(self):
+        """Test the heads parsed from the migration scripts are the ones Alembic computes"""
+        from alembic.script import ScriptDirectory
+        from src.db.schema import alembic_config, head_revisions
+        assert head_revisions() == set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+    def test_upgrade_creates_and_stamps_empty_database(self, file_engine):
+        """Test an empty database is built from the models and passes the startup check"""
+        from src.db.schema import head_revisions, upgrade, verify_schema
+        assert upgrade(file_engine) == "created"
+        assert {"users", "reminders", "alembic_version"} <= set(inspect(file_engine).get_table_names())
+        with file_engine.connect() as conn:
+            assert set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars()) == head_revisions()
+        assert verify_schema(file_engine, mode="error")
+        assert upgrade(file_engine) == "upgraded"
+
+    @staticmethod
+    def create_legacy_database(engine, with_hot_path_indexes=False):
+        """Build the tables the old create-on-import startup made: reminders as of a89a6e215d69, no archive"""
+        from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, Text
+        metadata = MetaData()
+        for table in Base.metadata.sorted_tables:
+            if table.name not in ("reminders", "reminders_archive"):
+                table.to_metadata(metadata)
+        reminders = Table(
+            "reminders", metadata,
+            Column("id", Integer, primary_key=True, index=True),
+            Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+            Column("reminder_type", Enum("APPOINTMENT", "MEDICINE", name="remindertype"), nullable=False, index=True),
+            Column("related_id", Integer, nullable=False, index=True),
+            Column("title", String, nullable=False),
+            Column("message", Text),
+            Column("scheduled_time", DateTime, nullable=False, index=True),
+            Column("status", Enum("PENDING", "SENT", "FAILED", "CANCELLED", name="reminderstatus"), nullable=False, index=True),
+            Column("created_at", DateTime, nullable=False),
+            Column("updated_at", DateTime, nullable=False),
+            Column("is_active", Boolean, nullable=False, index=True),
+        )
+        if with_hot_path_indexes:
+            Index("ix_reminders_due", reminders.c.scheduled_time, sqlite_where=text("status = 'PENDING' AND is_active = 1"))
+            Index("ix_reminders_user_schedule", reminders.c.user_id, reminders.c.scheduled_time, reminders.c.id)
+        metadata.create_all(bind=engine)
+
+    @pytest.mark.parametrize("with_hot_path_indexes", [False, True])
+    def test_upgrade_migrates_database_created_on_import(self, file_engine, with_hot_path_indexes):
+        """Test tables made by the old create-on-import startup get every later migration, not just a stamp"""
+        from src.db.schema import head_revisions, upgrade, verify_schema
+        self.create_legacy_database(file_engine, with_hot_path_indexes)
+        with file_engine.begin() as conn:
+            conn.execute(text("INSERT INTO users (id, name, phone, is_active) VALUES (1, 'Patient', '+919876500001', 1)"))
+            conn.execute(text("INSERT INTO reminders (user_id, reminder_type, related_id, title, scheduled_time, status, "
+                              "created_at, updated_at, is_active) VALUES (1, 'MEDICINE', 1, 'Dose', '2025-01-01', "
+                              "'PENDING', '2025-01-01', '2025-01-01', 1)"))
+
+        assert upgrade(file_engine) == "adopted"
+
+        inspector = inspect(file_engine)
+        columns = {column["name"] for column in inspector.get_columns("reminders")}
+        indexes = {index["name"] for index in inspector.get_indexes("reminders")}
+        assert {"claimed_by", "claimed_at"} <= columns
+        assert {"ix_reminders_due", "ix_reminders_user_schedule", "ix_reminders_claimed"} <= indexes
+        assert "reminders_archive" in inspector.get_table_names()
+        with file_engine.connect() as conn:
+            assert set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars()) == head_revisions()
+            assert conn.execute(text("SELECT count(*) FROM reminders")).scalar() == 1
+        assert verify_schema(file_engine, mode="error")
+
+    def test_verify_schema_modes(self, file_engine):
+        """Test an unstamped database fails startup, only logs in warn mode and is not queried when off"""
+        from unittest.mock import patch
+        from src.db.schema import SchemaOutOfDate, verify_schema
+        Base.metadata.create_all(bind=file_engine)
+        with pytest.raises(SchemaOutOfDate, match="src.db.schema upgrade"):
+            verify_schema(file_engine, mode="error")
+        assert verify_schema(file_engine, mode="warn") is False
+        with patch.object(file_engine, "connect") as connect:
+            assert verify_schema(file_engine, mode="off")
+        connect.assert_not_called()
+
+    def test_verify_schema_runs_one_query(self, file_engine):
+        """Test the startup check costs a single statement"""
+        from sqlalchemy import event
+        from src.db.schema import upgrade, verify_schema
+        upgrade(file_engine)
+        statements = []
+        event.listen(file_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+        assert verify_schema(file_engine, mode="error")
+        assert statements == ["SELECT version_num FROM alembic_version"]
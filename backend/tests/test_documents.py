@@ -15,6 +15,7 @@ class TestDocuments:
     def create_authenticated_session(self, client, test_db):
         user_data = UserCreate(name="Test User", phone="1234567890", is_active=True)
         user = UserService.register_user(test_db, user_data)
+        test_db.commit()
         
         session_data = UserService.issue_session(user.id)
         session_token = session_data["session_token"]
@@ -110,3 +110,27 @@ class TestSecurityHeaders:
         """Test proper handling of unsupported HTTP methods"""
         response = client.post("/api/v1/health")
         assert response.status_code == 405
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus metrics endpoint"""
+
+    def test_metrics_requires_admin(self, client):
+        """Test metrics are not exposed without an admin session"""
+        response = client.get("/api/v1/metrics")
+        assert response.status_code == 401
+
+    def test_metrics_prometheus_format(self, client):
+        """Test admins get cache metrics in Prometheus text format"""
+        from src.core.config import settings
+        from src.utils.cache import Cache
+
+        Cache.set("doctors_all", [1], expiry=60)
+        Cache.get("doctors_all")
+        client.cookies.set("session_token", settings.ADMIN_SESSION_TOKEN)
+
+        response = client.get("/api/v1/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'cache_hits_total{prefix="doctors_all"}' in response.text
+        assert "cache_circuit_breaker_open 0" in response.text
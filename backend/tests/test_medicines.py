@@ -5,6 +5,8 @@ from src.models.reminder import Reminder
 from src.schemas.user import UserCreate
 from src.services.user_service import UserService
 from src.services.reminder_service import ReminderService
+from src.services.medicine_service import MedicineService
+from src.services.ai_service import AIService
 from src.core.config import settings
 from src.models.doctor import Doctor
 from src.models.appointment import Appointment
@@ -20,6 +22,7 @@ class TestMedicines:
     def create_authenticated_session(self, client, test_db):
         user_data = UserCreate(name="Test User", phone="1234567890", is_active=True)
         user = UserService.register_user(test_db, user_data)
+        test_db.commit()
         
         session_data = UserService.issue_session(user.id)
         session_token = session_data["session_token"]
@@ -423,6 +426,41 @@ class TestMedicines:
                 assert "medicine" in reminder.title.lower()
                 assert reminder.scheduled_time is not None
 
+    def test_frequency_parsed_before_medicine_written(self, client, test_db):
+        """Test the AI frequency fallback runs before the medicine insert opens the write transaction."""
+        user, session_token = self.create_authenticated_session(client, test_db)
+        doctor_id = self.create_doctor(test_db)
+        calls = []
+        create_medicine = MedicineService.create_medicine
+
+        def parse(medicine):
+            calls.append("parse")
+            return {"interval": {"unit": "days", "value": 1},
+                    "times_per_interval": [{"hour": 7, "minute": 15}]}
+
+        def create(db, medicine_in):
+            calls.append("insert")
+            return create_medicine(db, medicine_in)
+
+        start = date.today() + timedelta(days=1)
+        medicine_data = {
+            "name": "Cefixime",
+            "dosage": "200mg",
+            "frequency": "Take one tablet at breakfast",
+            "start_date": str(start),
+            "end_date": str(start),
+            "user_id": user.id,
+            "doctor_id": doctor_id
+        }
+        with patch.object(AIService, "parse_medicine_frequency", side_effect=parse), \
+             patch.object(MedicineService, "create_medicine", side_effect=create):
+            response = client.post("/api/v1/medicines/", json=medicine_data)
+
+        assert response.status_code == 200
+        assert calls == ["parse", "insert"]
+        reminders = test_db.query(Reminder).filter_by(related_id=response.json()["id"]).all()
+        assert [(r.scheduled_time.hour, r.scheduled_time.minute) for r in reminders] == [(7, 15)]
+
     def test_medicine_genai_reminder_times(self, client, test_db):
         """Test that reminders are created at the correct times for a realistic, complex frequency using GenAI parsing."""
         user, session_token = self.create_authenticated_session(client, test_db)
@@ -0,0 +1,117 @@
+"""
+Tests for keyset pagination and the paginated list endpoints
+"""
+import datetime
+import pytest
+
+from src.core.config import settings
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.services.pagination import InvalidCursor, clamp_page_size, decode_cursor, encode_cursor, paginate
+
+
+class TestKeysetPagination:
+    """Test the reusable keyset pagination primitive"""
+
+    KEYS = [Appointment.date, Appointment.time, Appointment.id]
+
+    def add_appointments(self, test_db):
+        """Helper adding appointments with ties on date and time"""
+        day = datetime.date(2025, 7, 1)
+        for i, (offset, hour) in enumerate([(0, 9), (0, 9), (0, 10), (1, 9), (2, 8)]):
+            test_db.add(Appointment(user_id=1, doctor_id=1, name=f"Visit {i}",
+                                    date=day + datetime.timedelta(days=offset), time=datetime.time(hour)))
+        test_db.commit()
+
+    def walk(self, test_db, limit, descending=False):
+        names, cursor = [], None
+        while True:
+            page = paginate(test_db.query(Appointment), self.KEYS, limit=limit, cursor=cursor, descending=descending)
+            names.extend(appointment.name for appointment in page)
+            if not page.next_cursor:
+                return names
+            cursor = page.next_cursor
+
+    def test_walks_every_row_once_across_ties(self, test_db):
+        """Test a composite sort key with duplicate prefixes neither skips nor repeats rows"""
+        self.add_appointments(test_db)
+
+        assert self.walk(test_db, limit=2) == ["Visit 0", "Visit 1", "Visit 2", "Visit 3", "Visit 4"]
+        assert self.walk(test_db, limit=2, descending=True) == ["Visit 4", "Visit 3", "Visit 2", "Visit 1", "Visit 0"]
+
+    def test_last_page_has_no_cursor(self, test_db):
+        """Test an exactly full last page does not hand out a cursor to an empty page"""
+        self.add_appointments(test_db)
+
+        page = paginate(test_db.query(Appointment), self.KEYS, limit=5)
+        assert len(page) == 5
+        assert page.next_cursor is None
+
+    def test_cursor_roundtrip_and_rejection(self, test_db):
+        """Test cursors decode to typed sort-key values and garbage is rejected"""
+        self.add_appointments(test_db)
+        row = test_db.query(Appointment).first()
+
+        values = decode_cursor(encode_cursor(row, self.KEYS), self.KEYS)
+        assert values == [row.date, row.time, row.id]
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor", self.KEYS)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor(row, [Appointment.id]), self.KEYS)
+
+    def test_page_size_is_capped(self):
+        """Test page sizes are defaulted and clamped"""
+        from src.core.config import settings
+        assert clamp_page_size(None) == settings.PAGE_SIZE_DEFAULT
+        assert clamp_page_size(10 ** 6) == settings.PAGE_SIZE_MAX
+
+
+class TestPaginatedListEndpoints:
+    """Test list routes expose the next cursor and cache each page"""
+
+    def test_doctor_list_pages(self, client, test_db, memory_redis):
+        """Test following X-Next-Cursor through the doctor list"""
+        for name in ["Dr. A", "Dr. B", "Dr. C"]:
+            test_db.add(Doctor(name=name, location="Pune"))
+        test_db.commit()
+
+        first = client.get("/api/v1/doctors/?limit=2")
+        assert first.status_code == 200
+        assert [doctor["name"] for doctor in first.json()] == ["Dr. A", "Dr. B"]
+
+        second = client.get(f"/api/v1/doctors/?limit=2&cursor={first.headers['X-Next-Cursor']}")
+        assert [doctor["name"] for doctor in second.json()] == ["Dr. C"]
+        assert second.headers["X-Next-Cursor"] == ""
+
+    def test_full_list_reachable_with_default_page_size(self, client, test_db, memory_redis):
+        """Test a schedule longer than the default page is returned in full by following X-Next-Cursor"""
+        day = datetime.date(2025, 7, 1)
+        total = settings.PAGE_SIZE_DEFAULT * 2 + 5
+        for i in range(total):
+            test_db.add(Appointment(user_id=1, doctor_id=1, name=f"Visit {i}",
+                                    date=day + datetime.timedelta(days=i // 10), time=datetime.time(8 + i % 10)))
+        test_db.commit()
+
+        first = client.get("/api/v1/appointments/doctor/1")
+        assert len(first.json()) == settings.PAGE_SIZE_DEFAULT
+        assert first.headers["X-Next-Cursor"]
+
+        names, response = [], first
+        while True:
+            names.extend(appointment["name"] for appointment in response.json())
+            cursor = response.headers["X-Next-Cursor"]
+            if not cursor:
+                break
+            response = client.get(f"/api/v1/appointments/doctor/1?cursor={cursor}")
+            assert response.status_code == 200
+        assert names == [f"Visit {i}" for i in range(total)]
+
+    def test_invalid_cursor_is_rejected(self, client, test_db, memory_redis):
+        """Test a malformed cursor is a 400 rather than a 500"""
+        response = client.get("/api/v1/appointments/doctor/1?cursor=garbage")
+        assert response.status_code == 400
+
+    def test_page_size_validated(self, client, test_db, memory_redis):
+        """Test limits above the cap are refused"""
+        response = client.get("/api/v1/doctors/?limit=100000")
+        assert response.status_code == 422
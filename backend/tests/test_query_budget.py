@@ -0,0 +1,107 @@
+"""
+Tests that list and dispatch queries eager-load what they serialize
+"""
+import datetime
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.core.config import settings
+from src.models.appointment import Appointment
+from src.models.doctor import Doctor
+from src.models.medicine import Medicine
+from src.models.reminder import Reminder, ReminderType, ReminderStatus
+from src.models.user import User
+from src.services.reminder_scheduler import ReminderScheduler
+from src.services.reminder_service import ReminderService
+from src.utils import cache as cache_module
+from tests.conftest import count_queries
+
+
+class TestEagerLoading:
+    """Test statement counts do not grow with the number of rows returned"""
+
+    def add_users(self, test_db, count):
+        """Helper adding users with distinct phone numbers"""
+        users = [User(name=f"User {i}", phone=f"+9198765{i:05d}") for i in range(count)]
+        test_db.add_all(users)
+        test_db.commit()
+        return users
+
+    def add_appointments(self, test_db, user_id, doctor_id, count):
+        """Helper adding appointments that each have a prescribed medicine"""
+        for i in range(count):
+            appointment = Appointment(user_id=user_id, doctor_id=doctor_id, name=f"Visit {i}",
+                                      date=datetime.date(2025, 7, 1), time=datetime.time(9, i))
+            test_db.add(appointment)
+            test_db.flush()
+            test_db.add(Medicine(user_id=user_id, appointment_id=appointment.id, doctor_id=doctor_id,
+                                 name=f"Medicine {i}", dosage="5mg", frequency="Daily",
+                                 start_date=datetime.date(2025, 7, 1)))
+        test_db.commit()
+
+    def test_appointment_list_serializes_medicine_ids(self, client, test_db, memory_redis, query_budget):
+        """Test the doctor's appointment list loads medicines in one query whatever the page size"""
+        client.cookies.set("session_token", settings.ADMIN_SESSION_TOKEN)
+        user = self.add_users(test_db, 1)[0]
+        doctor = Doctor(name="Dr. Rao", location="Pune")
+        test_db.add(doctor)
+        test_db.commit()
+        self.add_appointments(test_db, user.id, doctor.id, 2)
+        with count_queries() as few:
+            client.get(f"/api/v1/appointments/doctor/{doctor.id}")
+
+        self.add_appointments(test_db, user.id, doctor.id, 6)
+        cache_module.Cache.invalidate_tags(cache_module.user_tag(user.id))
+        with query_budget(len(few)):
+            response = client.get(f"/api/v1/appointments/doctor/{doctor.id}?limit=50")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 8
+        assert all(len(appointment["medicines"]) == 1 for appointment in response.json())
+
+    def test_due_reminders_join_their_users(self, test_db):
+        """Test dispatching a batch reads every phone number without a query per reminder"""
+        users = self.add_users(test_db, 5)
+        for user in users:
+            test_db.add(Reminder(user_id=user.id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                                 title="Take medicine", message="Take it",
+                                 scheduled_time=datetime.datetime.now() - datetime.timedelta(minutes=1),
+                                 status=ReminderStatus.PENDING, is_active=True))
+        test_db.commit()
+        test_db.expire_all()
+
+        scheduler = ReminderScheduler()
+        sms = MagicMock()
+        sms.send_reminder_sms.return_value = {"success": True}
+        with count_queries() as counter, patch("src.services.reminder_scheduler.sms_service", sms):
+            for reminder in ReminderService.get_due_reminders(test_db):
+                assert scheduler.send_notification(reminder)
+
+        assert sms.send_reminder_sms.call_count == 5
+        assert len(counter) == 1
+
+
+class TestBulkReminderCreation:
+    """Test auto-generated reminders are inserted as one batch"""
+
+    def test_medicine_reminders_bounded_statements(self, client, test_db, memory_redis, query_budget):
+        """Test creating a medicine with 90 daily doses stays within a fixed statement budget"""
+        client.cookies.set("session_token", settings.ADMIN_SESSION_TOKEN)
+        user = User(name="Patient", phone="+919876500001")
+        test_db.add(user)
+        test_db.commit()
+        start = datetime.date.today() + datetime.timedelta(days=1)
+        medicine = {
+            "name": "Metformin", "dosage": "500mg", "frequency": "twice daily",
+            "start_date": str(start), "end_date": str(start + datetime.timedelta(days=89)),
+            "user_id": user.id,
+        }
+
+        with query_budget(6) as counter:
+            response = client.post("/api/v1/medicines/", json=medicine)
+
+        assert response.status_code == 200
+        reminders = test_db.query(Reminder).filter(Reminder.related_id == response.json()["id"]).all()
+        assert len(reminders) == 180
+        assert all(reminder.status == ReminderStatus.PENDING and reminder.is_active for reminder in reminders)
+        assert sum("INSERT INTO reminders" in statement for statement in counter.statements) == 1
@@ -0,0 +1,467 @@
+"""
+Tests for multi-worker reminder dispatch: claiming, lease recovery, completion and retention
+"""
+import datetime
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.core.config import settings
+from src.models.reminder import Reminder, ReminderArchive, ReminderType, ReminderStatus
+from src.models.user import User
+from src.services import reminder_scheduler
+from src.services.reminder_service import ReminderService
+from tests.conftest import TestingSessionLocal, count_queries
+
+
+def add_reminders(db, user_id, count, minutes_from_now=-1, **fields):
+    """Helper adding reminders scheduled relative to now"""
+    reminders = [
+        Reminder(user_id=user_id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                 title="Dose", message="Take it",
+                 scheduled_time=datetime.datetime.now() + datetime.timedelta(minutes=minutes_from_now), **fields)
+        for _ in range(count)
+    ]
+    db.add_all(reminders)
+    db.commit()
+    return reminders
+
+
+@pytest.fixture
+def patient(test_db):
+    user = User(name="Patient", phone="+919876500020")
+    test_db.add(user)
+    test_db.commit()
+    return user
+
+
+class TestClaimDueReminders:
+    """Test due reminders are claimed by exactly one dispatcher"""
+
+    def test_claim_moves_due_reminders_to_processing(self, test_db, patient):
+        """Test only due, active, pending reminders are claimed, with their users loaded"""
+        due = add_reminders(test_db, patient.id, 3)
+        add_reminders(test_db, patient.id, 2, minutes_from_now=60)
+        add_reminders(test_db, patient.id, 1, is_active=False)
+
+        claimed = ReminderService.claim_due_reminders(test_db, "worker-a")
+        test_db.commit()
+
+        assert [reminder.id for reminder in claimed] == [reminder.id for reminder in due]
+        assert all(reminder.user.phone == patient.phone for reminder in claimed)
+        test_db.expire_all()
+        for reminder in due:
+            assert reminder.status == ReminderStatus.PROCESSING
+            assert reminder.claimed_by == "worker-a"
+            assert reminder.claimed_at is not None
+
+    def test_second_worker_gets_disjoint_rows(self, test_db, patient):
+        """Test claimed rows are never handed to another worker"""
+        add_reminders(test_db, patient.id, 5)
+
+        first = ReminderService.claim_due_reminders(test_db, "worker-a", limit=3)
+        second = ReminderService.claim_due_reminders(test_db, "worker-b", limit=3)
+        third = ReminderService.claim_due_reminders(test_db, "worker-c", limit=3)
+
+        assert len(first) == 3 and len(second) == 2 and third == []
+        assert not {r.id for r in first} & {r.id for r in second}
+
+    def test_concurrent_claims_never_overlap(self, tmp_path):
+        """Test dispatchers racing on one database file each get their own reminders"""
+        from concurrent.futures import ThreadPoolExecutor
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from src.db.database import Base
+        from src.db.sqlite import configure_sqlite_engine
+        file_engine = create_engine(f"sqlite:///{tmp_path}/dispatch.db", connect_args={"check_same_thread": False})
+        configure_sqlite_engine(file_engine, single_writer=True)
+        Base.metadata.create_all(file_engine)
+        Session = sessionmaker(bind=file_engine)
+        with Session() as db:
+            user = User(name="Patient", phone="+919876500021")
+            db.add(user)
+            db.commit()
+            add_reminders(db, user.id, 200)
+
+        def claim(worker):
+            ids = []
+            while True:
+                with Session() as db:
+                    batch = [r.id for r in ReminderService.claim_due_reminders(db, f"worker-{worker}", limit=7)]
+                    db.commit()
+                if not batch:
+                    return ids
+                ids.extend(batch)
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            claimed = list(pool.map(claim, range(6)))
+        file_engine.dispose()
+
+        all_ids = [reminder_id for ids in claimed for reminder_id in ids]
+        assert len(all_ids) == 200
+        assert len(set(all_ids)) == 200
+
+
+class TestClaimLifecycle:
+    """Test claims are completed by their owner and recovered after the lease"""
+
+    def test_complete_claim_requires_owner(self, test_db, patient):
+        """Test only the worker holding the claim can mark the reminder sent"""
+        reminder = add_reminders(test_db, patient.id, 1)[0]
+        ReminderService.claim_due_reminders(test_db, "worker-a")
+
+        assert not ReminderService.complete_claim(test_db, reminder.id, "worker-b", sent=True)
+        assert ReminderService.complete_claim(test_db, reminder.id, "worker-a", sent=True)
+        assert not ReminderService.complete_claim(test_db, reminder.id, "worker-a", sent=False)
+        test_db.commit()
+        test_db.expire_all()
+        assert reminder.status == ReminderStatus.SENT
+
+    def test_cancel_wins_over_in_flight_send(self, test_db, patient):
+        """Test a reminder cancelled while being sent stays cancelled"""
+        reminder = add_reminders(test_db, patient.id, 1)[0]
+        ReminderService.claim_due_reminders(test_db, "worker-a")
+        ReminderService.cancel_reminder(test_db, reminder.id)
+
+        assert not ReminderService.complete_claim(test_db, reminder.id, "worker-a", sent=True)
+        test_db.expire_all()
+        assert reminder.status == ReminderStatus.CANCELLED
+
+    def test_expired_claims_are_recovered(self, test_db, patient):
+        """Test claims older than the lease return to PENDING and can be claimed again"""
+        stale, fresh = add_reminders(test_db, patient.id, 2)
+        ReminderService.claim_due_reminders(test_db, "crashed-worker")
+        stale.claimed_at = datetime.datetime.now() - datetime.timedelta(seconds=601)
+        test_db.commit()
+
+        assert ReminderService.recover_expired_claims(test_db, lease_seconds=600) == 1
+        test_db.commit()
+        test_db.expire_all()
+        assert stale.status == ReminderStatus.PENDING and stale.claimed_by is None
+        assert fresh.status == ReminderStatus.PROCESSING
+
+        reclaimed = ReminderService.claim_due_reminders(test_db, "worker-b")
+        assert [reminder.id for reminder in reclaimed] == [stale.id]
+        assert not ReminderService.complete_claim(test_db, stale.id, "crashed-worker", sent=True)
+
+
+class TestSchedulerDispatch:
+    """Test several scheduler instances deliver each reminder once"""
+
+    def test_each_reminder_sent_once_across_schedulers(self, test_db, patient):
+        """Test two dispatchers (as in two uvicorn workers) never send the same reminder twice"""
+        add_reminders(test_db, patient.id, 4)
+        sms = MagicMock()
+        sms.send_reminder_sms.return_value = {"success": True}
+        first, second = reminder_scheduler.ReminderScheduler(), reminder_scheduler.ReminderScheduler()
+        first.worker_id, second.worker_id = "host:1", "host:2"
+
+        with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(reminder_scheduler, "sms_service", sms):
+            first.process_due_reminders()
+            second.process_due_reminders()
+
+        assert sms.send_reminder_sms.call_count == 4
+        test_db.expire_all()
+        reminders = test_db.query(Reminder).all()
+        assert {reminder.status for reminder in reminders} == {ReminderStatus.SENT}
+        assert {reminder.claimed_by for reminder in reminders} == {"host:1"}
+
+
+class TestConcurrentSending:
+    """Test batches are sent from a bounded, rate-capped pool and written back in one UPDATE"""
+
+    def run_scheduler(self, sms, concurrency=4):
+        """Helper running one dispatch pass against the test database with no rate cap"""
+        with patch.object(settings, "REMINDER_SEND_CONCURRENCY", concurrency), \
+             patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(reminder_scheduler, "sms_service", sms):
+            scheduler = reminder_scheduler.ReminderScheduler()
+            scheduler.rate_limiter = reminder_scheduler.RateLimiter(0)
+            with count_queries() as counter:
+                scheduler.process_due_reminders()
+            scheduler._send_pool.shutdown()
+        return counter
+
+    def test_batch_is_sent_concurrently(self, test_db, patient):
+        """Test up to REMINDER_SEND_CONCURRENCY messages are in flight at once"""
+        import threading
+        add_reminders(test_db, patient.id, 8)
+        barrier = threading.Barrier(4, timeout=5)
+
+        def send(phone, message):
+            barrier.wait()
+            return {"success": True}
+
+        sms = MagicMock()
+        sms.send_reminder_sms.side_effect = send
+        self.run_scheduler(sms, concurrency=4)
+
+        test_db.expire_all()
+        assert {reminder.status for reminder in test_db.query(Reminder)} == {ReminderStatus.SENT}
+
+    def test_statuses_written_in_one_update(self, test_db, patient):
+        """Test sent and failed outcomes land in a single CASE UPDATE, whatever the batch size"""
+        reminders = add_reminders(test_db, patient.id, 10)
+        failing = {reminders[2].id, reminders[7].id}
+        sms = MagicMock()
+        sms.send_reminder_sms.side_effect = lambda phone, message: {"success": True}
+        with patch.object(reminder_scheduler.ReminderScheduler, "send_notification",
+                          lambda self, reminder: reminder.id not in failing):
+            counter = self.run_scheduler(sms)
+
+        completions = [statement for statement in counter.statements if "CASE WHEN" in statement]
+        assert len(completions) == 1
+        assert len(counter) == 3  # claim, load users, complete
+        test_db.expire_all()
+        for reminder in reminders:
+            expected = ReminderStatus.FAILED if reminder.id in failing else ReminderStatus.SENT
+            assert reminder.status == expected
+
+    def test_send_errors_mark_only_that_reminder_failed(self, test_db, patient):
+        """Test an exception from the SMS client fails its reminder without losing the batch"""
+        first, second = add_reminders(test_db, patient.id, 2)
+        sms = MagicMock()
+        sms.send_reminder_sms.side_effect = [RuntimeError("twilio down"), {"success": True}]
+        self.run_scheduler(sms, concurrency=1)
+
+        test_db.expire_all()
+        assert first.status == ReminderStatus.FAILED
+        assert second.status == ReminderStatus.SENT
+
+    def test_rate_limiter_spaces_calls(self):
+        """Test calls from several threads are spaced at least 1/rate apart"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        limiter = reminder_scheduler.RateLimiter(100)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: limiter.acquire(), range(11)))
+        assert time.monotonic() - started >= 0.1
+
+
+class TestReminderTimer:
+    """Test the in-memory dispatch timer"""
+
+    def test_pops_in_due_order_and_skips_superseded_entries(self):
+        """Test moved and dropped reminders never surface at their old time"""
+        from src.services.reminder_timer import ReminderTimer
+        now = datetime.datetime.now()
+        timer = ReminderTimer()
+        timer.reload([(1, now - datetime.timedelta(seconds=3)), (2, now - datetime.timedelta(seconds=2)),
+                      (3, now - datetime.timedelta(seconds=1))], now + datetime.timedelta(hours=1))
+
+        timer.apply([(1, now + datetime.timedelta(minutes=5)), (2, None)])
+
+        assert timer.pop_due(now) == [3]
+        assert timer.next_due() == now + datetime.timedelta(minutes=5)
+        assert len(timer) == 1
+
+    def test_ignores_changes_outside_horizon_or_before_first_reload(self):
+        """Test processes that never loaded a schedule, and far-future reminders, hold nothing"""
+        from src.services.reminder_timer import ReminderTimer
+        now = datetime.datetime.now()
+        timer = ReminderTimer()
+        timer.apply([(1, now)])
+        assert len(timer) == 0
+
+        timer.reload([], now + datetime.timedelta(hours=1))
+        timer.apply([(2, now + datetime.timedelta(hours=2)), (3, now)])
+        assert timer.pop_due(now) == [3]
+        assert len(timer) == 0
+
+    def test_changes_during_reload_are_replayed(self):
+        """Test a change committed while the reload query runs is not lost when its result lands"""
+        from src.services.reminder_timer import ReminderTimer
+        now = datetime.datetime.now()
+        timer = ReminderTimer()
+        timer.begin_reload()
+        timer.apply([(7, now), (8, None)])
+        timer.reload([(8, now)], now + datetime.timedelta(hours=1))
+
+        assert timer.pop_due(now) == [7]
+
+    def test_wait_wakes_on_change(self):
+        """Test a sleeping scheduler is woken by a new schedule instead of its timeout"""
+        import threading
+        import time
+        from src.services.reminder_timer import ReminderTimer
+        timer = ReminderTimer()
+        timer.reload([], datetime.datetime.now() + datetime.timedelta(hours=1))
+        threading.Timer(0.05, timer.apply, args=([(1, datetime.datetime.now())],)).start()
+
+        started = time.monotonic()
+        timer.wait(5)
+        assert time.monotonic() - started < 2
+
+
+class TestReminderEvents:
+    """Test ReminderService publishes schedule changes once they commit"""
+
+    @pytest.fixture
+    def timer(self):
+        from src.services import reminder_timer as timer_module
+        timer = timer_module.ReminderTimer()
+        timer.reload([], datetime.datetime.now() + datetime.timedelta(hours=1))
+        with patch.object(timer_module, "reminder_timer", timer):
+            yield timer
+
+    def reminder_in(self, user_id, minutes_from_now=1):
+        from src.schemas.reminder import ReminderCreate
+        return ReminderCreate(user_id=user_id, reminder_type=ReminderType.MEDICINE, related_id=1, title="Dose",
+                              scheduled_time=datetime.datetime.now() + datetime.timedelta(minutes=minutes_from_now))
+
+    def test_create_reaches_timer_only_after_commit(self, test_db, patient, timer):
+        """Test a new reminder is scheduled on commit, and never if the transaction rolls back"""
+        ReminderService.create_reminder(test_db, self.reminder_in(patient.id))
+        assert len(timer) == 0
+        test_db.rollback()
+        assert len(timer) == 0
+
+        reminder = ReminderService.create_reminder(test_db, self.reminder_in(patient.id))
+        test_db.commit()
+        assert timer.next_due() == reminder.scheduled_time
+
+    def test_reschedule_and_cancel_update_timer(self, test_db, patient, timer):
+        """Test moving a reminder reschedules it and cancelling it removes it"""
+        from src.schemas.reminder import ReminderUpdate
+        reminder = ReminderService.create_reminder(test_db, self.reminder_in(patient.id))
+        test_db.commit()
+        later = datetime.datetime.now() + datetime.timedelta(minutes=30)
+
+        ReminderService.update_reminder(test_db, reminder.id, ReminderUpdate(scheduled_time=later))
+        test_db.commit()
+        assert timer.next_due() == later
+
+        ReminderService.cancel_reminder(test_db, reminder.id)
+        test_db.commit()
+        assert timer.next_due() is None
+
+    def test_events_from_other_processes_are_applied(self, timer):
+        """Test the Redis subscriber feeds other workers' changes into the timer, but not our own"""
+        import json
+        import time
+        from src.services import reminder_timer as timer_module
+        due = datetime.datetime.now() + datetime.timedelta(minutes=2)
+        listener = timer_module.ReminderEventListener()
+        listener.start()
+        try:
+            time.sleep(0.1)
+            channel = settings.REMINDER_EVENTS_CHANNEL
+            timer_module.redis_client.publish(channel, json.dumps({"origin": timer_module.INSTANCE_ID,
+                                                                   "changes": [[1, due.isoformat()]]}))
+            timer_module.redis_client.publish(channel, json.dumps({"origin": "other-worker",
+                                                                   "changes": [[2, due.isoformat()]]}))
+            deadline = time.monotonic() + 3
+            while len(timer) == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            listener.stop()
+
+        assert timer.pop_due(due) == [2]
+
+
+class TestEventDrivenScheduler:
+    """Test the scheduler sleeps until the next reminder is due instead of polling"""
+
+    def test_new_reminder_dispatched_on_time_without_polling(self, test_db, patient):
+        """Test a reminder created while the scheduler sleeps is sent within a second of its due time"""
+        import time
+        from src.schemas.reminder import ReminderCreate
+        from src.services.reminder_timer import ReminderTimer
+        sms = MagicMock()
+        sms.send_reminder_sms.return_value = {"success": True}
+        scheduler = reminder_scheduler.ReminderScheduler()
+        scheduler.timer = ReminderTimer()
+        scheduler.rate_limiter = reminder_scheduler.RateLimiter(0)
+        patient_id = patient.id
+
+        with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(reminder_scheduler, "sms_service", sms), \
+             patch("src.services.reminder_timer.reminder_timer", scheduler.timer), \
+             count_queries() as counter:
+            scheduler.start()
+            try:
+                deadline = time.monotonic() + 3
+                while scheduler.timer.horizon_end is None and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                reloads = len(counter)
+
+                due = datetime.datetime.now() + datetime.timedelta(milliseconds=300)
+                ReminderService.create_reminder(test_db, ReminderCreate(
+                    user_id=patient_id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                    title="Dose", message="Take it", scheduled_time=due))
+                test_db.commit()
+
+                while not sms.send_reminder_sms.called and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                sent_at = datetime.datetime.now()
+            finally:
+                scheduler.stop()
+
+        assert sms.send_reminder_sms.call_count == 1
+        assert (sent_at - due).total_seconds() < 1
+        # One reload at start, then only the claim pass the timer triggered: no polling in between
+        assert reloads == 2
+        # The create's INSERT, then claim, load users and complete
+        assert len(counter) - reloads == 4
+
+
+class TestReminderCleanup:
+    """Test finished reminders past retention are archived in bounded chunks"""
+
+    def test_only_old_finished_reminders_are_archived(self, test_db, patient):
+        """Test old sent/failed/cancelled rows move to the archive; pending and recent ones stay"""
+        old = -60 * 24 * 40
+        finished = [add_reminders(test_db, patient.id, 1, minutes_from_now=old, status=status)[0]
+                    for status in (ReminderStatus.SENT, ReminderStatus.FAILED, ReminderStatus.CANCELLED)]
+        finished_ids = sorted(reminder.id for reminder in finished)
+        kept = add_reminders(test_db, patient.id, 1, minutes_from_now=old)
+        kept += add_reminders(test_db, patient.id, 1, minutes_from_now=-60, status=ReminderStatus.SENT)
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=30)
+
+        assert ReminderService.archive_finished_reminders(test_db, cutoff, archive=True) == 3
+        test_db.commit()
+
+        assert sorted(id for (id,) in test_db.query(Reminder.id)) == sorted(reminder.id for reminder in kept)
+        archived = test_db.query(ReminderArchive).order_by(ReminderArchive.id).all()
+        assert [row.id for row in archived] == finished_ids
+        assert {row.status for row in archived} == {ReminderStatus.SENT, ReminderStatus.FAILED, ReminderStatus.CANCELLED}
+        assert all(row.user_id == patient.id and row.title == "Dose" and row.archived_at for row in archived)
+
+    def test_delete_without_archive(self, test_db, patient):
+        """Test archiving can be turned off to just delete"""
+        add_reminders(test_db, patient.id, 2, minutes_from_now=-60 * 24 * 40, status=ReminderStatus.SENT)
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=30)
+
+        assert ReminderService.archive_finished_reminders(test_db, cutoff, archive=False) == 2
+        test_db.commit()
+
+        assert test_db.query(Reminder).count() == 0
+        assert test_db.query(ReminderArchive).count() == 0
+
+    def test_cleanup_runs_in_chunks(self, test_db, patient):
+        """Test the job commits one chunk at a time, pausing between chunks, until a short chunk"""
+        add_reminders(test_db, patient.id, 5, minutes_from_now=-60 * 24 * 40, status=ReminderStatus.SENT)
+        scheduler = reminder_scheduler.ReminderScheduler()
+
+        with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(settings, "REMINDER_CLEANUP_BATCH_SIZE", 2), \
+             patch.object(settings, "REMINDER_CLEANUP_ARCHIVE", True), \
+             patch.object(reminder_scheduler.time, "sleep") as sleep, \
+             patch.object(ReminderService, "archive_finished_reminders",
+                          wraps=ReminderService.archive_finished_reminders) as archive_chunk:
+            assert scheduler.cleanup_old_reminders() == 5
+
+        assert archive_chunk.call_count == 3
+        assert sleep.call_count == 2
+        sleep.assert_called_with(settings.REMINDER_CLEANUP_PAUSE_SECONDS)
+        test_db.expire_all()
+        assert test_db.query(Reminder).count() == 0
+        assert test_db.query(ReminderArchive).count() == 5
+
+    def test_cleanup_error_is_logged(self, test_db):
+        """Test a failing chunk is rolled back and ends the run without raising"""
+        scheduler = reminder_scheduler.ReminderScheduler()
+        with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+             patch.object(ReminderService, "archive_finished_reminders", side_effect=RuntimeError("locked")):
+            assert scheduler.cleanup_old_reminders() == 0
@@ -0,0 +1,124 @@
+"""
+Tests for the standalone reminder worker: health checks, drain on shutdown and signal handling
+"""
+import datetime
+import json
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.core.config import settings
+from src.models.reminder import Reminder, ReminderType, ReminderStatus
+from src.models.user import User
+from src.services import reminder_scheduler
+from src.services.reminder_timer import ReminderTimer
+from src.workers import reminders as worker
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def scheduler():
+    """A scheduler on the test database with its own timer and no rate cap"""
+    instance = reminder_scheduler.ReminderScheduler()
+    instance.timer = ReminderTimer()
+    instance.rate_limiter = reminder_scheduler.RateLimiter(0)
+    with patch.object(reminder_scheduler, "SessionLocal", TestingSessionLocal), \
+         patch("src.services.reminder_timer.reminder_timer", instance.timer):
+        yield instance
+    if instance.running:
+        instance.stop()
+
+
+class TestHealthChecks:
+    """Test the liveness and readiness endpoints"""
+
+    def test_status_follows_scheduler_state(self):
+        """Test live tracks the dispatch thread and ready also needs a recent reload"""
+        scheduler = MagicMock(timer=[1, 2])
+        scheduler.is_alive.return_value = True
+        scheduler.is_ready.return_value = False
+
+        assert worker.health_status(scheduler, "/health/live") == (200, {"status": "alive"})
+        assert worker.health_status(scheduler, "/health/ready") == (503, {"status": "not ready", "scheduled": 2})
+        assert worker.health_status(scheduler, "/metrics")[0] == 404
+
+    def test_ready_once_schedule_loaded(self, test_db, scheduler):
+        """Test the HTTP endpoints answer 503 before start and 200 once the timer is loaded"""
+        server = worker.make_health_server(scheduler, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with pytest.raises(urllib.error.HTTPError) as not_ready:
+                urllib.request.urlopen(f"{url}/health/ready", timeout=5)
+            assert not_ready.value.code == 503
+
+            scheduler.start()
+            deadline = time.monotonic() + 3
+            while not scheduler.is_ready() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with urllib.request.urlopen(f"{url}/health/ready", timeout=5) as response:
+                assert response.status == 200
+                assert json.loads(response.read())["status"] == "ready"
+            with urllib.request.urlopen(f"{url}/health/live", timeout=5) as response:
+                assert response.status == 200
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestWorkerLifecycle:
+    """Test the worker drains its batch in flight before exiting"""
+
+    def test_stop_waits_for_batch_in_flight(self, test_db, scheduler):
+        """Test a reminder being sent when shutdown starts is still recorded as sent"""
+        user = User(name="Patient", phone="+919876500030")
+        test_db.add(user)
+        test_db.commit()
+        test_db.add(Reminder(user_id=user.id, reminder_type=ReminderType.MEDICINE, related_id=1, title="Dose",
+                             message="Take it", scheduled_time=datetime.datetime.now() - datetime.timedelta(minutes=1)))
+        test_db.commit()
+        stop_event = threading.Event()
+        sending = threading.Event()
+
+        def slow_send(phone, message):
+            sending.set()
+            time.sleep(0.3)
+            return {"success": True}
+
+        sms = MagicMock()
+        sms.send_reminder_sms.side_effect = slow_send
+        # Shut down as soon as the send starts
+        threading.Thread(target=lambda: sending.wait(5) and stop_event.set(), daemon=True).start()
+
+        with patch.object(reminder_scheduler, "sms_service", sms), \
+             patch.object(worker, "verify_schema") as verify_schema, \
+             patch.object(settings, "REMINDER_WORKER_HEALTH_PORT", 0):
+            worker.run(scheduler, stop_event)
+
+        verify_schema.assert_called_once()
+        assert not scheduler.running
+        test_db.expire_all()
+        assert test_db.query(Reminder).one().status == ReminderStatus.SENT
+
+    def test_sigterm_stops_worker(self):
+        """Test SIGTERM sets the stop event run() waits on"""
+        previous = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+        stopped = []
+
+        def fake_run(stop_event):
+            stopped.append(stop_event.wait(5))
+
+        try:
+            with patch.object(worker, "run", side_effect=fake_run):
+                threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+                worker.main()
+        finally:
+            signal.signal(signal.SIGTERM, previous[0])
+            signal.signal(signal.SIGINT, previous[1])
+
+        assert stopped == [True]
@@ -2,7 +2,6 @@
 Tests for SMS verification service
 """
 import pytest
-import json
 import os
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
@@ -83,7 +82,7 @@ class TestSMSService:
             'sent_at': recent_time.isoformat(),
             'attempts': 0
         }
-        mock_cache_get.return_value = json.dumps(existing_data)
+        mock_cache_get.return_value = existing_data
         
         mock_twilio_client.return_value = MagicMock()
         
@@ -106,7 +105,7 @@ class TestSMSService:
             'sent_at': datetime.now().isoformat(),
             'attempts': 0
         }
-        mock_cache_get.return_value = json.dumps(verification_data)
+        mock_cache_get.return_value = verification_data
         
         with patch('src.services.sms_service.Client'):
             sms_service = SMSService()
@@ -130,7 +129,7 @@ class TestSMSService:
             'sent_at': datetime.now().isoformat(),
             'attempts': 0
         }
-        mock_cache_get.return_value = json.dumps(verification_data)
+        mock_cache_get.return_value = verification_data
         
         with patch('src.services.sms_service.Client'):
             sms_service = SMSService()
@@ -166,7 +165,7 @@ class TestSMSService:
             'verified_at': datetime.now().isoformat(),
             'expires_at': future_time.isoformat()
         }
-        mock_cache_get.return_value = json.dumps(verified_data)
+        mock_cache_get.return_value = verified_data
         
         with patch('src.services.sms_service.Client'):
             sms_service = SMSService()
@@ -197,7 +196,7 @@ class TestSMSService:
             'verified_at': datetime.now().isoformat(),
             'expires_at': past_time.isoformat()
         }
-        mock_cache_get.return_value = json.dumps(verified_data)
+        mock_cache_get.return_value = verified_data
         
         with patch('src.services.sms_service.Client'):
             sms_service = SMSService()
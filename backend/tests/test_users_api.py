@@ -337,3 +337,68 @@ class TestUserAPIValidation:
         
         response = client.get("/api/v1/users/-1")
         assert response.status_code == 403  
+
+
+class TestUserRemindersAPI:
+    """Test reminder listing with SQL-side filtering and cursor pagination"""
+
+    def create_user_with_reminders(self, client, test_db, count=5):
+        """Helper to create an authenticated user with reminders one hour apart, the first in the past"""
+        from datetime import datetime, timedelta
+        from src.models.reminder import Reminder, ReminderType
+
+        user = UserService.register_user(test_db, UserCreate(name="Test User", phone="1234567890", is_active=True))
+        client.cookies.set("session_token", UserService.issue_session(user.id)["session_token"])
+
+        start = datetime.now() - timedelta(hours=2, minutes=30)
+        for i in range(count):
+            test_db.add(Reminder(
+                user_id=user.id, reminder_type=ReminderType.MEDICINE, related_id=1,
+                title=f"Reminder {i}", scheduled_time=start + timedelta(hours=i),
+            ))
+        test_db.commit()
+        return user
+
+    def test_cursor_walks_every_reminder_once(self, client, test_db):
+        """Test following X-Next-Cursor returns each reminder once, newest first"""
+        user = self.create_user_with_reminders(client, test_db)
+
+        titles = []
+        url = f"/api/v1/users/{user.id}/reminders?limit=2"
+        response = client.get(url)
+        while True:
+            assert response.status_code == 200
+            titles.extend(reminder["title"] for reminder in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get(f"{url}&cursor={cursor}")
+
+        assert titles == [f"Reminder {i}" for i in range(4, -1, -1)]
+
+    def test_skip_and_limit(self, client, test_db):
+        """Test offset pagination still works"""
+        user = self.create_user_with_reminders(client, test_db)
+
+        response = client.get(f"/api/v1/users/{user.id}/reminders?skip=1&limit=2")
+
+        assert response.status_code == 200
+        assert [reminder["title"] for reminder in response.json()] == ["Reminder 3", "Reminder 2"]
+
+    def test_past_reminders_filtered_in_sql(self, client, test_db):
+        """Test only reminders scheduled before now are returned"""
+        user = self.create_user_with_reminders(client, test_db)
+
+        response = client.get(f"/api/v1/users/{user.id}/reminders/past")
+
+        assert response.status_code == 200
+        assert [reminder["title"] for reminder in response.json()] == ["Reminder 2", "Reminder 1", "Reminder 0"]
+        assert response.headers["X-Next-Cursor"] == ""
+
+    def test_invalid_cursor(self, client, test_db):
+        """Test a malformed cursor is rejected"""
+        user = self.create_user_with_reminders(client, test_db, count=1)
+
+        response = client.get(f"/api/v1/users/{user.id}/reminders?cursor=not-a-cursor")
+
+        assert response.status_code == 400